@@ -1,10 +1,20 @@
 # make it possible to run raiden with 'python -m raiden'
+import sys
 
 
 def main():
+    # started before any import, so the imports are profiled too
+    if '--profile-startup' in sys.argv:
+        from raiden.utils.profiling.startup import start_startup_profiler, startup_phase
+        start_startup_profiler()
+
     import gevent.monkey
     gevent.monkey.patch_all()
     from raiden.ui.cli import run
+
+    if '--profile-startup' in sys.argv:
+        startup_phase('imports')
+
     # auto_envvar_prefix on a @click.command will cause all options to be
     # available also through environment variables prefixed with given prefix
     # http://click.pocoo.org/6/options/#values-from-environment-variables
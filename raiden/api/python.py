@@ -390,20 +390,23 @@ class RaidenAPI:
 
                 self.raiden.handle_state_change(channel_close)
 
-            msg = 'After {} seconds the closing transactions were not properly processed.'.format(
-                poll_timeout,
-            )
+        # The close transactions are sent concurrently by the contract send
+        # dispatcher, which waits for the channel locks, so these must be
+        # released before waiting for the channels to be closed.
+        msg = 'After {} seconds the closing transactions were not properly processed.'.format(
+            poll_timeout,
+        )
 
-            channel_ids = [channel_state.identifier for channel_state in channels_to_close]
+        channel_ids = [channel_state.identifier for channel_state in channels_to_close]
 
-            with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
-                waiting.wait_for_close(
-                    self.raiden,
-                    registry_address,
-                    token_address,
-                    channel_ids,
-                    self.raiden.alarm.wait_time,
-                )
+        with gevent.Timeout(poll_timeout, EthNodeCommunicationError(msg)):
+            waiting.wait_for_close(
+                self.raiden,
+                registry_address,
+                token_address,
+                channel_ids,
+                self.raiden.alarm.wait_time,
+            )
 
     def get_channel_list(self, registry_address, token_address=None, partner_address=None):
         """Returns a list of channels associated with the optionally given
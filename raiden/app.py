@@ -4,12 +4,10 @@ import sys
 import structlog
 from binascii import unhexlify
 from eth_utils import to_normalized_address
-from typing import Dict
+from typing import Dict, TYPE_CHECKING
 
 import gevent
 
-from raiden.network.blockchain_service import BlockChainService
-from raiden.raiden_service import RaidenService
 from raiden.settings import (
     DEFAULT_NAT_INVITATION_TIMEOUT,
     DEFAULT_NAT_KEEPALIVE_RETRIES,
@@ -17,9 +15,22 @@ from raiden.settings import (
     DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
     DEFAULT_TRANSPORT_THROTTLE_CAPACITY,
     DEFAULT_TRANSPORT_THROTTLE_FILL_RATE,
+    DEFAULT_TRANSPORT_THROTTLE_PEER_CAPACITY,
+    DEFAULT_TRANSPORT_THROTTLE_PEER_FILL_RATE,
     DEFAULT_TRANSPORT_RETRY_INTERVAL,
+    DEFAULT_TRANSPORT_WINDOW_SIZE,
+    DEFAULT_TRANSPORT_PACKING_WINDOW,
+    DEFAULT_TRANSPORT_DELIVERED_DELAY,
+    DEFAULT_TRANSPORT_RESULTS_TTL,
+    DEFAULT_TRANSPORT_RESULTS_MAX_SIZE,
+    DEFAULT_TRANSPORT_RECENT_MESSAGES_TTL,
+    DEFAULT_TRANSPORT_RECENT_MESSAGES_SIZE,
+    DEFAULT_TRANSPORT_VERIFIER_WORKERS,
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_SETTLE_TIMEOUT,
+    DEFAULT_CONTRACT_SEND_WORKERS,
+    DEFAULT_PAYMENT_RESULTS_TTL,
+    DEFAULT_PAYMENT_RESULTS_MAX_SIZE,
     DEFAULT_SHUTDOWN_TIMEOUT,
     INITIAL_PORT,
 )
@@ -28,6 +39,9 @@ from raiden.utils import (
     privatekey_to_address,
 )
 
+if TYPE_CHECKING:
+    from raiden.network.blockchain_service import BlockChainService  # noqa: F401
+
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
@@ -51,13 +65,27 @@ class App:  # pylint: disable=too-few-public-methods
             'retries_before_backoff': DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF,
             'throttle_capacity': DEFAULT_TRANSPORT_THROTTLE_CAPACITY,
             'throttle_fill_rate': DEFAULT_TRANSPORT_THROTTLE_FILL_RATE,
+            'throttle_peer_capacity': DEFAULT_TRANSPORT_THROTTLE_PEER_CAPACITY,
+            'throttle_peer_fill_rate': DEFAULT_TRANSPORT_THROTTLE_PEER_FILL_RATE,
             'nat_invitation_timeout': DEFAULT_NAT_INVITATION_TIMEOUT,
             'nat_keepalive_retries': DEFAULT_NAT_KEEPALIVE_RETRIES,
             'nat_keepalive_timeout': DEFAULT_NAT_KEEPALIVE_TIMEOUT,
+            'window_size': DEFAULT_TRANSPORT_WINDOW_SIZE,
+            'packing_window': DEFAULT_TRANSPORT_PACKING_WINDOW,
+            'delivered_delay': DEFAULT_TRANSPORT_DELIVERED_DELAY,
+            'results_ttl': DEFAULT_TRANSPORT_RESULTS_TTL,
+            'results_max_size': DEFAULT_TRANSPORT_RESULTS_MAX_SIZE,
+            'recent_messages_ttl': DEFAULT_TRANSPORT_RECENT_MESSAGES_TTL,
+            'recent_messages_size': DEFAULT_TRANSPORT_RECENT_MESSAGES_SIZE,
+            'verifier_workers': DEFAULT_TRANSPORT_VERIFIER_WORKERS,
         },
         'rpc': True,
         'console': False,
         'shutdown_timeout': DEFAULT_SHUTDOWN_TIMEOUT,
+        'use_block_filter': False,
+        'contract_send_workers': DEFAULT_CONTRACT_SEND_WORKERS,
+        'payment_results_ttl': DEFAULT_PAYMENT_RESULTS_TTL,
+        'payment_results_max_size': DEFAULT_PAYMENT_RESULTS_MAX_SIZE,
         'transport_type': 'udp',
         'matrix': {
             'server': 'auto',
@@ -76,11 +104,15 @@ class App:  # pylint: disable=too-few-public-methods
     def __init__(
             self,
             config: Dict,
-            chain: BlockChainService,
+            chain: 'BlockChainService',
             default_registry,
             transport,
             discovery=None,
     ):
+        # Imported here, so the CLI and the tests can read DEFAULT_CONFIG
+        # without loading web3 and the contracts
+        from raiden.raiden_service import RaidenService
+
         self.config = config
         self.discovery = discovery
 
@@ -125,3 +157,6 @@ class App:  # pylint: disable=too-few-public-methods
             self.raiden.close_and_settle()
 
         self.raiden.stop()
+
+        # The contract metadata fetched while running is persisted once
+        self.raiden.chain.metadata_cache.save()
@@ -9,10 +9,9 @@ import re
 
 from threading import Lock
 
-from solc import compile_files, get_solc_version
 from eth_utils import event_abi_to_log_topic, encode_hex
 
-from raiden.utils import get_contract_path, compare_versions
+from raiden.utils import get_contract_path, get_project_root, compare_versions
 from raiden.constants import MIN_REQUIRED_SOLC
 from raiden.exceptions import ContractVersionMismatch
 
@@ -21,6 +20,7 @@ from raiden_contracts.contract_manager import ContractManager
 
 __all__ = (
     'CONTRACT_MANAGER',
+    'build_abi_bundle',
 
     'CONTRACT_CHANNEL_MANAGER',
     'CONTRACT_ENDPOINT_REGISTRY',
@@ -77,6 +77,26 @@ EVENT_TOKEN_ADDED = 'TokenAdded'
 EVENT_TOKEN_ADDED2 = 'TokenNetworkCreated'
 EVENT_ADDRESS_REGISTERED = 'AddressRegistered'
 
+EVENT_TO_CONTRACT = {
+    EVENT_CHANNEL_NEW: CONTRACT_CHANNEL_MANAGER,
+    EVENT_CHANNEL_NEW_BALANCE: CONTRACT_NETTING_CHANNEL,
+    EVENT_CHANNEL_CLOSED: CONTRACT_NETTING_CHANNEL,
+    EVENT_CHANNEL_SECRET_REVEALED: CONTRACT_NETTING_CHANNEL,
+    EVENT_CHANNEL_SETTLED: CONTRACT_NETTING_CHANNEL,
+    EVENT_TOKEN_ADDED: CONTRACT_REGISTRY,
+    EVENT_ADDRESS_REGISTERED: CONTRACT_ENDPOINT_REGISTRY,
+}
+
+#: The contracts in the precompiled bundle and the file with their source
+BUNDLED_CONTRACTS = (
+    ('HumanStandardToken.sol', CONTRACT_HUMAN_STANDARD_TOKEN),
+    ('ChannelManagerContract.sol', CONTRACT_CHANNEL_MANAGER),
+    ('EndpointRegistry.sol', CONTRACT_ENDPOINT_REGISTRY),
+    ('NettingChannelContract.sol', CONTRACT_NETTING_CHANNEL),
+    ('Registry.sol', CONTRACT_REGISTRY),
+)
+ABI_BUNDLE_FILE = 'contracts.json'
+
 CONTRACT_VERSION_RE = r'^\s*string constant public contract_version = "([0-9]+\.[0-9]+\.[0-9\_])";\s*$' # noqa
 
 
@@ -125,6 +145,8 @@ def get_static_or_compile(
 
     validate_solc()
 
+    from solc import compile_files
+
     compiled = compile_files(
         [contract_path],
         contract_name,
@@ -151,6 +173,8 @@ def contract_checksum(contract_path):
 
 
 def validate_solc():
+    from solc import compile_files, get_solc_version
+
     if get_solc_version() is None:
         raise RuntimeError(
             "Couldn't find the solc in the current $PATH.\n"
@@ -199,27 +223,13 @@ class ContractManagerWrap(ContractManager):
         super().__init__(contracts_directory)
         self.is_instantiated = False
         self.lock = Lock()
-        self.event_to_contract = {
-            EVENT_CHANNEL_NEW: CONTRACT_CHANNEL_MANAGER,
-            EVENT_CHANNEL_NEW_BALANCE: CONTRACT_NETTING_CHANNEL,
-            EVENT_CHANNEL_CLOSED: CONTRACT_NETTING_CHANNEL,
-            EVENT_CHANNEL_SECRET_REVEALED: CONTRACT_NETTING_CHANNEL,
-            EVENT_CHANNEL_SETTLED: CONTRACT_NETTING_CHANNEL,
-            EVENT_TOKEN_ADDED: CONTRACT_REGISTRY,
-        }
+        self.event_to_contract = EVENT_TO_CONTRACT
         self.contract_to_version = dict()
         self.init_contract_versions()
 
     def init_contract_versions(self):
-        contracts = [
-            ('HumanStandardToken.sol', CONTRACT_HUMAN_STANDARD_TOKEN),
-            ('ChannelManagerContract.sol', CONTRACT_CHANNEL_MANAGER),
-            ('EndpointRegistry.sol', CONTRACT_ENDPOINT_REGISTRY),
-            ('NettingChannelContract.sol', CONTRACT_NETTING_CHANNEL),
-            ('Registry.sol', CONTRACT_REGISTRY),
-        ]
         version_re = re.compile(CONTRACT_VERSION_RE)
-        for contract_file, contract_name in contracts:
+        for contract_file, contract_name in BUNDLED_CONTRACTS:
             self.contract_to_version[contract_name] = parse_contract_version(
                 contract_file,
                 version_re,
@@ -240,9 +250,171 @@ class ContractManagerWrap(ContractManager):
 
     def check_contract_version(self, deployed_version, contract_name):
         """Check if the deployed contract version matches used contract version."""
-        our_version = CONTRACT_MANAGER.get_version(contract_name)
+        our_version = self.get_version(contract_name)
         if compare_versions(deployed_version, our_version) is False:
             raise ContractVersionMismatch('Incompatible ABI for %s' % contract_name)
 
 
-CONTRACT_MANAGER = ContractManagerWrap('raiden/smart_contracts/')
+def contracts_directory() -> str:
+    return os.path.join(get_project_root(), 'smart_contracts')
+
+
+def sources_checksum(directory: str) -> str:
+    """ Checksum of all the contract sources in `directory`. """
+    checksum = hashlib.sha1()
+
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith('.sol'):
+            continue
+
+        checksum.update(file_name.encode())
+        with open(os.path.join(directory, file_name), 'rb') as handler:
+            checksum.update(handler.read())
+
+    return checksum.hexdigest()
+
+
+def bundle_checksum(contracts: dict) -> str:
+    serialized = json.dumps(contracts, sort_keys=True)
+    return hashlib.sha1(serialized.encode()).hexdigest()
+
+
+def build_abi_bundle(directory: str = None, bundle_path: str = None) -> str:
+    """ Compile the contracts in `directory` and write their ABIs and
+    versions to a single file, which is loaded instead of compiling the
+    contracts on startup.
+
+    This is done by `setup.py compile_contracts`.
+    """
+    directory = directory or contracts_directory()
+    bundle_path = bundle_path or os.path.join(directory, ABI_BUNDLE_FILE)
+
+    manager = ContractManagerWrap(directory)
+    contracts = {
+        contract_name: {
+            'abi': manager.get_contract_abi(contract_name),
+            'version': manager.get_version(contract_name),
+        }
+        for _, contract_name in BUNDLED_CONTRACTS
+    }
+    bundle = {
+        'sources_checksum': sources_checksum(directory),
+        'checksum': bundle_checksum(contracts),
+        'contracts': contracts,
+    }
+
+    with open(bundle_path, 'w') as handler:
+        json.dump(bundle, handler, sort_keys=True)
+
+    return bundle_path
+
+
+def load_abi_bundle(directory: str, bundle_path: str):
+    """ Return the contracts in the bundle at `bundle_path`, or None if it
+    doesn't exist, is corrupted, or was built from other sources than the
+    ones in `directory`.
+    """
+    try:
+        with open(bundle_path) as handler:
+            bundle = json.load(handler)
+    except (OSError, ValueError):
+        return None
+
+    contracts = bundle.get('contracts')
+
+    if not isinstance(contracts, dict) or bundle.get('checksum') != bundle_checksum(contracts):
+        return None
+
+    if bundle.get('sources_checksum') != sources_checksum(directory):
+        return None
+
+    return contracts
+
+
+class LazyContractManager:
+    """ Loads the contract ABIs on first use.
+
+    Creating a `ContractManagerWrap` compiles all the contracts, which made
+    every `import raiden` slow, including `raiden --help`. The ABIs are read
+    from the bundle written by `build_abi_bundle` instead, and the contracts
+    are only compiled for a contract which is not in the bundle or if the
+    bundle is outdated.
+    """
+
+    def __init__(self, directory: str = None, bundle_path: str = None):
+        self.directory = directory or contracts_directory()
+        self.bundle_path = bundle_path or os.path.join(self.directory, ABI_BUNDLE_FILE)
+        self.lock = Lock()
+
+        self._bundle = None
+        self._bundle_loaded = False
+        self._compiled = None
+
+    @property
+    def bundle(self) -> dict:
+        if not self._bundle_loaded:
+            with self.lock:
+                if not self._bundle_loaded:
+                    self._bundle = load_abi_bundle(self.directory, self.bundle_path) or dict()
+                    self._bundle_loaded = True
+
+        return self._bundle
+
+    @property
+    def compiled(self) -> ContractManagerWrap:
+        if self._compiled is None:
+            with self.lock:
+                if self._compiled is None:
+                    self._compiled = ContractManagerWrap(self.directory)
+
+        return self._compiled
+
+    def get_contract_abi(self, contract_name: str):
+        contract = self.bundle.get(contract_name)
+
+        if contract is not None:
+            return contract['abi']
+
+        return self.compiled.get_contract_abi(contract_name)
+
+    def get_event_abi(self, contract_name: str, event_name: str):
+        if contract_name not in self.bundle:
+            return self.compiled.get_event_abi(contract_name, event_name)
+
+        for description in self.get_contract_abi(contract_name):
+            if description.get('type') == 'event' and description.get('name') == event_name:
+                return description
+
+        raise KeyError('Event {} not found in {}'.format(event_name, contract_name))
+
+    def get_version(self, contract_name: str) -> str:
+        """Return version of the contract."""
+        contract = self.bundle.get(contract_name)
+
+        if contract is not None:
+            return contract['version']
+
+        return self.compiled.get_version(contract_name)
+
+    def get_event_id(self, event_name: str) -> str:
+        contract_name = EVENT_TO_CONTRACT[event_name]
+        event_abi = self.get_event_abi(contract_name, event_name)
+        log_id = event_abi_to_log_topic(event_abi)
+        return encode_hex(log_id)
+
+    def check_contract_version(self, deployed_version, contract_name):
+        """Check if the deployed contract version matches used contract version."""
+        our_version = self.get_version(contract_name)
+        if compare_versions(deployed_version, our_version) is False:
+            raise ContractVersionMismatch('Incompatible ABI for %s' % contract_name)
+
+    def __getattr__(self, name):
+        # Everything else the contract manager offers needs the compiled
+        # contracts, e.g. the bytecode
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        return getattr(self.compiled, name)
+
+
+CONTRACT_MANAGER = LazyContractManager()
@@ -8,6 +8,7 @@ from eth_utils import to_canonical_address
 from raiden.blockchain.abi import (
     CONTRACT_MANAGER,
     CONTRACT_CHANNEL_MANAGER,
+    CONTRACT_ENDPOINT_REGISTRY,
     CONTRACT_NETTING_CHANNEL,
     CONTRACT_REGISTRY,
     CONTRACT_TOKEN_NETWORK,
@@ -26,7 +27,7 @@ from raiden.blockchain.abi import (
 )
 from raiden.exceptions import AddressWithoutCode
 from raiden.utils import pex
-from raiden.network.rpc.smartcontract_proxy import decode_event
+from raiden.network.rpc.smartcontract_proxy import decode_event, event_decoder_for
 
 EventListener = namedtuple(
     'EventListener',
@@ -260,19 +261,17 @@ class BlockchainEvents:
 
     def poll_blockchain_events(self):
         for event_listener in self.event_listeners:
+            decoder = event_decoder_for(event_listener.abi)
+
             for log_event in event_listener.filter.get_new_entries():
-                decoded_event = dict(decode_event(
-                    event_listener.abi,
-                    log_event,
-                ))
-
-                if decoded_event is not None:
-                    decoded_event['block_number'] = log_event.get('blockNumber', 0)
-                    event = Event(
-                        to_canonical_address(log_event['address']),
-                        decoded_event,
-                    )
-                    yield decode_event_to_internal(event)
+                # The decoder produces the internal representation directly,
+                # with all the addresses in binary format.
+                decoded_event = decoder.decode_internal(log_event)
+
+                yield Event(
+                    to_canonical_address(log_event['address']),
+                    decoded_event,
+                )
 
     def uninstall_all_event_listeners(self):
         for listener in self.event_listeners:
@@ -333,6 +332,17 @@ class BlockchainEvents:
             netting_channel_proxy.all_events_filter,
         )
 
+    def add_discovery_listener(self, discovery_proxy, from_block=None):
+        addressregistered = discovery_proxy.addressregistered_filter(from_block)
+        discovery_address = discovery_proxy.address
+
+        self.add_event_listener(
+            'EndpointRegistry {}'.format(pex(discovery_address)),
+            addressregistered,
+            CONTRACT_MANAGER.get_contract_abi(CONTRACT_ENDPOINT_REGISTRY),
+            discovery_proxy.addressregistered_filter,
+        )
+
     def add_proxies_listeners(self, proxies, from_block=None):
         self.add_registry_listener(proxies.registry, from_block)
 
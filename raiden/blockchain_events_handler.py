@@ -2,8 +2,6 @@
 import gevent
 import structlog
 
-from eth_utils import to_canonical_address
-
 from raiden.blockchain.events import get_channel_proxies, decode_event_to_internal
 from raiden.blockchain.state import (
     get_channel_state,
@@ -38,6 +36,7 @@ from raiden.blockchain.abi import (
     EVENT_CHANNEL_SETTLED,
     EVENT_CHANNEL_SECRET_REVEALED,
     EVENT_CHANNEL_SECRET_REVEALED2,
+    EVENT_ADDRESS_REGISTERED,
 )
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
@@ -275,6 +274,21 @@ def handle_channel_unlock(raiden, event, current_block_number):
         raiden.handle_state_change(unlock_state_change, current_block_number)
 
 
+def handle_address_registered(raiden, event):
+    data = event.event_data
+
+    # This is not a state change, the endpoints are only kept by the discovery
+    try:
+        raiden.discovery.update_endpoint(data['eth_address'], data['args']['socket'])
+    except ValueError:
+        log.warning(
+            'invalid endpoint registered',
+            node=pex(raiden.address),
+            node_address=pex(data['eth_address']),
+            endpoint=data['args']['socket'],
+        )
+
+
 def on_blockchain_event(raiden, event, current_block_number):
     log.debug(
         'EVENT',
@@ -285,38 +299,25 @@ def on_blockchain_event(raiden, event, current_block_number):
 
     data = event.event_data
 
+    # The addresses are already decoded to the internal binary format by
+    # `BlockchainEvents.poll_blockchain_events`
     if data['event'] == EVENT_TOKEN_ADDED:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
-        data['channel_manager_address'] = to_canonical_address(
-            data['args']['channel_manager_address'],
-        )
         handle_tokennetwork_new(raiden, event, current_block_number)
 
     elif data['event'] == EVENT_CHANNEL_NEW:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
-        data['participant1'] = to_canonical_address(data['args']['participant1'])
-        data['participant2'] = to_canonical_address(data['args']['participant2'])
         handle_channel_new(raiden, event, current_block_number)
 
     elif data['event'] == EVENT_CHANNEL_NEW_BALANCE:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
-        data['token_address'] = to_canonical_address(data['args']['token_address'])
-        data['participant'] = to_canonical_address(data['args']['participant'])
         data['balance'] = data['args']['balance']
         handle_channel_new_balance(raiden, event, current_block_number)
 
     elif data['event'] == EVENT_CHANNEL_CLOSED:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
-        data['closing_address'] = to_canonical_address(data['args']['closing_address'])
         handle_channel_closed(raiden, event, current_block_number)
 
     elif data['event'] == EVENT_CHANNEL_SETTLED:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
         handle_channel_settled(raiden, event, current_block_number)
 
     elif data['event'] == EVENT_CHANNEL_SECRET_REVEALED:
-        data['registry_address'] = to_canonical_address(data['args']['registry_address'])
-        data['receiver_address'] = to_canonical_address(data['args']['receiver_address'])
         data['secret'] = data['args']['secret']
         handle_channel_unlock(raiden, event, current_block_number)
 
@@ -326,6 +327,9 @@ def on_blockchain_event(raiden, event, current_block_number):
     elif data['event'] == EVENT_TRANSFER_UPDATED:
         pass
 
+    elif data['event'] == EVENT_ADDRESS_REGISTERED:
+        handle_address_registered(raiden, event)
+
     else:
         log.error('Unknown event type', event_name=data['event'], raiden_event=event)
 
@@ -4,6 +4,7 @@ from binascii import unhexlify
 import gevent
 from gevent.lock import Semaphore
 from gevent.event import AsyncResult
+from gevent.pool import Pool
 
 import structlog
 
@@ -13,12 +14,18 @@ from raiden.api.python import RaidenAPI
 from raiden.utils import pex
 from raiden.exceptions import (
     AddressWithoutCode,
+    RaidenError,
+    RaidenShuttingDown,
     TransactionThrew,
 )
 from raiden.transfer import views
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
+# Maximum number of partners for which the channel open and deposit
+# transactions are in flight at the same time.
+MAX_CONCURRENT_CHANNEL_OPENS = 20
+
 
 def log_open_channels(raiden, registry_address, token_address, funds):
     open_channels = views.get_channelstate_open(
@@ -278,29 +285,82 @@ class ConnectionManager:
         if qty_channels_to_open <= 0:
             return
 
-        for partner in self.find_new_partners(qty_channels_to_open):
-            try:
-                self.api.channel_open(
-                    registry_address,
-                    self.token_address,
-                    partner,
-                )
-            except DuplicatedChannelError:
-                # This can fail because of a race condition, where the channel
-                # partner opens first.
-                log.info('partner opened channel first')
+        # The channels are opened and funded concurrently, so the time to
+        # join the network is a few blocks instead of a couple of blocks per
+        # partner. The transactions of all partners are in flight at the same
+        # time, the JSONRPCClient assigns the nonces locally.
+        funding = self._initial_funding_per_partner
+        partners = self.find_new_partners(qty_channels_to_open)
+
+        pool = Pool(MAX_CONCURRENT_CHANNEL_OPENS)
+        greenlets = [
+            pool.spawn(self._open_and_deposit, registry_address, partner, funding)
+            for partner in partners
+        ]
+        gevent.joinall(greenlets, raise_error=True)
+
+        failed = [
+            partner
+            for partner, greenlet in zip(partners, greenlets)
+            if not greenlet.value
+        ]
+        if failed:
+            # New partners are searched again by `retry_connect` once new
+            # channels are detected.
+            log.warning(
+                'connection manager: could not open and fund all channels',
+                failed=[pex(partner) for partner in failed],
+                opened=len(partners) - len(failed),
+            )
 
-            try:
-                self.api.channel_deposit(
-                    registry_address,
-                    self.token_address,
-                    partner,
-                    self._initial_funding_per_partner,
-                )
-            except AddressWithoutCode:
-                log.warn('connection manager: channel closed just after it was created')
-            except TransactionThrew:
-                log.exception('connection manager: deposit failed')
+    def _open_and_deposit(self, registry_address, partner, funding):
+        """ Open and fund a channel with `partner`.
+
+        Returns:
+            False if the channel could not be opened or funded.
+        """
+        try:
+            self.api.channel_open(
+                registry_address,
+                self.token_address,
+                partner,
+            )
+        except DuplicatedChannelError:
+            # This can fail because of a race condition, where the channel
+            # partner opens first.
+            log.info('partner opened channel first')
+        except RaidenShuttingDown:
+            raise
+        except RaidenError:
+            log.exception(
+                'connection manager: channel open failed',
+                partner=pex(partner),
+            )
+            return False
+
+        try:
+            self.api.channel_deposit(
+                registry_address,
+                self.token_address,
+                partner,
+                funding,
+            )
+        except AddressWithoutCode:
+            log.warn('connection manager: channel closed just after it was created')
+            return False
+        except TransactionThrew:
+            log.exception('connection manager: deposit failed')
+            return False
+        except RaidenShuttingDown:
+            raise
+        except RaidenError:
+            log.exception(
+                'connection manager: deposit failed',
+                partner=pex(partner),
+            )
+            return False
+
+        return True
 
     @property
     def _initial_funding_per_partner(self) -> int:
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+from functools import partial
+
+import gevent
+from gevent.lock import Semaphore
+import structlog
+
+from raiden.exceptions import EthNodeCommunicationError, RaidenShuttingDown
+from raiden.raiden_event_handler import on_raiden_event
+from raiden.transfer.events import (
+    ContractSendChannelClose,
+    ContractSendChannelSettle,
+    ContractSendChannelUpdateTransfer,
+    ContractSendChannelUnlock,
+)
+from raiden.utils import pex
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+CONTRACT_SEND_EVENTS = (
+    ContractSendChannelClose,
+    ContractSendChannelSettle,
+    ContractSendChannelUpdateTransfer,
+    ContractSendChannelUnlock,
+)
+
+
+def is_contract_send_event(event):
+    return type(event) in CONTRACT_SEND_EVENTS
+
+
+class ContractSendDispatcher:
+    """ Handles the ContractSend* events in the background.
+
+    The handlers for these events send a transaction and wait for it to be
+    mined, which takes a few blocks. Handling them in the greenlet that
+    dispatched the state change would block the transport or the alarm task
+    for that long, and leaving a network with many channels would close and
+    settle the channels one at a time.
+
+    Up to `max_workers` events are handled concurrently, the transactions
+    are tracked together by the client's transaction manager. The events for
+    the same channel are handled in the order they were dispatched, e.g. a
+    settle is only sent after the unlocks for the channel are done.
+
+    Once `start` is called, the events are saved in the storage until they
+    are handled, so the contract calls interrupted by a shutdown or a crash
+    are sent again by the next run.
+    """
+
+    def __init__(self, raiden, max_workers: int):
+        self.raiden = raiden
+        self.workers = Semaphore(max_workers)
+        self.storage = None
+
+        #: The last greenlet for each channel, the next event for the channel
+        #: waits for it.
+        self.channel_tail = dict()
+        self.greenlets = set()
+
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.handled = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self.greenlets)
+
+    @property
+    def queue_depth(self):
+        """ Number of events which were dispatched and not handled yet. """
+        return len(self.greenlets)
+
+    def metrics(self):
+        return {
+            'queue_depth': self.queue_depth,
+            'in_flight': self.in_flight,
+            'max_queue_depth': self.max_queue_depth,
+            'handled': self.handled,
+            'failed': self.failed,
+        }
+
+    def start(self, storage, unapplied_events):
+        """ Dispatch the events saved by the previous run and start saving
+        the new ones.
+
+        Returns:
+            The `unapplied_events` restored from the write-ahead-log, without
+            the contract calls which are already queued.
+        """
+        self.storage = storage
+
+        queued_events = list()
+        for queue_identifier, event in storage.get_contract_send_events():
+            self._spawn(event, queue_identifier)
+            queued_events.append(event)
+
+        if queued_events:
+            log.info(
+                'resuming pending contract calls',
+                node=pex(self.raiden.address),
+                queue_depth=len(queued_events),
+            )
+
+        remaining_events = list()
+        for event in unapplied_events:
+            # The events replayed from the write-ahead-log may have been
+            # queued before the restart, these must not be sent twice.
+            if is_contract_send_event(event) and event in queued_events:
+                queued_events.remove(event)
+            else:
+                remaining_events.append(event)
+
+        return remaining_events
+
+    def dispatch(self, event):
+        """ Schedule `event` to be handled, this never blocks. """
+        queue_identifier = None
+        if self.storage is not None:
+            queue_identifier = self.storage.write_contract_send_event(event)
+
+        return self._spawn(event, queue_identifier)
+
+    def _spawn(self, event, queue_identifier):
+        channel_identifier = event.channel_identifier
+        previous = self.channel_tail.get(channel_identifier)
+
+        greenlet = gevent.spawn(self._handle, event, previous, queue_identifier)
+        greenlet.name = 'ContractSendDispatcher {}'.format(pex(channel_identifier))
+        greenlet.link(partial(self._done, channel_identifier))
+
+        self.channel_tail[channel_identifier] = greenlet
+        self.greenlets.add(greenlet)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.greenlets))
+
+        log.debug(
+            'contract call queued',
+            node=pex(self.raiden.address),
+            contract_event=event,
+            queue_depth=len(self.greenlets),
+        )
+
+        return greenlet
+
+    def _done(self, channel_identifier, greenlet):
+        self.greenlets.discard(greenlet)
+
+        if self.channel_tail.get(channel_identifier) is greenlet:
+            del self.channel_tail[channel_identifier]
+
+    def _handle(self, event, previous, queue_identifier):
+        if previous is not None:
+            previous.join()
+
+        with self.workers:
+            self.in_flight += 1
+
+            # Operations started from the API hold the channel lock while the
+            # transaction is pending, wait for them instead of failing with
+            # ChannelBusyError. The lock is reentrant, so the handler can
+            # acquire it again.
+            try:
+                channel = self.raiden.chain.netting_channel(event.channel_identifier)
+
+                with channel.channel_operations_lock:
+                    on_raiden_event(self.raiden, event)
+            except (RaidenShuttingDown, EthNodeCommunicationError):
+                # Keep the event in the queue, it is sent again on restart
+                return
+            except Exception:  # pylint: disable=broad-except
+                self.failed += 1
+                log.exception(
+                    'contract call failed',
+                    node=pex(self.raiden.address),
+                    contract_event=event,
+                )
+            else:
+                self.handled += 1
+            finally:
+                self.in_flight -= 1
+
+            if queue_identifier is not None:
+                self.storage.delete_contract_send_event(queue_identifier)
+
+    def join(self, timeout=None):
+        """ Wait for all the scheduled events to be handled. """
+        gevent.joinall(list(self.greenlets), timeout=timeout)
+
+    def stop(self, timeout=None):
+        self.join(timeout)
+        gevent.killall(list(self.greenlets))
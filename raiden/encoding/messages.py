@@ -35,6 +35,11 @@ LOCKEDTRANSFER = 7
 REFUNDTRANSFER = 8
 REVEALSECRET = 11
 DELIVERED = 12
+DELIVEREDBATCH = 13
+
+# Not a message, the UDP transport uses it to pack many messages in a
+# single datagram, see raiden.network.transport.udp.udp_framing
+PACKED = 255
 
 
 # pylint: disable=invalid-name
@@ -52,6 +57,15 @@ delivered_message_identifier = make_field(
 )
 expiration = make_field('expiration', 8, '8s', integer(0, UINT64_MAX))
 
+# Maximum number of message identifiers acknowledged by a DeliveredBatch
+DELIVERED_BATCH_SIZE = 32
+delivered_count = make_field('delivered_count', 1, '1s', integer(1, DELIVERED_BATCH_SIZE))
+delivered_message_identifiers = make_field(
+    'delivered_message_identifiers',
+    8 * DELIVERED_BATCH_SIZE,
+    '{}s'.format(8 * DELIVERED_BATCH_SIZE),
+)
+
 token_network_address = make_field('token_network_address', 20, '20s')
 token = make_field('token', 20, '20s')
 recipient = make_field('recipient', 20, '20s')
@@ -93,6 +107,17 @@ Delivered = namedbuffer(
     ],
 )
 
+DeliveredBatch = namedbuffer(
+    'delivered_batch',
+    [
+        cmdid(DELIVEREDBATCH),
+        pad(2),
+        delivered_count,
+        delivered_message_identifiers,
+        signature,
+    ],
+)
+
 Ping = namedbuffer(
     'ping',
     [
@@ -245,6 +270,7 @@ CMDID_MESSAGE = {
     LOCKEDTRANSFER: LockedTransfer,
     REFUNDTRANSFER: RefundTransfer,
     DELIVERED: Delivered,
+    DELIVEREDBATCH: DeliveredBatch,
 }
 
 
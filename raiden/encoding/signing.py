@@ -1,4 +1,8 @@
 # -*- coding: utf-8 -*-
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
 from coincurve import PublicKey
 import structlog
 
@@ -9,6 +13,20 @@ log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
 def recover_publickey(messagedata, signature, hasher=sha3):
+    # The balance proofs are recovered when the message is decoded and again
+    # by the state machine, the second recovery is served from the cache
+    if isinstance(messagedata, bytes) and isinstance(signature, bytes):
+        return _recover_publickey_cached(messagedata, signature, hasher)
+
+    return _recover_publickey(messagedata, signature, hasher)
+
+
+@lru_cache(maxsize=1024)
+def _recover_publickey_cached(messagedata, signature, hasher):
+    return _recover_publickey(messagedata, signature, hasher)
+
+
+def _recover_publickey(messagedata, signature, hasher):
     if len(signature) != 65:
         raise ValueError('invalid signature')
 
@@ -54,5 +72,60 @@ def sign(messagedata, private_key, hasher=sha3):
     return signature[:-1] + chr(signature[-1] + 27).encode()
 
 
+class Signer:
+    """ Signs the messages of a node with its private key.
+
+    The signatures are deterministic, RFC6979, so the signature of data which
+    was recently signed is served from a cache, e.g. the Pong answering a
+    retried Ping or the Delivered for a retransmitted message. The signer
+    can be used wherever a coincurve `PrivateKey` is expected to sign.
+
+    Args:
+        private_key: The coincurve private key of the node.
+        cache_size: Number of signatures kept.
+    """
+
+    def __init__(self, private_key, cache_size: int = 1024):
+        self.private_key = private_key
+        self.cache_size = cache_size
+
+        self.data_to_signature = OrderedDict()
+
+        self.signatures = 0
+        self.cache_hits = 0
+        self.signing_time = 0.0
+
+    def sign_recoverable(self, messagedata, hasher=sha3):
+        key = (bytes(messagedata), hasher)
+        signature = self.data_to_signature.get(key)
+
+        if signature is not None:
+            self.cache_hits += 1
+            self.data_to_signature.move_to_end(key)
+            return signature
+
+        start = time.perf_counter()
+        signature = self.private_key.sign_recoverable(key[0], hasher=hasher)
+        self.signing_time += time.perf_counter() - start
+        self.signatures += 1
+
+        self.data_to_signature[key] = signature
+        if len(self.data_to_signature) > self.cache_size:
+            self.data_to_signature.popitem(last=False)
+
+        return signature
+
+    def metrics(self):
+        signatures_per_second = 0.0
+        if self.signing_time:
+            signatures_per_second = self.signatures / self.signing_time
+
+        return {
+            'signatures': self.signatures,
+            'cache_hits': self.cache_hits,
+            'signatures_per_second': signatures_per_second,
+        }
+
+
 def address_from_key(key):
     return sha3(key[1:])[-20:]
@@ -40,6 +40,7 @@ from raiden.transfer.mediated_transfer.events import (
 
 __all__ = (
     'Delivered',
+    'DeliveredBatch',
     'DirectTransfer',
     'Lock',
     'LockedTransfer',
@@ -239,6 +240,10 @@ class SignedMessage(Message):
             return None
 
         message = cls.unpack(packed)  # pylint: disable=no-member
+
+        if message is None:
+            return None
+
         message.sender = address
         return message
 
@@ -341,6 +346,10 @@ class EnvelopeMessage(SignedMessage):
             return None
 
         message = cls.unpack(packed)  # pylint: disable=no-member
+
+        if message is None:
+            return None
+
         message.sender = address
         return message
 
@@ -447,6 +456,68 @@ class Delivered(SignedMessage):
         return delivered
 
 
+class DeliveredBatch(SignedMessage):
+    """ A single `Delivered` for up to `DELIVERED_BATCH_SIZE` messages, used
+    to save the signatures when many messages are received together.
+    """
+    cmdid = messages.DELIVEREDBATCH
+
+    def __init__(self, delivered_message_identifiers):
+        super().__init__()
+
+        if not 0 < len(delivered_message_identifiers) <= messages.DELIVERED_BATCH_SIZE:
+            raise ValueError('invalid number of delivered message identifiers')
+
+        self.delivered_message_identifiers = list(delivered_message_identifiers)
+
+    @classmethod
+    def unpack(cls, packed):
+        # The count is only validated on encoding, a peer may send any value
+        if not 0 < packed.delivered_count <= messages.DELIVERED_BATCH_SIZE:
+            return None
+
+        data = packed.delivered_message_identifiers
+        delivered = cls([
+            big_endian_to_int(data[position * 8:(position + 1) * 8])
+            for position in range(packed.delivered_count)
+        ])
+        delivered.signature = packed.signature
+        return delivered
+
+    def pack(self, packed):
+        data = b''.join(
+            identifier.to_bytes(8, byteorder='big')
+            for identifier in self.delivered_message_identifiers
+        )
+        padding = 8 * messages.DELIVERED_BATCH_SIZE - len(data)
+
+        packed.delivered_count = len(self.delivered_message_identifiers)
+        packed.delivered_message_identifiers = data + b'\x00' * padding
+        packed.signature = self.signature
+
+    def __repr__(self):
+        return '<{} [delivered_msgids:{}]>'.format(
+            self.__class__.__name__,
+            self.delivered_message_identifiers,
+        )
+
+    def to_dict(self):
+        return {
+            'type': self.__class__.__name__,
+            'delivered_message_identifiers': self.delivered_message_identifiers,
+            'signature': data_encoder(self.signature),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        assert data['type'] == cls.__name__
+        delivered = cls(
+            delivered_message_identifiers=data['delivered_message_identifiers'],
+        )
+        delivered.signature = data_decoder(data['signature'])
+        return delivered
+
+
 class Pong(SignedMessage):
     """ Response to a Ping message. """
     cmdid = messages.PONG
@@ -1451,6 +1522,7 @@ class RefundTransfer(LockedTransfer):
 
 CMDID_TO_CLASS = {
     messages.DELIVERED: Delivered,
+    messages.DELIVEREDBATCH: DeliveredBatch,
     messages.DIRECTTRANSFER: DirectTransfer,
     messages.LOCKEDTRANSFER: LockedTransfer,
     messages.PING: Ping,
@@ -11,6 +11,7 @@ from eth_utils import (
 )
 
 from raiden.network.rpc.client import JSONRPCClient
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.proxies import (
     ChannelManager,
     Discovery,
@@ -38,6 +39,7 @@ class BlockChainService:
             privatekey_bin: bytes,
             jsonrpc_client: JSONRPCClient,
             poll_timeout: int = DEFAULT_POLL_TIMEOUT,
+            metadata_cache_path: str = None,
     ):
         self.address_to_token = dict()
         self.address_to_discovery = dict()
@@ -53,6 +55,9 @@ class BlockChainService:
         self.private_key = privatekey_bin
         self.node_address = privatekey_to_address(privatekey_bin)
         self.poll_timeout = poll_timeout
+        # Shared by all the proxies, so the immutable contract properties are
+        # fetched once per address
+        self.metadata_cache = ContractMetadataCache(metadata_cache_path)
 
     def block_number(self) -> int:
         return self.client.block_number()
@@ -97,6 +102,9 @@ class BlockChainService:
     def get_block_header(self, block_number: int):
         return self.client.web3.getBlock(block_number, False)
 
+    def block_timestamp(self, block_number: int) -> int:
+        return self.client.web3.eth.getBlock(block_number)['timestamp']
+
     def next_block(self) -> int:
         target_block_number = self.block_number() + 1
         current_block = target_block_number
@@ -117,6 +125,7 @@ class BlockChainService:
                 self.client,
                 token_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_token[token_address]
@@ -127,6 +136,7 @@ class BlockChainService:
                 self.client,
                 channel_manager_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_manager[channel_manager_address]
@@ -141,6 +151,7 @@ class BlockChainService:
                 self.client,
                 discovery_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_discovery[discovery_address]
@@ -155,6 +166,7 @@ class BlockChainService:
                 self.client,
                 netting_channel_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
             self.address_to_nettingchannel[netting_channel_address] = channel
 
@@ -169,6 +181,7 @@ class BlockChainService:
                 self.client,
                 registry_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_registry[registry_address]
@@ -182,6 +195,7 @@ class BlockChainService:
                 self.client,
                 address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_token_network_registry[address]
@@ -195,6 +209,7 @@ class BlockChainService:
                 self.client,
                 address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_token_network[address]
@@ -208,6 +223,7 @@ class BlockChainService:
                 self.client,
                 address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
         return self.address_to_secret_registry[address]
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import socket
+import time
 from typing import Tuple
 from eth_utils import is_binary_address
 
@@ -7,6 +8,11 @@ import structlog
 
 from raiden.exceptions import UnknownAddress
 from raiden.network import proxies
+from raiden.settings import (
+    CACHE_TTL,
+    DISCOVERY_UNKNOWN_BACKOFF_MAX,
+    DISCOVERY_UNKNOWN_BACKOFF_MIN,
+)
 from raiden.utils import (
     host_port_to_endpoint,
     pex,
@@ -22,6 +28,7 @@ class Discovery:
 
     def __init__(self):
         self.nodeid_to_hostport = dict()
+        self.hostport_to_nodeid = dict()
 
     def register(self, node_address: bytes, host: str, port: int):
         if not is_binary_address(node_address):
@@ -35,7 +42,18 @@ class Discovery:
         if not isinstance(port, int):
             raise ValueError('port must be a valid number')
 
-        self.nodeid_to_hostport[node_address] = (host, port)
+        self.set_host_port(node_address, (host, port))
+
+    def set_host_port(self, node_address: bytes, host_port: Tuple[str, int]):
+        """ Update both mappings, the previous endpoint of the node is not its
+        address anymore.
+        """
+        previous = self.nodeid_to_hostport.get(node_address)
+        if previous is not None and self.hostport_to_nodeid.get(previous) == node_address:
+            del self.hostport_to_nodeid[previous]
+
+        self.nodeid_to_hostport[node_address] = host_port
+        self.hostport_to_nodeid[host_port] = node_address
 
     def get(self, node_address: bytes):
         try:
@@ -44,16 +62,22 @@ class Discovery:
             raise InvalidAddress('Unknown address {}'.format(pex(node_address)))
 
     def nodeid_by_host_port(self, host_port):
-        for nodeid, value_hostport in self.nodeid_to_hostport.items():
-            if value_hostport == host_port:
-                return nodeid
-        return None
+        return self.hostport_to_nodeid.get(host_port)
 
 
 class ContractDiscovery(Discovery):
     """ Raiden node discovery.
 
     Allows registering and looking up by endpoint (host, port) for node_address.
+
+    The endpoints are cached. `prefetch` loads all the registered endpoints
+    with a single query, afterwards the cache is kept up-to-date with the
+    `AddressRegistered` events, see `update_endpoint`. Without the events
+    the cached endpoints expire after `CACHE_TTL` seconds.
+
+    Addresses without an endpoint are cached too, with an exponential
+    backoff, so that a peer which is not registered doesn't cost a contract
+    call for every message sent to it.
     """
 
     def __init__(
@@ -66,6 +90,13 @@ class ContractDiscovery(Discovery):
         self.node_address = node_address
         self.discovery_proxy = discovery_proxy
 
+        #: Set once the endpoints are updated from the blockchain events
+        self.subscribed = False
+        self.nodeid_to_fetched_at = dict()
+
+        #: node address -> (time of the next query, backoff)
+        self.unknown_addresses = dict()
+
     def register(self, node_address: bytes, host: str, port: int):
         if node_address != self.node_address:
             raise ValueError('You can only register your own endpoint.')
@@ -96,6 +127,7 @@ class ContractDiscovery(Discovery):
         else:
             endpoint = host_port_to_endpoint(host, port)
             self.discovery_proxy.register_endpoint(node_address, endpoint)
+            self.update_endpoint(node_address, endpoint)
             log.info(
                 'registered endpoint in discovery',
                 node_address=pex(node_address),
@@ -103,15 +135,84 @@ class ContractDiscovery(Discovery):
                 port=port,
             )
 
+    def update_endpoint(self, node_address: bytes, endpoint: str):
+        """ Set the endpoint of `node_address`, e.g. from an `AddressRegistered`
+        event.
+        """
+        self.unknown_addresses.pop(node_address, None)
+        self.set_host_port(node_address, split_endpoint(endpoint))
+        self.nodeid_to_fetched_at[node_address] = time.monotonic()
+
+    def prefetch(self, node_addresses=()):
+        """ Load the endpoints of all the registered nodes.
+
+        The `node_addresses` without an endpoint are remembered as unknown,
+        these are usually the channel partners.
+        """
+        for node_address, endpoint in self.discovery_proxy.all_endpoints().items():
+            self.update_endpoint(node_address, endpoint)
+
+        for node_address in node_addresses:
+            if node_address not in self.nodeid_to_hostport:
+                self._set_unknown(node_address)
+
+        log.debug(
+            'discovery endpoints prefetched',
+            node_address=pex(self.node_address),
+            known=len(self.nodeid_to_hostport),
+            unknown=len(self.unknown_addresses),
+        )
+
+    def _set_unknown(self, node_address: bytes):
+        _, backoff = self.unknown_addresses.get(node_address, (None, None))
+
+        if backoff is None:
+            backoff = DISCOVERY_UNKNOWN_BACKOFF_MIN
+        else:
+            backoff = min(backoff * 2, DISCOVERY_UNKNOWN_BACKOFF_MAX)
+
+        self.unknown_addresses[node_address] = (time.monotonic() + backoff, backoff)
+
+    def _is_fresh(self, node_address: bytes):
+        if self.subscribed:
+            return True
+
+        fetched_at = self.nodeid_to_fetched_at.get(node_address, 0)
+        return time.monotonic() - fetched_at < CACHE_TTL
+
     def get(self, node_address: bytes):
-        endpoint = self.discovery_proxy.endpoint_by_address(node_address)
-        host_port = split_endpoint(endpoint)
-        return host_port
+        host_port = self.nodeid_to_hostport.get(node_address)
+
+        if host_port is not None and self._is_fresh(node_address):
+            return host_port
+
+        unknown = self.unknown_addresses.get(node_address)
+        if unknown is not None and time.monotonic() < unknown[0]:
+            raise UnknownAddress('Unknown address {}'.format(pex(node_address)))
+
+        try:
+            endpoint = self.discovery_proxy.endpoint_by_address(node_address)
+        except UnknownAddress:
+            self._set_unknown(node_address)
+            raise
+
+        self.update_endpoint(node_address, endpoint)
+        return self.nodeid_to_hostport[node_address]
 
     def nodeid_by_host_port(self, host_port: Tuple[str, int]):
+        node_address = self.hostport_to_nodeid.get(host_port)
+
+        if node_address is not None and self._is_fresh(node_address):
+            return node_address
+
         host, port = host_port
         endpoint = host_port_to_endpoint(host, port)
-        return self.discovery_proxy.address_by_endpoint(endpoint)
+        node_address = self.discovery_proxy.address_by_endpoint(endpoint)
+
+        if node_address is not None:
+            self.update_endpoint(node_address, endpoint)
+
+        return node_address
 
     def version(self):
         return self.discovery_proxy.version()
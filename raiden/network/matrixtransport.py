@@ -31,12 +31,14 @@ from raiden.exceptions import (
 from raiden.messages import (
     decode as message_from_bytes,
     Delivered,
+    DeliveredBatch,
     from_dict as message_from_dict,
     Ping,
     SignedMessage,
     Pong,
     Message,
 )
+from raiden.network.transport.delivered import DeliveredCoalescer
 from raiden.network.transport.udp import udp_utils
 from raiden.network.utils import get_http_rtt
 from raiden.raiden_service import RaidenService
@@ -102,6 +104,14 @@ class MatrixTransport:
         queueids_to_queues: Dict[Tuple[typing.Address, str], List[Event]],
     ):
         self._raiden_service = raiden_service
+        self._delivered_coalescer = DeliveredCoalescer(
+            raiden_service.sign,
+            lambda receiver, message: self._send_immediate(
+                receiver,
+                json.dumps(message.to_dict()),
+            ),
+            raiden_service.config['transport']['delivered_delay'],
+        )
         room_alias_re = self._make_room_alias(
             '(?P<peer1>0x[a-zA-Z0-9]{40})',
             '(?P<peer2>0x[a-zA-Z0-9]{40})',
@@ -177,7 +187,7 @@ class MatrixTransport:
             raise ValueError('Invalid address {}'.format(pex(receiver_address)))
 
         # These are not protocol messages, but transport specific messages
-        if isinstance(message, (Delivered, Ping, Pong)):
+        if isinstance(message, (Delivered, DeliveredBatch, Ping, Pong)):
             raise ValueError(
                 'Do not use send_async for {} messages'.format(message.__class__.__name__),
             )
@@ -197,6 +207,7 @@ class MatrixTransport:
     def stop_and_wait(self):
         if self._running:
             self._running = False
+            self._delivered_coalescer.flush_all()
             self._client.set_presence_state(UserPresence.OFFLINE.value)
             self._client.stop_listener_thread()
 
@@ -398,7 +409,10 @@ class MatrixTransport:
             message.sender = peer_address
 
         if isinstance(message, Delivered):
-            self._receive_delivered(message)
+            self._receive_delivered(message.sender, message.delivered_message_identifier)
+        elif isinstance(message, DeliveredBatch):
+            for message_identifier in message.delivered_message_identifiers:
+                self._receive_delivered(message.sender, message_identifier)
         elif isinstance(message, Ping):
             self.log.warning(
                 'Not required Ping received',
@@ -412,14 +426,14 @@ class MatrixTransport:
                 message=data,
             )
 
-    def _receive_delivered(self, delivered: Delivered):
+    def _receive_delivered(self, sender: typing.Address, message_identifier: int):
         # FIXME: The signature doesn't seem to be verified - check in UDPTransport as well
         self._raiden_service.handle_state_change(
-            ReceiveDelivered(delivered.delivered_message_identifier),
+            ReceiveDelivered(message_identifier),
         )
 
         async_result = self._messageids_to_asyncresult.pop(
-            delivered.delivered_message_identifier,
+            message_identifier,
             None,
         )
 
@@ -428,15 +442,15 @@ class MatrixTransport:
             self.log.debug(
                 'DELIVERED MESSAGE RECEIVED',
                 node=pex(self._raiden_service.address),
-                receiver=pex(delivered.sender),
-                message_identifier=delivered.delivered_message_identifier,
+                receiver=pex(sender),
+                message_identifier=message_identifier,
             )
 
         else:
             self.log.debug(
                 'DELIVERED MESSAGE UNKNOWN',
                 node=pex(self._raiden_service.address),
-                message_identifier=delivered.delivered_message_identifier,
+                message_identifier=message_identifier,
             )
 
     def _receive_message(self, message):
@@ -454,9 +468,7 @@ class MatrixTransport:
                 #       which means that message order is important which isn't guaranteed between
                 #       federated servers.
                 #       See: https://matrix.org/docs/spec/client_server/r0.3.0.html#id57
-                delivered_message = Delivered(message.message_identifier)
-                self._raiden_service.sign(delivered_message)
-                self._send_immediate(message.sender, json.dumps(delivered_message.to_dict()))
+                self._delivered_coalescer.delivered(message.sender, message.message_identifier)
 
         except (InvalidAddress, UnknownAddress, UnknownTokenAddress):
             self.log.warn('Exception while processing message', exc_info=True)
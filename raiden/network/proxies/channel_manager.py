@@ -21,8 +21,8 @@ from raiden.constants import (
     NETTINGCHANNEL_SETTLE_TIMEOUT_MIN,
     NETTINGCHANNEL_SETTLE_TIMEOUT_MAX,
 )
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
-from raiden.network.rpc.client import check_address_has_code
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
 )
@@ -50,6 +50,7 @@ class ChannelManager:
             jsonrpc_client,
             manager_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         # pylint: disable=too-many-arguments
         contract = jsonrpc_client.new_contract(
@@ -62,11 +63,12 @@ class ChannelManager:
         if not is_binary_address(manager_address):
             raise ValueError('manager_address must be a valid address')
 
-        check_address_has_code(jsonrpc_client, manager_address, 'Channel Manager')
-
-        CONTRACT_MANAGER.check_contract_version(
-            self.version(),
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(
+            jsonrpc_client,
+            manager_address,
             CONTRACT_CHANNEL_MANAGER,
+            self.version,
         )
 
         self.address = manager_address
@@ -76,7 +78,11 @@ class ChannelManager:
 
     def token_address(self) -> Address:
         """ Return the token of this manager. """
-        token_address = self.proxy.contract.functions.tokenAddress().call()
+        token_address = self.metadata_cache.get(
+            self.address,
+            'tokenAddress',
+            self.proxy.contract.functions.tokenAddress().call,
+        )
         return to_canonical_address(token_address)
 
     def new_netting_channel(self, other_peer: Address, settle_timeout: int) -> Address:
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from binascii import unhexlify
+from typing import Dict
 
 from eth_utils import (
     to_canonical_address,
@@ -8,19 +9,22 @@ from eth_utils import (
     to_normalized_address,
 )
 
+from web3.utils.filters import Filter
+
 from raiden.blockchain.abi import (
     CONTRACT_MANAGER,
     CONTRACT_ENDPOINT_REGISTRY,
+    EVENT_ADDRESS_REGISTERED,
 )
 from raiden.exceptions import (
     TransactionThrew,
     UnknownAddress,
 )
-from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.transactions import check_transaction_threw
 from raiden.settings import DEFAULT_POLL_TIMEOUT
 from raiden.constants import NULL_ADDRESS
-from raiden.network.rpc.smartcontract_proxy import ContractProxy
+from raiden.network.rpc.smartcontract_proxy import ContractProxy, event_decoder_for
 from raiden.utils import pex
 
 
@@ -35,6 +39,7 @@ class Discovery:
             jsonrpc_client,
             discovery_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         contract = jsonrpc_client.new_contract(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_ENDPOINT_REGISTRY),
@@ -45,11 +50,12 @@ class Discovery:
         if not is_binary_address(discovery_address):
             raise ValueError('discovery_address must be a valid address')
 
-        check_address_has_code(jsonrpc_client, discovery_address, 'Discovery')
-
-        CONTRACT_MANAGER.check_contract_version(
-            self.version(),
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(
+            jsonrpc_client,
+            discovery_address,
             CONTRACT_ENDPOINT_REGISTRY,
+            self.version,
         )
 
         self.address = discovery_address
@@ -94,5 +100,37 @@ class Discovery:
 
         return to_canonical_address(address)
 
+    def all_endpoints(self, from_block=0, to_block='latest') -> Dict[bytes, str]:
+        """ Return the endpoints of all the registered nodes, using the
+        `AddressRegistered` events instead of a contract call per node.
+        """
+        events = self.client.get_filter_events(
+            self.address,
+            topics=[CONTRACT_MANAGER.get_event_id(EVENT_ADDRESS_REGISTERED)],
+            from_block=from_block,
+            to_block=to_block,
+        )
+
+        decoder = event_decoder_for(CONTRACT_MANAGER.get_contract_abi(CONTRACT_ENDPOINT_REGISTRY))
+
+        # The events are ordered, the last registration of a node is its
+        # current endpoint
+        endpoints = dict()
+        for event in events:
+            decoded_event = decoder.decode_internal(event)
+            endpoints[decoded_event['eth_address']] = decoded_event['args']['socket']
+
+        return endpoints
+
+    def addressregistered_filter(self, from_block=None, to_block=None) -> Filter:
+        topics = [CONTRACT_MANAGER.get_event_id(EVENT_ADDRESS_REGISTERED)]
+
+        return self.client.new_filter(
+            self.address,
+            topics=topics,
+            from_block=from_block,
+            to_block=to_block,
+        )
+
     def version(self):
         return self.proxy.contract.functions.contract_version().call()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+
+import structlog
+
+from raiden.blockchain.abi import CONTRACT_MANAGER
+from raiden.network.rpc.client import check_address_has_code
+from raiden.utils import pex
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class ContractMetadataCache:
+    """ Cache for the contract properties that never change.
+
+    The proxies are built often, and each one used to check the contract
+    code and version, and to query values like the token address or the
+    settle timeout again on every use. These are fixed once a contract is
+    deployed, so the node is asked only once per address.
+
+    Contracts that can be removed, e.g. a settled netting channel, must not
+    cache the code check.
+
+    If `path` is given the cache is persisted and reused across restarts,
+    the entries are only reused on the chain with the same `genesis_hash`.
+    The file is written by `save`, which is called when the node stops.
+    """
+
+    def __init__(self, path: str = None, genesis_hash: bytes = None):
+        self.path = None
+        self.genesis_hash = None
+        self.values = dict()
+        self.verified = set()
+        self.dirty = False
+
+        if path is not None:
+            self.load(path, genesis_hash)
+
+    def load(self, path: str, genesis_hash: bytes = None):
+        """ Use `path` to persist the cache, merging the entries it has if
+        these were saved for the chain with `genesis_hash`.
+        """
+        self.path = path
+        self.genesis_hash = genesis_hash
+
+        try:
+            with open(path, 'rb') as handler:
+                saved_genesis_hash, values, verified = pickle.load(handler)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            log.warning('contract metadata cache is corrupted, ignoring it', path=path)
+            return
+
+        # e.g. a development chain redeployed with the same network id
+        if saved_genesis_hash != genesis_hash:
+            log.warning('contract metadata cache is from another chain, ignoring it', path=path)
+            return
+
+        self.values.update(values)
+        self.verified.update(verified)
+
+    def save(self):
+        """ Write the cache to `path` if there are new entries. """
+        if self.path is None or not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        # write to a temporary file and rename it, so a crash never leaves a
+        # truncated cache behind
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as handler:
+            pickle.dump((self.genesis_hash, self.values, self.verified), handler)
+        os.replace(temporary_path, self.path)
+
+        self.dirty = False
+
+    def get(self, address: bytes, name: str, fetch):
+        """ Return the value `name` of the contract at `address`, calling
+        `fetch` only if it's not cached.
+        """
+        key = (address, name)
+
+        if key not in self.values:
+            self.values[key] = fetch()
+            self.dirty = True
+
+        return self.values[key]
+
+    def verify(
+            self,
+            client,
+            address: bytes,
+            contract_name: str,
+            get_version=None,
+            check_code: bool = True,
+    ):
+        """ Check once that there is code at `address` and that the contract
+        version matches the ABI used by this node.
+
+        The check is done again if the node expects another version, e.g.
+        after an upgrade.
+
+        Raises:
+            AddressWithoutCode: If there is no code at `address`.
+            ContractVersionMismatch: If the version is not supported.
+        """
+        expected_version = None
+        if get_version is not None:
+            expected_version = CONTRACT_MANAGER.get_version(contract_name)
+
+        key = (address, contract_name, expected_version)
+
+        if key in self.verified:
+            return
+
+        if check_code:
+            check_address_has_code(client, address, contract_name)
+
+        if get_version is not None:
+            CONTRACT_MANAGER.check_contract_version(get_version(), contract_name)
+
+        log.debug('contract verified', address=pex(address), contract=contract_name)
+        self.verified.add(key)
+        self.dirty = True
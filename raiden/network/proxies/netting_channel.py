@@ -18,6 +18,7 @@ from raiden.exceptions import (
 )
 from raiden import messages
 from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.proxies.token import Token
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
 from raiden.exceptions import AddressWithoutCode
@@ -37,6 +38,10 @@ from raiden.utils import typing
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
+# Multiplier applied to the estimated gas for an unlock sent by
+# `batch_unlock`.
+UNLOCK_GAS_FACTOR = 2
+
 
 class NettingChannel:
     def __init__(
@@ -44,6 +49,7 @@ class NettingChannel:
             jsonrpc_client,
             channel_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         contract = jsonrpc_client.new_contract(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_NETTING_CHANNEL),
@@ -58,9 +64,16 @@ class NettingChannel:
         self.channel_operations_lock = RLock()
         self.client = jsonrpc_client
         self.node_address = privatekey_to_address(self.client.privkey)
-        CONTRACT_MANAGER.check_contract_version(
-            self.proxy.contract.functions.contract_version().call(),
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+
+        # The code is checked below, it can not be cached since the contract
+        # is removed once the channel is settled.
+        self.metadata_cache.verify(
+            self.client,
+            self.address,
             CONTRACT_NETTING_CHANNEL,
+            self.proxy.contract.functions.contract_version().call,
+            check_code=False,
         )
 
         # check we are a participant of the given channel
@@ -88,10 +101,18 @@ class NettingChannel:
     def token_address(self):
         """ Returns the type of token that can be transferred by the channel.
 
+        The value never changes and is cached, so once it's known it is
+        returned even if the channel was settled since.
+
         Raises:
-            AddressWithoutCode: If the channel was settled prior to the call.
+            AddressWithoutCode: If the channel was settled before the value
+                was cached.
         """
-        address = self._call_and_check_result('tokenAddress')
+        address = self.metadata_cache.get(
+            self.address,
+            'tokenAddress',
+            lambda: self._call_and_check_result('tokenAddress'),
+        )
         return to_canonical_address(address)
 
     def detail(self):
@@ -133,17 +154,27 @@ class NettingChannel:
         """ Returns the netting channel settle_timeout.
 
         Raises:
-            AddressWithoutCode: If the channel was settled prior to the call.
+            AddressWithoutCode: If the channel was settled before the value
+                was cached.
         """
-        return self._call_and_check_result('settleTimeout')
+        return self.metadata_cache.get(
+            self.address,
+            'settleTimeout',
+            lambda: self._call_and_check_result('settleTimeout'),
+        )
 
     def opened(self):
         """ Returns the block in which the channel was created.
 
         Raises:
-            AddressWithoutCode: If the channel was settled prior to the call.
+            AddressWithoutCode: If the channel was settled before the value
+                was cached.
         """
-        return self._call_and_check_result('opened')
+        return self.metadata_cache.get(
+            self.address,
+            'opened',
+            lambda: self._call_and_check_result('opened'),
+        )
 
     def closed(self):
         """ Returns the block in which the channel was closed or 0.
@@ -201,6 +232,7 @@ class NettingChannel:
             self.client,
             token_address,
             self.poll_timeout,
+            self.metadata_cache,
         )
         current_balance = token.balance_of(self.node_address)
 
@@ -422,6 +454,78 @@ class NettingChannel:
             lock=unlock_proof,
         )
 
+    def batch_unlock(self, unlock_proofs):
+        """ Unlock all the locks with a single wait for the transactions.
+
+        The gas for each unlock is estimated first, the locks for which the
+        estimation fails, e.g. because they were already unlocked, are
+        skipped. The remaining transactions are sent together and the
+        receipts are checked once all of them are mined.
+
+        Raises:
+            TransactionThrew: If any of the unlocks failed, after all the
+                other unlocks were mined.
+        """
+        log.info(
+            'batch unlock called',
+            node=pex(self.node_address),
+            contract=pex(self.address),
+            locks=len(unlock_proofs),
+        )
+
+        gas_limit = self.client.gaslimit()
+        pending = list()
+        for unlock_proof in unlock_proofs:
+            if isinstance(unlock_proof.lock_encoded, messages.Lock):
+                raise ValueError('unlock must be called with a lock encoded `.as_bytes`')
+
+            arguments = (
+                unlock_proof.lock_encoded,
+                b''.join(unlock_proof.merkle_proof),
+                unlock_proof.secret,
+            )
+
+            gas = self.proxy.estimate_gas('unlock', *arguments)
+            if gas is None:
+                log.warning(
+                    'unlock would fail, skipping it',
+                    node=pex(self.node_address),
+                    contract=pex(self.address),
+                    lock=unlock_proof,
+                )
+                continue
+
+            # The estimation is for the current state, give some room for the
+            # state changes done by the other unlocks.
+            startgas = min(gas * UNLOCK_GAS_FACTOR, gas_limit)
+            transaction_hash = self.proxy.transact('unlock', *arguments, startgas=startgas)
+            pending.append((unlock_proof, transaction_hash))
+
+        failed_receipt = None
+        for unlock_proof, transaction_hash in pending:
+            self.client.poll(unhexlify(transaction_hash), timeout=self.poll_timeout)
+            receipt_or_none = check_transaction_threw(self.client, transaction_hash)
+
+            if receipt_or_none:
+                log.critical(
+                    'unlock failed',
+                    node=pex(self.node_address),
+                    contract=pex(self.address),
+                    lock=unlock_proof,
+                )
+                failed_receipt = failed_receipt or receipt_or_none
+            else:
+                log.info(
+                    'unlock successful',
+                    node=pex(self.node_address),
+                    contract=pex(self.address),
+                    lock=unlock_proof,
+                )
+
+        if failed_receipt:
+            self._check_exists()
+            raise TransactionThrew('unlock', failed_receipt)
+
     def settle(self):
         """ Settle the channel.
 
@@ -29,6 +29,7 @@ from raiden.settings import (
     DEFAULT_POLL_TIMEOUT,
 )
 from raiden.network.proxies.channel_manager import ChannelManager
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.client import check_address_has_code
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
@@ -44,6 +45,7 @@ class Registry:
             jsonrpc_client,
             registry_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         # pylint: disable=too-many-arguments
         contract = jsonrpc_client.new_contract(
@@ -55,11 +57,12 @@ class Registry:
         if not is_binary_address(registry_address):
             raise ValueError('registry_address must be a valid address')
 
-        check_address_has_code(jsonrpc_client, registry_address, 'Registry')
-
-        CONTRACT_MANAGER.check_contract_version(
-            self.proxy.contract.functions.contract_version().call(),
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(
+            jsonrpc_client,
+            registry_address,
             CONTRACT_REGISTRY,
+            self.proxy.contract.functions.contract_version().call,
         )
 
         self.address = registry_address
@@ -169,6 +172,7 @@ class Registry:
                 self.client,
                 manager_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
             token_address = manager.token_address()
@@ -189,7 +193,8 @@ class Registry:
             raise ValueError('token_address must be a valid address')
 
         if token_address not in self.token_to_channelmanager:
-            check_address_has_code(self.client, token_address)  # check that the token exists
+            # check that the token exists
+            self.metadata_cache.verify(self.client, token_address, 'Token')
             manager_address = self.manager_address_by_token(token_address)
 
             if manager_address is None:
@@ -201,6 +206,7 @@ class Registry:
                 self.client,
                 manager_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
             self.token_to_channelmanager[token_address] = manager
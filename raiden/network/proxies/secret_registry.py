@@ -16,7 +16,7 @@ from raiden_contracts.constants import (
     EVENT_SECRET_REVEALED,
 )
 from raiden.exceptions import TransactionThrew, InvalidAddress
-from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
 )
@@ -37,13 +37,15 @@ class SecretRegistry:
             jsonrpc_client,
             secret_registry_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         # pylint: disable=too-many-arguments
 
         if not is_binary_address(secret_registry_address):
             raise InvalidAddress('Expected binary address format for secret registry')
 
-        check_address_has_code(jsonrpc_client, secret_registry_address, 'Registry')
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(jsonrpc_client, secret_registry_address, 'Registry')
 
         proxy = jsonrpc_client.new_contract_proxy(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_SECRET_REGISTRY),
@@ -8,7 +8,7 @@ from raiden.blockchain.abi import (
     CONTRACT_HUMAN_STANDARD_TOKEN,
 )
 from raiden.exceptions import TransactionThrew
-from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
 )
@@ -25,6 +25,7 @@ class Token:
             jsonrpc_client,
             token_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         contract = jsonrpc_client.new_contract(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_HUMAN_STANDARD_TOKEN),
@@ -35,7 +36,8 @@ class Token:
         if not is_binary_address(token_address):
             raise ValueError('token_address must be a valid address')
 
-        check_address_has_code(jsonrpc_client, token_address, 'Token')
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(jsonrpc_client, token_address, 'Token')
 
         self.address = token_address
         self.client = jsonrpc_client
@@ -26,7 +26,7 @@ from raiden.constants import (
     NETTINGCHANNEL_SETTLE_TIMEOUT_MIN,
     NETTINGCHANNEL_SETTLE_TIMEOUT_MAX,
 )
-from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.proxies.token import Token
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
@@ -59,13 +59,15 @@ class TokenNetwork:
             jsonrpc_client,
             manager_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         # pylint: disable=too-many-arguments
 
         if not is_binary_address(manager_address):
             raise InvalidAddress('Expected binary address format for token nework')
 
-        check_address_has_code(jsonrpc_client, manager_address, 'Channel Manager')
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(jsonrpc_client, manager_address, CONTRACT_TOKEN_NETWORK)
 
         proxy = jsonrpc_client.new_contract_proxy(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_TOKEN_NETWORK),
@@ -110,7 +112,12 @@ class TokenNetwork:
 
     def token_address(self) -> typing.Address:
         """ Return the token of this manager. """
-        return to_canonical_address(self.proxy.functions.token().call())
+        token_address = self.metadata_cache.get(
+            self.address,
+            'token',
+            self.proxy.functions.token().call,
+        )
+        return to_canonical_address(token_address)
 
     def new_netting_channel(
             self,
@@ -352,6 +359,7 @@ class TokenNetwork:
             self.client,
             token_address,
             self.poll_timeout,
+            self.metadata_cache,
         )
         current_balance = token.balance_of(self.node_address)
         current_deposit = self.detail_participant(self.node_address, partner)['deposit']
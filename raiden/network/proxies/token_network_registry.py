@@ -34,7 +34,7 @@ from raiden.settings import (
     DEFAULT_POLL_TIMEOUT,
 )
 from raiden.network.proxies.token_network import TokenNetwork
-from raiden.network.rpc.client import check_address_has_code
+from raiden.network.proxies.metadata_cache import ContractMetadataCache
 from raiden.network.rpc.transactions import (
     check_transaction_threw,
 )
@@ -48,13 +48,19 @@ class TokenNetworkRegistry:
             jsonrpc_client,
             registry_address,
             poll_timeout=DEFAULT_POLL_TIMEOUT,
+            metadata_cache=None,
     ):
         # pylint: disable=too-many-arguments
 
         if not is_binary_address(registry_address):
             raise InvalidAddress('Expected binary address format for token network registry')
 
-        check_address_has_code(jsonrpc_client, registry_address, CONTRACT_TOKEN_NETWORK_REGISTRY)
+        self.metadata_cache = metadata_cache or ContractMetadataCache()
+        self.metadata_cache.verify(
+            jsonrpc_client,
+            registry_address,
+            CONTRACT_TOKEN_NETWORK_REGISTRY,
+        )
 
         proxy = jsonrpc_client.new_contract_proxy(
             CONTRACT_MANAGER.get_contract_abi(CONTRACT_TOKEN_NETWORK_REGISTRY),
@@ -131,6 +137,7 @@ class TokenNetworkRegistry:
             self.client,
             token_network_address,
             self.poll_timeout,
+            self.metadata_cache,
         )
 
         log.info(
@@ -168,6 +175,7 @@ class TokenNetworkRegistry:
                 self.client,
                 token_network_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
             token_address = token_network.token_address()
@@ -188,7 +196,8 @@ class TokenNetworkRegistry:
             raise InvalidAddress('Expected binary address format for token')
 
         if token_address not in self.token_to_tokennetwork:
-            check_address_has_code(self.client, token_address)  # check that the token exists
+            # check that the token exists
+            self.metadata_cache.verify(self.client, token_address, 'Token')
             token_network_address = self.get_token_network(token_address)
 
             if token_network_address is None:
@@ -200,6 +209,7 @@ class TokenNetworkRegistry:
                 self.client,
                 token_network_address,
                 self.poll_timeout,
+                self.metadata_cache,
             )
 
             self.token_to_tokennetwork[token_address] = token_network
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import warnings
-import time
 import os
 import copy
 from binascii import unhexlify
@@ -11,15 +10,12 @@ from web3 import Web3, HTTPProvider
 from web3.middleware import geth_poa_middleware
 from web3.utils.filters import Filter
 from eth_utils import (
-    to_int,
     to_checksum_address,
     to_canonical_address,
     remove_0x_prefix,
     to_normalized_address,
 )
 import gevent
-import cachetools
-from gevent.lock import Semaphore
 import structlog
 
 from raiden.utils import typing
@@ -28,7 +24,7 @@ from raiden.exceptions import (
     EthNodeCommunicationError,
     RaidenShuttingDown,
 )
-from raiden.settings import GAS_PRICE, GAS_LIMIT, RPC_CACHE_TTL
+from raiden.settings import GAS_PRICE, GAS_LIMIT
 from raiden.utils import (
     data_encoder,
     privatekey_to_address,
@@ -37,6 +33,7 @@ from raiden.utils import (
 )
 from raiden.utils.typing import Address
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
+from raiden.network.rpc.transaction_manager import TransactionManager
 from raiden.utils.solc import (
     solidity_unresolved_symbols,
     solidity_library_symbol,
@@ -200,25 +197,14 @@ class JSONRPCClient:
         # gets constructed before the RaidenService Object.
         self.stop_event = None
 
-        self.nonce_last_update = 0
-        self.nonce_available_value = None
-        self.nonce_lock = Semaphore()
-        self.nonce_update_interval = nonce_update_interval
-        self.nonce_offset = nonce_offset
         self.given_gas_price = gasprice
-
-        cache = cachetools.TTLCache(
-            maxsize=1,
-            ttl=RPC_CACHE_TTL,
-        )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.gaslimit = cache_wrapper(self._gaslimit)
-        cache = cachetools.TTLCache(
-            maxsize=1,
-            ttl=RPC_CACHE_TTL,
+        #: The web3 contract classes by ABI, creating one parses the whole ABI
+        self.contract_factories = dict()
+        self.transaction_manager = TransactionManager(
+            self,
+            nonce_update_interval=nonce_update_interval,
+            nonce_offset=nonce_offset,
         )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.gasprice = cache_wrapper(self._gasprice)
 
         # web3
         self.web3: Web3 = Web3(HTTPProvider(endpoint))
@@ -236,46 +222,17 @@ class JSONRPCClient:
         """ Return the most recent block. """
         return self.web3.eth.blockNumber
 
-    def nonce_needs_update(self):
-        if self.nonce_available_value is None:
-            return True
-
-        now = time.time()
-
-        # Python's 2.7 time is not monotonic and it's affected by clock resets,
-        # force an update.
-        if self.nonce_last_update > now:
-            return True
-
-        return now - self.nonce_last_update > self.nonce_update_interval
-
-    def nonce_update_from_node(self):
-        nonce = -2
-        nonce_available_value = self.nonce_available_value or -1
-
-        # Wait until all tx are registered as pending
-        while nonce < nonce_available_value:
-            pending_transactions = self.web3.eth.getTransactionCount(
-                to_checksum_address(self.sender),
-            )
-            nonce = pending_transactions + self.nonce_offset
-
-            log.debug(
-                'updated nonce from server',
-                server=nonce,
-                local=nonce_available_value,
-            )
-
-        self.nonce_last_update = time.time()
-        self.nonce_available_value = nonce
-
     def nonce(self):
-        with self.nonce_lock:
-            if self.nonce_needs_update():
-                self.nonce_update_from_node()
+        """ Reserve a nonce, the caller must give it back with
+        `transaction_manager.release_nonce` if the transaction is not sent.
+        """
+        return self.transaction_manager.reserve_nonce()
+
+    def gasprice(self) -> int:
+        return self.transaction_manager.gas_price()
 
-            self.nonce_available_value += 1
-            return self.nonce_available_value - 1
+    def gaslimit(self) -> int:
+        return self.transaction_manager.gas_limit()
 
     def inject_stop_event(self, event):
         self.stop_event = event
@@ -312,11 +269,27 @@ class JSONRPCClient:
         )
 
     def new_contract(self, contract_interface: Dict, contract_address: Address):
-        return self.web3.eth.contract(
-            abi=contract_interface,
+        return self.contract_factory(contract_interface)(
             address=to_checksum_address(contract_address),
         )
 
+    def contract_factory(self, contract_interface: Dict):
+        """ Return the web3 contract class for `contract_interface`.
+
+        The ABIs come from the contract manager, which always returns the
+        same object for a contract, so the class is cached by identity.
+        """
+        key = id(contract_interface)
+        cached = self.contract_factories.get(key)
+
+        if cached is not None and cached[0] is contract_interface:
+            return cached[1]
+
+        factory = self.web3.eth.contract(abi=contract_interface)
+        # keep a reference to the ABI, so its id is not reused
+        self.contract_factories[key] = (contract_interface, factory)
+        return factory
+
     def deploy_solidity_contract(
             self,  # pylint: disable=too-many-locals
             contract_name,
@@ -395,7 +368,7 @@ class JSONRPCClient:
                 transaction_hash = unhexlify(transaction_hash_hex)
 
                 self.poll(transaction_hash, timeout=timeout)
-                receipt = self.web3.eth.getTransactionReceipt(transaction_hash)
+                receipt = self.transaction_receipt(transaction_hash)
 
                 contract_address = receipt['contractAddress']
                 # remove the hexadecimal prefix 0x from the address
@@ -428,7 +401,7 @@ class JSONRPCClient:
         transaction_hash = unhexlify(transaction_hash_hex)
 
         self.poll(transaction_hash, timeout=timeout)
-        receipt = self.web3.eth.getTransactionReceipt(transaction_hash)
+        receipt = self.transaction_receipt(transaction_hash)
         contract_address = receipt['contractAddress']
 
         deployed_code = self.web3.eth.getCode(to_checksum_address(contract_address))
@@ -461,21 +434,43 @@ class JSONRPCClient:
         if to == to_canonical_address(NULL_ADDRESS):
             warnings.warn('For contract creation the empty string must be used.')
 
-        transaction = dict(
-            nonce=self.nonce(),
-            gasPrice=self.gasprice(),
-            gas=self.check_startgas(startgas),
-            value=value,
-            data=data,
-        )
+        # The nonce is handed out locally, concurrent senders only serialize
+        # on the reservation and the transactions are submitted in parallel.
+        nonce = self.nonce()
+
+        try:
+            transaction = dict(
+                nonce=nonce,
+                gasPrice=self.gasprice(),
+                gas=self.check_startgas(startgas),
+                value=value,
+                data=data,
+            )
 
-        # add the to address if not deploying a contract
-        if to != b'':
-            transaction['to'] = to_checksum_address(to)
+            # add the to address if not deploying a contract
+            if to != b'':
+                transaction['to'] = to_checksum_address(to)
 
-        signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+            signed_txn = self.web3.eth.account.signTransaction(transaction, self.privkey)
+        except BaseException:
+            # The nonce was not used, otherwise all the following
+            # transactions would be stuck waiting for it.
+            self.transaction_manager.release_nonce(nonce)
+            raise
 
-        result = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        try:
+            result = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        except ValueError as e:
+            # The node answered with an error, the transaction was rejected
+            self.transaction_manager.rejected(nonce, e)
+            raise
+        except BaseException:
+            # e.g. a timeout or the greenlet was killed, the node may have
+            # accepted the transaction so the nonce can not be reused
+            self.transaction_manager.send_failed(nonce)
+            raise
+
+        self.transaction_manager.sent(result, nonce)
         encoded_result = encode_hex(result)
         return remove_0x_prefix(encoded_result)
 
@@ -505,50 +500,16 @@ class JSONRPCClient:
                 'transaction_hash length must be 32 (it might be hex encoded)',
             )
 
-        transaction_hash = data_encoder(transaction_hash)
-
         deadline = None
         if timeout:
             deadline = gevent.Timeout(timeout)
             deadline.start()
 
         try:
-            # used to check if the transaction was removed, this could happen
-            # if gas price is too low:
-            #
-            # > Transaction (acbca3d6) below gas price (tx=1 Wei ask=18
-            # > Shannon). All sequential txs from this address(7d0eae79)
-            # > will be ignored
-            #
-            last_result = None
-
-            while True:
-                # Could return None for a short period of time, until the
-                # transaction is added to the pool
-                transaction = self.web3.eth.getTransaction(transaction_hash)
-
-                # if the transaction was added to the pool and then removed
-                if transaction is None and last_result is not None:
-                    raise Exception('invalid transaction, check gas price')
-
-                # the transaction was added to the pool and mined
-                if transaction and transaction['blockNumber'] is not None:
-                    break
-
-                last_result = transaction
-
-                gevent.sleep(.5)
-
-            if confirmations:
-                # this will wait for both APPLIED and REVERTED transactions
-                transaction_block = to_int(hexstr=transaction['blockNumber'])
-                confirmation_block = transaction_block + confirmations
-
-                block_number = self.block_number()
-
-                while block_number < confirmation_block:
-                    gevent.sleep(.5)
-                    block_number = self.block_number()
+            # All pending transactions are checked together once per block by
+            # the transaction manager, which also detects transactions that
+            # were dropped by the node.
+            self.transaction_manager.mined(transaction_hash, confirmations).get()
 
         except gevent.Timeout:
             raise Exception('timeout when polling for transaction')
@@ -557,6 +518,12 @@ class JSONRPCClient:
             if deadline:
                 deadline.cancel()
 
+    def transaction_receipt(self, transaction_hash):
+        """ Return the receipt of a mined transaction, the receipts fetched by
+        `poll` are reused.
+        """
+        return self.transaction_manager.receipt(transaction_hash)
+
     def new_filter(
             self,
             contract_address: Address,
@@ -572,6 +539,14 @@ class JSONRPCClient:
             'topics': topics,
         })
 
+    def new_block_filter(self) -> Filter:
+        """ Create a filter in the ethereum node for new blocks. """
+        return self.web3.eth.filter('latest')
+
+    def uninstall_filter(self, filter_id: str) -> bool:
+        """ Remove a filter from the ethereum node. """
+        return self.web3.eth.uninstallFilter(filter_id)
+
     def get_filter_events(
             self,
             contract_address: Address,
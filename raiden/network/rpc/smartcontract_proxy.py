@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+from collections import namedtuple
 from typing import Dict, List
 
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry as abi_registry
 from eth_utils import (
+    to_bytes,
     to_canonical_address,
     decode_hex,
     to_checksum_address,
@@ -9,24 +13,232 @@ from eth_utils import (
 )
 from web3.utils.contracts import encode_transaction_data, find_matching_fn_abi
 from web3.utils.abi import get_abi_input_types, filter_by_type
-from web3.utils.events import get_event_data
+from web3.utils.events import get_event_abi_types_for_decoding, get_event_data
 from web3.contract import Contract
 
+# Types for which the decoded value is final, i.e. web3 does not apply any
+# normalization besides checksumming addresses and decoding strings.
+SIMPLE_DECODER_TYPES = ('address', 'bool', 'string', 'bytes')
+
+CompiledEvent = namedtuple(
+    'CompiledEvent',
+    (
+        'event_abi',
+        'name',
+        'topic_names',
+        'topic_types',
+        'topic_decoders',
+        'data_names',
+        'data_types',
+        'data_decoder',
+        'is_simple',
+    ),
+)
+
+
+def is_simple_type(abi_type: str) -> bool:
+    if '[' in abi_type:
+        return False
+
+    return (
+        abi_type in SIMPLE_DECODER_TYPES or
+        abi_type.startswith(('uint', 'int', 'bytes'))
+    )
+
+
+def compile_event_abi(event_abi: Dict) -> CompiledEvent:
+    """ Precompute everything needed to decode a log of `event_abi`, so that
+    the per-log work is only the decoding of the topics and data.
+    """
+    topic_inputs = [arg for arg in event_abi['inputs'] if arg['indexed']]
+    data_inputs = [arg for arg in event_abi['inputs'] if not arg['indexed']]
+
+    topic_types = list(get_event_abi_types_for_decoding(topic_inputs))
+    data_types = list(get_event_abi_types_for_decoding(data_inputs))
+
+    is_simple = all(is_simple_type(abi_type) for abi_type in topic_types + data_types)
+
+    topic_decoders = None
+    data_decoder = None
+    if is_simple:
+        topic_decoders = [abi_registry.get_decoder(abi_type) for abi_type in topic_types]
+        data_decoder = TupleDecoder(decoders=[
+            abi_registry.get_decoder(abi_type)
+            for abi_type in data_types
+        ])
+
+    return CompiledEvent(
+        event_abi,
+        event_abi['name'],
+        [arg['name'] for arg in topic_inputs],
+        topic_types,
+        topic_decoders,
+        [arg['name'] for arg in data_inputs],
+        data_types,
+        data_decoder,
+        is_simple,
+    )
+
+
+def normalize_topic(topic) -> bytes:
+    if isinstance(topic, str):
+        return decode_hex(topic)
+    elif isinstance(topic, int):
+        return decode_hex(hex(topic))
+    return topic
+
+
+def normalize_argument(abi_type, value, internal):
+    if abi_type == 'address':
+        if internal:
+            return decode_hex(value)
+        return to_checksum_address(value)
+
+    if abi_type == 'string':
+        return value.decode('utf8', 'backslashreplace')
+
+    return value
+
+
+class EventDecoder:
+    """ Decoder for the logs of a single contract ABI.
+
+    The event ABIs are compiled once and indexed by their topic, so decoding a
+    log is a dictionary lookup followed by the decoding of the topics and the
+    data with prebuilt decoders.
+
+    Logs can be decoded to two representations:
+
+    - `decode` returns the same data as `web3.utils.events.get_event_data`,
+      with addresses in checksummed format. This is used for data exposed to
+      users.
+    - `decode_internal` returns the internal representation, where all
+      addresses are in binary format and are also available as top-level keys
+      of the event data. This is used to create state changes.
+    """
+
+    def __init__(self, abi: List[Dict]):
+        self.abi = abi
+        self.topic_to_event = {
+            event_abi_to_log_topic(event_abi): compile_event_abi(event_abi)
+            for event_abi in filter_by_type('event', abi)
+            if not event_abi.get('anonymous', False)
+        }
+
+    def event_for(self, log: Dict) -> CompiledEvent:
+        topics = log['topics']
+
+        if not topics:
+            raise ValueError('Log without topics, anonymous events are not supported.')
+
+        event_id = normalize_topic(topics[0])
+        return self.topic_to_event[event_id]
+
+    def decode(self, log: Dict) -> Dict:
+        compiled = self.event_for(log)
+
+        if compiled.is_simple:
+            return self._decode(compiled, log, internal=False)
+
+        return self._decode_with_web3(compiled, log)
+
+    def decode_internal(self, log: Dict) -> Dict:
+        compiled = self.event_for(log)
+
+        if compiled.is_simple:
+            decoded_event = self._decode(compiled, log, internal=True)
+        else:
+            decoded_event = self._decode_with_web3(compiled, log)
+
+        args = decoded_event['args']
+        names_types = zip(
+            compiled.topic_names + compiled.data_names,
+            compiled.topic_types + compiled.data_types,
+        )
+        for name, abi_type in names_types:
+            if abi_type == 'address':
+                if not compiled.is_simple:
+                    args[name] = to_canonical_address(args[name])
+
+                # Never shadow the log fields
+                if name not in decoded_event:
+                    decoded_event[name] = args[name]
+
+        decoded_event['block_number'] = log.get('blockNumber', 0)
+
+        return decoded_event
+
+    @staticmethod
+    def _decode_with_web3(compiled: CompiledEvent, log: Dict) -> Dict:
+        log = dict(log)
+        log['topics'] = [normalize_topic(topic) for topic in log['topics']]
+
+        decoded_event = dict(get_event_data(compiled.event_abi, log))
+        decoded_event['args'] = dict(decoded_event['args'])
+        return decoded_event
+
+    @staticmethod
+    def _decode(compiled: CompiledEvent, log: Dict, internal: bool) -> Dict:
+        topics = log['topics'][1:]
+
+        if len(topics) != len(compiled.topic_types):
+            raise ValueError('Expected {} log topics.  Got {}'.format(
+                len(compiled.topic_types),
+                len(topics),
+            ))
+
+        args = dict()
+        topics_decoders = zip(compiled.topic_names, compiled.topic_types, compiled.topic_decoders)
+        for (name, abi_type, decoder), topic in zip(topics_decoders, topics):
+            topic = normalize_topic(topic)
+
+            if abi_type == 'address' and internal:
+                # The address is the right-aligned last 20 bytes of the topic
+                args[name] = topic[-20:]
+            else:
+                value = decoder(ContextFramesBytesIO(topic))
+                args[name] = normalize_argument(abi_type, value, internal)
+
+        data = log['data']
+        if isinstance(data, str):
+            data = to_bytes(hexstr=data)
+
+        values = compiled.data_decoder(ContextFramesBytesIO(data))
+        for name, abi_type, value in zip(compiled.data_names, compiled.data_types, values):
+            args[name] = normalize_argument(abi_type, value, internal)
+
+        return {
+            'args': args,
+            'event': compiled.name,
+            'logIndex': log['logIndex'],
+            'transactionIndex': log['transactionIndex'],
+            'transactionHash': log['transactionHash'],
+            'address': log['address'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+        }
+
+
+# The ABIs are loaded once by the contract manager, so the decoders are cached
+# by the identity of the ABI. The ABI itself is kept in the cache entry to
+# guarantee the id is not reused.
+_abi_to_decoder: Dict[int, EventDecoder] = dict()
+
+
+def event_decoder_for(abi: List[Dict]) -> EventDecoder:
+    """ Return the cached EventDecoder for `abi`. """
+    decoder = _abi_to_decoder.get(id(abi))
+
+    if decoder is None or decoder.abi is not abi:
+        decoder = EventDecoder(abi)
+        _abi_to_decoder[id(abi)] = decoder
+
+    return decoder
+
 
 def decode_event(abi: Dict, log: Dict):
     """Helper function to unpack event data using a provided ABI"""
-    if isinstance(log['topics'][0], str):
-        log['topics'][0] = decode_hex(log['topics'][0])
-    elif isinstance(log['topics'][0], int):
-        log['topics'][0] = decode_hex(hex(log['topics'][0]))
-    event_id = log['topics'][0]
-    events = filter_by_type('event', abi)
-    topic_to_event_abi = {
-        event_abi_to_log_topic(event_abi): event_abi
-        for event_abi in events
-    }
-    event_abi = topic_to_event_abi[event_id]
-    return get_event_data(event_abi, log)
+    return event_decoder_for(abi).decode(log)
 
 
 class ContractProxy:
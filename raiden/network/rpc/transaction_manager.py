@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+import heapq
+import time
+from binascii import unhexlify
+
+import gevent
+import structlog
+from cachetools import LRUCache
+from eth_utils import to_checksum_address, remove_0x_prefix
+from gevent.event import AsyncResult, Event
+from gevent.lock import Semaphore
+
+from raiden.exceptions import RaidenShuttingDown
+from raiden.settings import RPC_CACHE_TTL
+from raiden.utils import data_encoder
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+# Interval used to check for new blocks while there are transactions in
+# flight and no block was announced with `new_block`.
+DEFAULT_SWEEP_INTERVAL = 0.5
+
+# Number of blocks a transaction may stay unmined before the node is asked if
+# it still knows about it. A transaction may not be in the pool for a short
+# period of time after it was sent, so this can not be done right away.
+DROPPED_CHECK_BLOCKS = 3
+
+# Number of receipts kept after the transaction's future was resolved, this
+# is used by `check_transaction_threw` which is called right after `poll`.
+RECEIPT_CACHE_SIZE = 256
+
+# Errors of the node meaning the nonce of the rejected transaction is already
+# used, by one of our transactions or by another sender of the account.
+NONCE_USED_ERRORS = (
+    'nonce too low',
+    'known transaction',
+    'already imported',
+    'replacement transaction underpriced',
+)
+
+
+def normalize_transaction_hash(transaction_hash) -> bytes:
+    """ Return the binary representation of a transaction hash given in
+    binary or in hex form.
+    """
+    if isinstance(transaction_hash, str):
+        return unhexlify(remove_0x_prefix(transaction_hash))
+    return bytes(transaction_hash)
+
+
+class PendingTransaction:
+    """ A transaction sent by this node which was not mined yet. """
+    __slots__ = (
+        'transaction_hash',
+        'nonce',
+        'sent_at_block',
+        'mined_at_block',
+        'mined',
+        'confirmations',
+    )
+
+    def __init__(self, transaction_hash: bytes, nonce: int, sent_at_block: int):
+        self.transaction_hash = transaction_hash
+        self.nonce = nonce
+        self.sent_at_block = sent_at_block
+        self.mined_at_block = None
+
+        #: Resolved with the receipt once the transaction is mined.
+        self.mined = AsyncResult()
+
+        #: Futures waiting for a number of confirmations, resolved with the
+        #: receipt once the block `mined_at_block + confirmations` is seen.
+        self.confirmations = list()
+
+
+class TransactionManager:
+    """ Tracks the transactions sent by a `JSONRPCClient`.
+
+    The nonces are handed out locally. The node is asked for the account's
+    transaction count only when there is nothing in flight, so an external
+    transaction from the same account is picked up eventually, but
+    concurrent senders never wait on the node.
+
+    All in-flight transactions are tracked together, a single greenlet checks
+    once per block if any of them was mined, instead of one polling loop per
+    transaction. The receipts of mined transactions are fetched once and
+    kept for `check_transaction_threw`.
+
+    The gas price and gas limit are cached for the current block.
+    """
+
+    def __init__(
+            self,
+            client,
+            nonce_update_interval: float = 5.0,
+            nonce_offset: int = 0,
+            sweep_interval: float = DEFAULT_SWEEP_INTERVAL,
+    ):
+        self.client = client
+        self.nonce_update_interval = nonce_update_interval
+        self.nonce_offset = nonce_offset
+        self.sweep_interval = sweep_interval
+
+        self.nonce_lock = Semaphore()
+        self.nonce_last_update = 0
+        self.nonce_available_value = None
+        #: Nonces reserved for transactions that could not be sent, these are
+        #: reused first otherwise the later transactions would never be mined.
+        self.released_nonces = list()
+        #: Number of nonces given out for which `sent`, `release_nonce`,
+        #: `rejected` or `send_failed` was not called yet.
+        self.reserved_count = 0
+        #: Nonces of transactions which may or may not be known to the node,
+        #: the node must be asked before these are used again.
+        self.unconfirmed_nonces = set()
+
+        self.pending = dict()
+        self.receipts = LRUCache(maxsize=RECEIPT_CACHE_SIZE)
+
+        self.block_number = None
+        self.last_scanned_block = None
+        self.new_block_event = Event()
+        self.sweeper = None
+
+        self.gas_cache = dict()
+
+    def __repr__(self):
+        return '<TransactionManager pending:{}>'.format(len(self.pending))
+
+    def _nonce_needs_update(self, now):
+        if self.nonce_available_value is None or self.unconfirmed_nonces:
+            return True
+
+        # The node's view can only be used when all of our transactions are
+        # known to it, or mined, and there is no nonce gap to be filled.
+        if self.pending or self.reserved_count or self.released_nonces:
+            return False
+
+        # time is not monotonic and it's affected by clock resets, force an
+        # update.
+        if self.nonce_last_update > now:
+            return True
+
+        return now - self.nonce_last_update > self.nonce_update_interval
+
+    def _nonce_update_from_node(self, now):
+        transaction_count = self.client.web3.eth.getTransactionCount(
+            to_checksum_address(self.client.sender),
+            'pending',
+        )
+        nonce = transaction_count + self.nonce_offset
+
+        log.debug(
+            'updated nonce from server',
+            server=nonce,
+            local=self.nonce_available_value,
+        )
+
+        # Never go back, the node may not have seen a transaction that was
+        # just mined or sent.
+        if self.nonce_available_value is None or nonce > self.nonce_available_value:
+            self.nonce_available_value = nonce
+        self.nonce_last_update = now
+
+        # The nonces below the node's count are used, these must not be
+        # handed out again. An unconfirmed nonce that the node does not know
+        # about is a gap that must be filled.
+        released_nonces = [
+            released for released in self.released_nonces
+            if released >= nonce
+        ]
+        released_nonces.extend(
+            unconfirmed for unconfirmed in self.unconfirmed_nonces
+            if nonce <= unconfirmed < self.nonce_available_value
+        )
+        heapq.heapify(released_nonces)
+        self.released_nonces = released_nonces
+        self.unconfirmed_nonces = set()
+
+    def reserve_nonce(self) -> int:
+        """ Return the nonce for a new transaction.
+
+        Every nonce must be followed by a call to `sent` or `release_nonce`.
+        """
+        with self.nonce_lock:
+            now = time.time()
+            if self._nonce_needs_update(now):
+                self._nonce_update_from_node(now)
+
+            if self.released_nonces:
+                nonce = heapq.heappop(self.released_nonces)
+            else:
+                nonce = self.nonce_available_value
+                self.nonce_available_value += 1
+
+            self.reserved_count += 1
+            return nonce
+
+    def rejected(self, nonce: int, error: Exception):
+        """ The node answered with `error` to the transaction sent with
+        `nonce`.
+        """
+        message = str(error).lower()
+
+        if any(used_error in message for used_error in NONCE_USED_ERRORS):
+            # Handing out the nonce again would fail the same way, the
+            # transaction count is fetched from the node instead.
+            log.debug('nonce already used', nonce=nonce, error=message)
+            self.send_failed(nonce)
+        else:
+            self.release_nonce(nonce)
+
+    def send_failed(self, nonce: int):
+        """ Sending the transaction with `nonce` failed without an answer of
+        the node, e.g. on a timeout, so it may have been accepted.
+        """
+        with self.nonce_lock:
+            self.reserved_count -= 1
+            self.unconfirmed_nonces.add(nonce)
+
+    def release_nonce(self, nonce: int):
+        """ Give back a nonce which was not used because the transaction was
+        not sent or the node rejected it.
+        """
+        with self.nonce_lock:
+            self.reserved_count -= 1
+
+            heapq.heappush(self.released_nonces, nonce)
+
+            # Released nonces at the top are simply handed out again in order
+            while nonce == self.nonce_available_value - 1 and nonce in self.released_nonces:
+                self.released_nonces.remove(nonce)
+                self.nonce_available_value = nonce
+                nonce -= 1
+            heapq.heapify(self.released_nonces)
+
+    def sent(self, transaction_hash, nonce: int):
+        """ Start tracking the transaction sent with `nonce`. """
+        transaction_hash = normalize_transaction_hash(transaction_hash)
+
+        with self.nonce_lock:
+            self.reserved_count -= 1
+
+        if transaction_hash not in self.pending:
+            self.pending[transaction_hash] = PendingTransaction(
+                transaction_hash,
+                nonce,
+                self.block_number,
+            )
+
+        self._ensure_sweeper()
+        return self.pending[transaction_hash].mined
+
+    def _track(self, transaction_hash: bytes) -> PendingTransaction:
+        """ Start tracking a transaction which was not given to `sent`, e.g.
+        a transaction that was already mined.
+        """
+        pending = self.pending.get(transaction_hash)
+
+        if pending is None:
+            pending = PendingTransaction(transaction_hash, None, self.block_number)
+            self.pending[transaction_hash] = pending
+
+            receipt = self.receipt(transaction_hash)
+            if receipt is not None and receipt['blockNumber'] is not None:
+                self._set_mined(pending, receipt['blockNumber'], receipt)
+
+            self._ensure_sweeper()
+
+        return pending
+
+    def mined(self, transaction_hash, confirmations: int = None) -> AsyncResult:
+        """ Return a future which is resolved with the transaction's receipt
+        once it's mined and `confirmations` blocks were added on top of it.
+
+        The future is set with an exception if the node dropped the
+        transaction.
+        """
+        transaction_hash = normalize_transaction_hash(transaction_hash)
+        receipt = self.receipts.get(transaction_hash)
+
+        if receipt is not None:
+            mined_at_block = receipt['blockNumber']
+            if not confirmations or self._is_confirmed(mined_at_block, confirmations):
+                result = AsyncResult()
+                result.set(receipt)
+                return result
+
+        pending = self._track(transaction_hash)
+        if not confirmations:
+            return pending.mined
+
+        result = AsyncResult()
+        pending.confirmations.append((confirmations, result))
+        return result
+
+    def receipt(self, transaction_hash):
+        """ Return the receipt of a mined transaction, using the receipt which
+        was fetched when the transaction was detected as mined if available.
+        """
+        transaction_hash = normalize_transaction_hash(transaction_hash)
+        receipt = self.receipts.get(transaction_hash)
+
+        if receipt is None:
+            receipt = self.client.web3.eth.getTransactionReceipt(
+                data_encoder(transaction_hash),
+            )
+            if receipt is not None and receipt['blockNumber'] is not None:
+                self.receipts[transaction_hash] = receipt
+
+        return receipt
+
+    def new_block(self, block_number: int):
+        """ Notify the manager of a new block, this is used to avoid polling
+        the node when the caller already knows the latest block.
+        """
+        if self.block_number is None or block_number > self.block_number:
+            self.block_number = block_number
+            self.gas_cache.clear()
+            self.new_block_event.set()
+
+    def gas_price(self) -> int:
+        return self._cached('gas_price', self.client._gasprice)
+
+    def gas_limit(self) -> int:
+        return self._cached('gas_limit', self.client._gaslimit)
+
+    def _cached(self, key, fetch):
+        # The cache is cleared by `new_block`, the time limit is used when
+        # the blocks are not being followed.
+        now = time.time()
+        cached = self.gas_cache.get(key)
+
+        if cached is None or now - cached[0] > RPC_CACHE_TTL:
+            cached = (now, fetch())
+            self.gas_cache[key] = cached
+
+        return cached[1]
+
+    def _is_confirmed(self, mined_at_block, confirmations):
+        return (
+            self.block_number is not None and
+            self.block_number >= mined_at_block + confirmations
+        )
+
+    def _ensure_sweeper(self):
+        if self.sweeper is None or self.sweeper.dead:
+            # The blocks mined while nothing was pending are not scanned
+            self.last_scanned_block = None
+            self.sweeper = gevent.spawn(self._sweep_loop)
+            self.sweeper.name = 'TransactionManager._sweep_loop'
+
+    def _sweep_loop(self):
+        while self.pending:
+            announced = self.new_block_event.wait(self.sweep_interval)
+            self.new_block_event.clear()
+
+            try:
+                if not announced:
+                    self.new_block(self.client.block_number())
+                self.sweep()
+            except RaidenShuttingDown:
+                error = RaidenShuttingDown()
+                for pending in self.pending.values():
+                    self._fail(pending, error)
+                self.pending.clear()
+            except Exception:  # pylint: disable=broad-except
+                # The scan continues from the last scanned block, a
+                # transient error of the node is retried on the next block.
+                log.exception('transaction sweep failed')
+
+    def sweep(self):
+        """ Check the blocks mined since the last sweep for any of the
+        pending transactions and resolve the futures.
+        """
+        block_number = self.block_number
+
+        if block_number is None:
+            return
+
+        if self.last_scanned_block is None:
+            # Transactions are only tracked after they were sent, nothing from
+            # before the first one has to be scanned. The blocks older than
+            # DROPPED_CHECK_BLOCKS are covered by the check for dropped
+            # transactions.
+            first_block = min(
+                (
+                    pending.sent_at_block
+                    for pending in self.pending.values()
+                    if pending.sent_at_block is not None
+                ),
+                default=block_number,
+            )
+            first_block = max(first_block, block_number - DROPPED_CHECK_BLOCKS)
+            self.last_scanned_block = first_block - 1
+
+        for number in range(self.last_scanned_block + 1, block_number + 1):
+            block = self.client.web3.eth.getBlock(number)
+
+            if block is None:
+                # The node did not import the block yet
+                break
+
+            block_transactions = set(
+                normalize_transaction_hash(transaction_hash)
+                for transaction_hash in block['transactions']
+            )
+            for transaction_hash in block_transactions & set(self.pending):
+                self._set_mined(self.pending[transaction_hash], number)
+
+            self.last_scanned_block = number
+
+        self._check_dropped_transactions(block_number)
+        self._resolve_confirmations(block_number)
+
+        if not self.pending:
+            self.last_scanned_block = None
+
+    def _set_mined(self, pending, block_number, receipt=None):
+        if receipt is None:
+            receipt = self.receipt(pending.transaction_hash)
+
+        pending.mined_at_block = block_number
+        self.receipts[pending.transaction_hash] = receipt
+        pending.mined.set(receipt)
+
+    def _check_dropped_transactions(self, block_number):
+        # used to check if the transaction was removed, this could happen
+        # if gas price is too low:
+        #
+        # > Transaction (acbca3d6) below gas price (tx=1 Wei ask=18
+        # > Shannon). All sequential txs from this address(7d0eae79)
+        # > will be ignored
+        #
+        for pending in list(self.pending.values()):
+            if pending.mined_at_block is not None:
+                continue
+
+            if pending.sent_at_block is None:
+                pending.sent_at_block = block_number
+                continue
+
+            if block_number - pending.sent_at_block < DROPPED_CHECK_BLOCKS:
+                continue
+
+            transaction = self.client.web3.eth.getTransaction(
+                data_encoder(pending.transaction_hash),
+            )
+
+            if transaction is None:
+                self._fail(pending, Exception('invalid transaction, check gas price'))
+                del self.pending[pending.transaction_hash]
+
+            elif transaction['blockNumber'] is not None:
+                # Mined in a block that was reorged out and then in again, or
+                # in a block that was skipped by the scan.
+                self._set_mined(pending, transaction['blockNumber'])
+
+    def _resolve_confirmations(self, block_number):
+        for pending in list(self.pending.values()):
+            if pending.mined_at_block is None:
+                continue
+
+            receipt = pending.mined.get()
+            waiting = list()
+            for confirmations, result in pending.confirmations:
+                if self._is_confirmed(pending.mined_at_block, confirmations):
+                    result.set(receipt)
+                else:
+                    waiting.append((confirmations, result))
+
+            pending.confirmations = waiting
+            if not waiting:
+                del self.pending[pending.transaction_hash]
+
+    @staticmethod
+    def _fail(pending, exception):
+        if not pending.mined.ready():
+            pending.mined.set_exception(exception)
+
+        for _, result in pending.confirmations:
+            result.set_exception(exception)
@@ -4,7 +4,7 @@ def check_transaction_threw(client, transaction_hash):
        Returns None in case of success and the transaction receipt if the
        transaction's status indicator is 0x0.
     """
-    receipt = client.web3.eth.getTransactionReceipt(transaction_hash)
+    receipt = client.transaction_receipt(transaction_hash)
 
     if 'status' not in receipt:
         raise ValueError(
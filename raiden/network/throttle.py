@@ -5,6 +5,17 @@ communication.
 """
 from time import time
 
+#: Priority classes of the outgoing datagrams, a lower value is more urgent
+PRIORITY_ACK = 0
+PRIORITY_MESSAGE = 1
+PRIORITY_RETRY = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_ACK: 'ack',
+    PRIORITY_MESSAGE: 'message',
+    PRIORITY_RETRY: 'retry',
+}
+
 
 class DummyPolicy:
     """Dummy implementation for the throttling policy that always
@@ -13,9 +24,16 @@ class DummyPolicy:
     def __init__(self):
         pass
 
-    def consume(self, tokens):  # pylint: disable=unused-argument,no-self-use
+    # pylint: disable=unused-argument,no-self-use
+    def consume(self, tokens, peer=None, priority=PRIORITY_MESSAGE):
         return 0.
 
+    def delivered(self, peer, rtt):
+        pass
+
+    def lost(self, peer):
+        pass
+
 
 class TokenBucket:
     """Implementation of the token bucket throttling algorithm.
@@ -29,8 +47,8 @@ class TokenBucket:
         self._time = time_function or time
         self.timestamp = self._time()
 
-    def consume(self, tokens):
-        """Consume tokens.
+    def consume(self, tokens, peer=None, priority=PRIORITY_MESSAGE):
+        """Consume tokens, the `peer` and `priority` are ignored.
         Args:
             tokens (float): number of transport tokens to consume
         Returns:
@@ -44,9 +62,141 @@ class TokenBucket:
             wait_time = -self.tokens / self.fill_rate
         return wait_time
 
+    def available(self):
+        """Return the number of tokens after the refill, negative if the
+        consumers are waiting.
+        """
+        self._get_tokens()
+        return self.tokens
+
+    def delivered(self, peer, rtt):
+        pass
+
+    def lost(self, peer):
+        pass
+
     def _get_tokens(self):
         now = self._time()
         self.tokens += self.fill_rate * (now - self.timestamp)
         if self.tokens > self.capacity:
             self.tokens = self.capacity
         self.timestamp = now
+
+
+class FairSharePolicy:
+    """Hierarchical throttling policy, a global token bucket shared by all the
+    peers and a token bucket per peer, so that the retries to an unresponsive
+    peer don't starve the others.
+
+    - Acknowledgements are never delayed, their tokens are taken from the
+      global bucket.
+    - Retries can't use the last `retry_reserve` tokens of the global bucket,
+      these are kept for the acknowledgements and the new messages.
+    - The fill rate of a peer's bucket is increased by `peer_rate_increase`
+      for every acknowledged message and halved for every lost one, between
+      `peer_min_fill_rate` and the global fill rate. The peer's capacity
+      allows for a round trip worth of datagrams.
+    """
+
+    def __init__(
+            self,
+            capacity=100.,
+            fill_rate=100.,
+            peer_capacity=10.,
+            peer_fill_rate=10.,
+            peer_min_fill_rate=1.,
+            peer_rate_increase=1.,
+            retry_reserve=None,
+            time_function=None,
+    ):
+        self._time = time_function or time
+        self.bucket = TokenBucket(capacity, fill_rate, self._time)
+
+        self.peer_capacity = float(peer_capacity)
+        self.peer_fill_rate = peer_fill_rate
+        self.peer_min_fill_rate = peer_min_fill_rate
+        self.peer_rate_increase = peer_rate_increase
+
+        if retry_reserve is None:
+            retry_reserve = capacity / 5
+        self.retry_reserve = retry_reserve
+
+        self.peers_to_buckets = dict()
+        self.peers_to_rtt = dict()
+
+    def peer_bucket(self, peer):
+        bucket = self.peers_to_buckets.get(peer)
+
+        if bucket is None:
+            bucket = TokenBucket(self.peer_capacity, self.peer_fill_rate, self._time)
+            self.peers_to_buckets[peer] = bucket
+
+        return bucket
+
+    def consume(self, tokens, peer=None, priority=PRIORITY_MESSAGE):
+        if priority == PRIORITY_ACK:
+            self.bucket.consume(tokens)
+            return 0.
+
+        wait_time = self.bucket.consume(tokens)
+
+        if priority == PRIORITY_RETRY:
+            available = self.bucket.available()
+            if available < self.retry_reserve:
+                reserve_wait = (self.retry_reserve - available) / self.bucket.fill_rate
+                wait_time = max(wait_time, reserve_wait)
+
+        if peer is not None:
+            wait_time = max(wait_time, self.peer_bucket(peer).consume(tokens))
+
+        return wait_time
+
+    def delivered(self, peer, rtt):
+        """A message to `peer` was acknowledged after `rtt` seconds."""
+        previous_rtt = self.peers_to_rtt.get(peer)
+        if previous_rtt is not None:
+            rtt = previous_rtt * 7 / 8 + rtt / 8
+        self.peers_to_rtt[peer] = rtt
+
+        bucket = self.peer_bucket(peer)
+        bucket.fill_rate = min(bucket.fill_rate + self.peer_rate_increase, self.bucket.fill_rate)
+        bucket.capacity = max(self.peer_capacity, bucket.fill_rate * rtt)
+
+    def lost(self, peer):
+        """A message to `peer` was not acknowledged in time."""
+        bucket = self.peer_bucket(peer)
+        bucket.fill_rate = max(bucket.fill_rate / 2, self.peer_min_fill_rate)
+
+
+class ThrottleMetrics:
+    """Number of datagrams and the delay added by the throttling policy, per
+    priority class.
+    """
+
+    def __init__(self):
+        self.priorities_to_datagrams = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.priorities_to_delayed = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.priorities_to_delay = dict.fromkeys(PRIORITY_NAMES, 0.)
+        self.priorities_to_max_delay = dict.fromkeys(PRIORITY_NAMES, 0.)
+
+    def record(self, priority, delay):
+        self.priorities_to_datagrams[priority] += 1
+
+        if delay:
+            self.priorities_to_delayed[priority] += 1
+            self.priorities_to_delay[priority] += delay
+            self.priorities_to_max_delay[priority] = max(
+                self.priorities_to_max_delay[priority],
+                delay,
+            )
+
+    def report(self):
+        return {
+            name: {
+                'datagrams': self.priorities_to_datagrams[priority],
+                'delayed': self.priorities_to_delayed[priority],
+                'total_delay': self.priorities_to_delay[priority],
+                'max_delay': self.priorities_to_max_delay[priority],
+            }
+            for priority, name in PRIORITY_NAMES.items()
+        }
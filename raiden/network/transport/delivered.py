@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import gevent
+import structlog
+
+from raiden.encoding.messages import DELIVERED_BATCH_SIZE
+from raiden.exceptions import InvalidAddress, UnknownAddress
+from raiden.messages import Delivered, DeliveredBatch
+from raiden.utils import pex, typing
+
+log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
+
+
+class DeliveredCoalescer:
+    """ Acknowledges the received messages of a node with a single signed
+    message.
+
+    The identifiers of the messages received from the same node within
+    `delay` seconds are sent in a `DeliveredBatch`, a lone identifier is sent
+    in a `Delivered`. With a `delay` of zero every message is acknowledged
+    right away.
+
+    Args:
+        sign: Signs the acknowledgement in place.
+        send: Sends the signed acknowledgement to the node.
+        delay: How long the identifiers are collected.
+    """
+
+    def __init__(
+            self,
+            sign: typing.Callable,
+            send: typing.Callable,
+            delay: float,
+    ):
+        self.sign = sign
+        self.send = send
+        self.delay = delay
+
+        self.recipients_to_identifiers = dict()
+        self.recipients_to_flushtask = dict()
+
+    def delivered(self, recipient: typing.Address, message_identifier: int):
+        """ Acknowledge the message `message_identifier` received from
+        `recipient`.
+        """
+        if not self.delay:
+            self.send_delivered(recipient, [message_identifier])
+            return
+
+        identifiers = self.recipients_to_identifiers.setdefault(recipient, list())
+        identifiers.append(message_identifier)
+
+        if len(identifiers) >= DELIVERED_BATCH_SIZE:
+            self.flush(recipient)
+        elif recipient not in self.recipients_to_flushtask:
+            self.recipients_to_flushtask[recipient] = gevent.spawn_later(
+                self.delay,
+                self.flush,
+                recipient,
+            )
+
+    def flush(self, recipient: typing.Address):
+        """ Send the pending acknowledgements for `recipient`. """
+        identifiers = self.recipients_to_identifiers.pop(recipient, None)
+        flush_task = self.recipients_to_flushtask.pop(recipient, None)
+
+        if flush_task is not None and flush_task is not gevent.getcurrent():
+            flush_task.kill(block=False)
+
+        if identifiers:
+            self.send_delivered(recipient, identifiers)
+
+    def flush_all(self):
+        for recipient in list(self.recipients_to_identifiers):
+            self.flush(recipient)
+
+    def send_delivered(self, recipient: typing.Address, identifiers: typing.List[int]):
+        if len(identifiers) == 1:
+            delivered = Delivered(identifiers[0])
+        else:
+            delivered = DeliveredBatch(identifiers)
+
+        self.sign(delivered)
+
+        try:
+            self.send(recipient, delivered)
+        except (InvalidAddress, UnknownAddress) as e:
+            log.debug(
+                "Couldn't send the `Delivered` message",
+                recipient=pex(recipient),
+                e=e,
+            )
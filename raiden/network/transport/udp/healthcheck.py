@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
+import heapq
+import random
+import time
 from collections import namedtuple
-from itertools import repeat
+from itertools import count
 
 from gevent.event import Event
 import structlog
 
 from raiden.exceptions import (
+    InvalidAddress,
     UnknownAddress,
     RaidenShuttingDown,
 )
+from raiden.network.throttle import (
+    PRIORITY_MESSAGE,
+    PRIORITY_RETRY,
+)
 from raiden.utils import pex, typing
-from raiden.transfer import views
 from raiden.transfer.state import (
     NODE_NETWORK_REACHABLE,
     NODE_NETWORK_UNKNOWN,
@@ -22,6 +29,16 @@ UDPTransport = 'UDPTransport'
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
+#: Fraction of the keepalive timeout used to spread the pings over time
+PING_JITTER = 0.1
+
+# The phases of the health check of a peer
+PHASE_NEW = 'new'
+PHASE_DISCOVERY = 'discovery'
+PHASE_KEEPALIVE = 'keepalive'
+PHASE_PING = 'ping'
+PHASE_INVITATION = 'invitation'
+
 
 HealthEvents = namedtuple('HealthEvents', (
     'event_healthy',
@@ -29,148 +46,326 @@ HealthEvents = namedtuple('HealthEvents', (
 ))
 
 
-def healthcheck(
-        transport: UDPTransport,
-        recipient: typing.Address,
-        event_stop: Event,
-        event_healthy: Event,
-        event_unhealthy: Event,
-        nat_keepalive_retries: int,
-        nat_keepalive_timeout: int,
-        nat_invitation_timeout: int,
-        ping_nonce: int,
-):
-    """ Sends a periodical Ping to `recipient` to check its health. """
-    # pylint: disable=too-many-branches
-
-    log.debug(
-        'starting healthcheck for',
-        node=pex(transport.raiden.address),
-        to=pex(recipient),
-    )
-
-    # The state of the node is unknown, the events are set to allow the tasks
-    # to do work.
-    last_state = NODE_NETWORK_UNKNOWN
-    transport.set_node_network_state(
-        recipient,
-        last_state,
-    )
-
-    # Always call `clear` before `set`, since only `set` does context-switches
-    # it's easier to reason about tasks that are waiting on both events.
-
-    # Wait for the end-point registration or for the node to quit
-    try:
-        transport.get_host_port(recipient)
-    except UnknownAddress:
-        log.debug(
-            'waiting for endpoint registration',
-            node=pex(transport.raiden.address),
-            to=pex(recipient),
+class PeerHealth:
+    """ The health check state of a single peer. """
+
+    def __init__(self, recipient: typing.Address):
+        self.recipient = recipient
+        self.events = HealthEvents(
+            event_healthy=Event(),
+            event_unhealthy=Event(),
         )
 
-        event_healthy.clear()
-        event_unhealthy.set()
+        self.phase = PHASE_NEW
+        self.network_state = NODE_NETWORK_UNKNOWN
 
-        backoff = udp_utils.timeout_exponential_backoff(
-            nat_keepalive_retries,
-            nat_keepalive_timeout,
-            nat_invitation_timeout,
-        )
-        sleep = next(backoff)
+        #: Time of the next check, entries of the heap with a different time
+        #: are stale
+        self.due = None
+        #: Time of the last authenticated message received from the peer
+        self.last_seen = None
 
-        while not event_stop.wait(sleep):
-            try:
-                transport.get_host_port(recipient)
-            except UnknownAddress:
-                sleep = next(backoff)
-            else:
-                break
+        self.backoff = None
+        self.retries_left = 0
+        self.ping_nonce = None
+        self.ping_messagedata = None
 
-    # Don't wait to send the first Ping and to start sending messages if the
-    # endpoint is known
-    sleep = 0
-    event_unhealthy.clear()
-    event_healthy.set()
+    @property
+    def message_id(self):
+        return ('ping', self.ping_nonce, self.recipient)
 
-    while not event_stop.wait(sleep):
-        sleep = nat_keepalive_timeout
 
-        ping_nonce['nonce'] += 1
-        messagedata = transport.get_ping(ping_nonce['nonce'])
-        message_id = ('ping', ping_nonce['nonce'], recipient)
+class HealthCheckScheduler:
+    """ Checks the health of all the peers from a single task.
 
-        # Send Ping a few times before setting the node as unreachable
-        try:
-            acknowledged = udp_utils.retry(
-                transport,
-                messagedata,
-                message_id,
-                recipient,
-                event_stop,
-                [nat_keepalive_timeout] * nat_keepalive_retries,
-            )
-        except RaidenShuttingDown:  # For a clean shutdown process
+    The checks are kept in a heap ordered by time, the pings are spread over
+    the keepalive interval to avoid bursts. A peer is only pinged if nothing
+    was received from it during the last `nat_keepalive_timeout` seconds, any
+    authenticated message counts as a sign of liveness, see `heard_from`.
+
+    A Ping has no recipient, so the same signed Ping is sent to all the peers
+    and only a new nonce requires a new signature. A nonce is never reused
+    for the same peer, otherwise a recorded Pong could be replayed.
+
+    Args:
+        transport: The transport used to send the pings.
+        event_stop: Stops the scheduler.
+        nat_keepalive_retries: Pings sent before a peer is unreachable.
+        nat_keepalive_timeout: Time between the pings.
+        nat_invitation_timeout: Time between the pings to an unreachable
+            peer.
+        time_function: Returns the current time, defaults to
+            `time.monotonic`.
+    """
+
+    def __init__(
+            self,
+            transport: UDPTransport,
+            event_stop: Event,
+            nat_keepalive_retries: int,
+            nat_keepalive_timeout: int,
+            nat_invitation_timeout: int,
+            time_function: typing.Callable = None,
+    ):
+        self.transport = transport
+        self.event_stop = event_stop
+        self.nat_keepalive_retries = nat_keepalive_retries
+        self.nat_keepalive_timeout = nat_keepalive_timeout
+        self.nat_invitation_timeout = nat_invitation_timeout
+        self.time_function = time_function or time.monotonic
+
+        self.peers = dict()
+        self.heap = list()
+        self.sequence = count()
+        self.event_wakeup = Event()
+
+        self.ping_nonce = 0
+        self.ping_messagedata = None
+        self.pings_signed = 0
+
+    def start_health_check(self, recipient: typing.Address) -> HealthEvents:
+        """ Start checking `recipient` if it's not checked yet and return its
+        HealthEvents.
+        """
+        peer = self.peers.get(recipient)
+
+        if peer is None:
+            peer = PeerHealth(recipient)
+            self.peers[recipient] = peer
+            self.schedule(peer, self.time_function())
+
+        return peer.events
+
+    def heard_from(self, sender: typing.Address):
+        """ Record an authenticated message from `sender`, its keepalive ping
+        is delayed.
+        """
+        peer = self.peers.get(sender)
+
+        if peer is not None:
+            peer.last_seen = self.time_function()
+
+    def pong_received(self, sender: typing.Address, nonce: int):
+        """ Mark `sender` as reachable if the Pong answers its current Ping. """
+        peer = self.peers.get(sender)
+
+        if peer is None or peer.phase not in (PHASE_PING, PHASE_INVITATION):
             return
 
-        if event_stop.is_set():
+        if peer.ping_nonce != nonce:
             return
 
-        if not acknowledged:
-            log.debug(
-                'node is unresponsive',
-                node=pex(transport.raiden.address),
-                to=pex(recipient),
-                current_state=last_state,
-                new_state=NODE_NETWORK_UNREACHABLE,
-                retries=nat_keepalive_retries,
-                timeout=nat_keepalive_timeout,
-            )
+        now = self.time_function()
+        peer.last_seen = now
+        peer.phase = PHASE_KEEPALIVE
+        self.transport.messageids_to_asyncresults.pop(peer.message_id, None)
+        self.schedule(peer, now + self.keepalive_interval())
 
-            # The node is not healthy, clear the event to stop all queue
-            # tasks
-            last_state = NODE_NETWORK_UNREACHABLE
-            transport.set_node_network_state(
-                recipient,
-                last_state,
-            )
-            event_healthy.clear()
-            event_unhealthy.set()
+        log.debug(
+            'node answered',
+            node=pex(self.transport.raiden.address),
+            to=pex(sender),
+            current_state=peer.network_state,
+            new_state=NODE_NETWORK_REACHABLE,
+        )
+
+        if peer.network_state != NODE_NETWORK_REACHABLE:
+            self.set_network_state(peer, NODE_NETWORK_REACHABLE)
+
+    def keepalive_interval(self) -> float:
+        """ The time until the next keepalive, jittered to keep the pings of
+        the peers spread.
+        """
+        jitter = random.uniform(-PING_JITTER, 0)
+        return self.nat_keepalive_timeout * (1 + jitter)
+
+    def schedule(self, peer: PeerHealth, due: float):
+        peer.due = due
+        heapq.heappush(self.heap, (due, next(self.sequence), peer.recipient))
+
+        # Only a new first entry changes how long the scheduler sleeps
+        if self.heap[0][2] == peer.recipient:
+            self.event_wakeup.set()
+
+    def run(self):
+        """ Run the health checks until `event_stop` is set. """
+        stop_or_wakeup = udp_utils.event_first_of(self.event_stop, self.event_wakeup)
+
+        while not self.event_stop.is_set():
+            stop_or_wakeup.clear()
+            self.event_wakeup.clear()
 
-            # Retry until recovery, used for:
-            # - Checking node status.
-            # - Nat punching.
             try:
-                acknowledged = udp_utils.retry(
-                    transport,
-                    messagedata,
-                    message_id,
-                    recipient,
-                    event_stop,
-                    repeat(nat_invitation_timeout),
-                )
+                self.check_due(self.time_function())
             except RaidenShuttingDown:  # For a clean shutdown process
                 return
 
-        if acknowledged:
-            current_state = views.get_node_network_status(
-                views.state_from_raiden(transport.raiden),
-                recipient,
-            )
+            timeout = None
+            if self.heap:
+                timeout = max(0, self.heap[0][0] - self.time_function())
+
+            stop_or_wakeup.wait(timeout)
+
+    def check_due(self, now: float):
+        """ Run the checks which are due at `now`. """
+        while self.heap and self.heap[0][0] <= now:
+            due, _, recipient = heapq.heappop(self.heap)
+            peer = self.peers[recipient]
+
+            if peer.due != due:
+                continue
+
+            try:
+                self.check(peer, now)
+            except RaidenShuttingDown:
+                raise
+            except Exception:  # pylint: disable=broad-except
+                # e.g. a transient RPC error while looking up the endpoint,
+                # the other peers are still checked and this one is retried
+                log.exception(
+                    'health check failed',
+                    node=pex(self.transport.raiden.address),
+                    to=pex(recipient),
+                )
+                self.schedule(peer, now + self.nat_keepalive_timeout)
+
+    def check(self, peer: PeerHealth, now: float):
+        """ Run the check of `peer` which is due. """
+        if peer.phase == PHASE_NEW:
             log.debug(
-                'node answered',
-                node=pex(transport.raiden.address),
-                to=pex(recipient),
-                current_state=current_state,
-                new_state=NODE_NETWORK_REACHABLE,
+                'starting healthcheck for',
+                node=pex(self.transport.raiden.address),
+                to=pex(peer.recipient),
             )
 
-            if last_state != NODE_NETWORK_REACHABLE:
-                last_state = NODE_NETWORK_REACHABLE
-                transport.set_node_network_state(
-                    recipient,
-                    last_state,
+            # The state of the node is unknown, the events are set to allow
+            # the tasks to do work.
+            self.transport.set_node_network_state(peer.recipient, NODE_NETWORK_UNKNOWN)
+            self.check_endpoint(peer, now)
+
+        elif peer.phase == PHASE_DISCOVERY:
+            self.check_endpoint(peer, now)
+
+        elif peer.phase == PHASE_KEEPALIVE:
+            if peer.last_seen is not None and now - peer.last_seen < self.nat_keepalive_timeout:
+                self.schedule(peer, peer.last_seen + self.keepalive_interval())
+            else:
+                self.start_ping(peer, now)
+
+        elif peer.phase == PHASE_PING:
+            if peer.retries_left > 1:
+                peer.retries_left -= 1
+                self.send_ping(peer, PRIORITY_RETRY)
+                self.schedule(peer, now + self.nat_keepalive_timeout)
+            else:
+                log.debug(
+                    'node is unresponsive',
+                    node=pex(self.transport.raiden.address),
+                    to=pex(peer.recipient),
+                    current_state=peer.network_state,
+                    new_state=NODE_NETWORK_UNREACHABLE,
+                    retries=self.nat_keepalive_retries,
+                    timeout=self.nat_keepalive_timeout,
                 )
-                event_unhealthy.clear()
-                event_healthy.set()
+
+                # The node is not healthy, clear the event to stop all queue
+                # tasks
+                self.set_network_state(peer, NODE_NETWORK_UNREACHABLE)
+
+                # Retry until recovery, used for:
+                # - Checking node status.
+                # - Nat punching.
+                peer.phase = PHASE_INVITATION
+                self.send_ping(peer, PRIORITY_RETRY)
+                self.schedule(peer, now + self.nat_invitation_timeout)
+
+        elif peer.phase == PHASE_INVITATION:
+            self.send_ping(peer, PRIORITY_RETRY)
+            self.schedule(peer, now + self.nat_invitation_timeout)
+
+    def check_endpoint(self, peer: PeerHealth, now: float):
+        """ Wait for the end-point registration of `peer`. """
+        try:
+            self.transport.get_host_port(peer.recipient)
+        except UnknownAddress:
+            if peer.phase == PHASE_NEW:
+                log.debug(
+                    'waiting for endpoint registration',
+                    node=pex(self.transport.raiden.address),
+                    to=pex(peer.recipient),
+                )
+
+                # Always call `clear` before `set`, since only `set` does
+                # context-switches it's easier to reason about tasks that are
+                # waiting on both events.
+                peer.events.event_healthy.clear()
+                peer.events.event_unhealthy.set()
+
+                peer.phase = PHASE_DISCOVERY
+                peer.backoff = udp_utils.timeout_exponential_backoff(
+                    self.nat_keepalive_retries,
+                    self.nat_keepalive_timeout,
+                    self.nat_invitation_timeout,
+                )
+
+            self.schedule(peer, now + next(peer.backoff))
+            return
+
+        # Start sending messages right away if the endpoint is known, the
+        # first ping is only spread over a fraction of the interval
+        peer.phase = PHASE_KEEPALIVE
+        peer.backoff = None
+        peer.events.event_unhealthy.clear()
+        peer.events.event_healthy.set()
+
+        delay = random.random() * self.nat_keepalive_timeout * PING_JITTER
+        self.schedule(peer, now + delay)
+
+    def start_ping(self, peer: PeerHealth, now: float):
+        """ Ping `peer` with the current shared Ping, a new one is signed if
+        the peer already answered its nonce.
+        """
+        if self.ping_messagedata is None or self.ping_nonce == peer.ping_nonce:
+            self.ping_nonce += 1
+            self.ping_messagedata = self.transport.get_ping(self.ping_nonce)
+            self.pings_signed += 1
+
+        # The result of the previous round is not needed anymore
+        if peer.ping_nonce is not None:
+            self.transport.messageids_to_asyncresults.pop(peer.message_id, None)
+
+        peer.phase = PHASE_PING
+        peer.retries_left = self.nat_keepalive_retries
+        peer.ping_nonce = self.ping_nonce
+        peer.ping_messagedata = self.ping_messagedata
+
+        self.send_ping(peer, PRIORITY_MESSAGE)
+        self.schedule(peer, now + self.nat_keepalive_timeout)
+
+    def send_ping(self, peer: PeerHealth, priority: int):
+        # Retries resend the Ping of the round, these are never re-signed
+        try:
+            self.transport.maybe_sendraw_with_result(
+                peer.recipient,
+                peer.ping_messagedata,
+                peer.message_id,
+                priority,
+            )
+        except (InvalidAddress, UnknownAddress) as e:
+            log.debug(
+                "Couldn't send the `Ping` message",
+                node=pex(self.transport.raiden.address),
+                to=pex(peer.recipient),
+                e=e,
+            )
+
+    def set_network_state(self, peer: PeerHealth, network_state: str):
+        peer.network_state = network_state
+        self.transport.set_node_network_state(peer.recipient, network_state)
+
+        if network_state == NODE_NETWORK_REACHABLE:
+            peer.events.event_unhealthy.clear()
+            peer.events.event_healthy.set()
+        else:
+            peer.events.event_healthy.clear()
+            peer.events.event_unhealthy.set()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import struct
+
+from raiden.constants import UDP_MAX_MESSAGE_SIZE
+from raiden.encoding.messages import PACKED
+from raiden.utils import typing
+
+# A packed datagram is the PACKED byte followed by the messages, each one
+# prefixed with its length:
+#
+#   PACKED | length1 | message1 | length2 | message2 | ...
+LENGTH = struct.Struct('>H')
+HEADER_SIZE = 1
+
+
+def is_packed(datagram: bytes) -> bool:
+    return datagram[:HEADER_SIZE] == bytes([PACKED])
+
+
+def packed_size(messages: typing.List[bytes]) -> int:
+    """ Size of the datagram with all the `messages` packed. """
+    return HEADER_SIZE + sum(LENGTH.size + len(message) for message in messages)
+
+
+def can_pack(messages: typing.List[bytes], messagedata: bytes) -> bool:
+    """ True if `messagedata` fits in the datagram with `messages`. """
+    size = packed_size(messages) + LENGTH.size + len(messagedata)
+    return size <= UDP_MAX_MESSAGE_SIZE
+
+
+def pack_messages(messages: typing.List[bytes]) -> bytes:
+    """ Pack the encoded `messages` in a single datagram. """
+    parts = [bytes([PACKED])]
+
+    for message in messages:
+        parts.append(LENGTH.pack(len(message)))
+        parts.append(message)
+
+    return b''.join(parts)
+
+
+def unpack_messages(datagram: bytes) -> typing.List[bytes]:
+    """ Return the encoded messages of a packed `datagram`.
+
+    The messages are slices of `datagram`, so a memoryview is not copied.
+
+    Raises:
+        ValueError: If the datagram is truncated or contains a packed
+        datagram.
+    """
+    if not is_packed(datagram):
+        raise ValueError('datagram is not packed')
+
+    messages = list()
+    offset = HEADER_SIZE
+
+    while offset < len(datagram):
+        if offset + LENGTH.size > len(datagram):
+            raise ValueError('truncated length')
+
+        (length, ) = LENGTH.unpack_from(datagram, offset)
+        offset += LENGTH.size
+
+        message = datagram[offset:offset + length]
+        if not message or len(message) != length:
+            raise ValueError('truncated message')
+
+        if is_packed(message):
+            raise ValueError('packed datagrams cannot be nested')
+
+        messages.append(message)
+        offset += length
+
+    return messages
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 import socket
+import time
 from binascii import hexlify
+from collections import Counter
+from functools import partial
 
-import cachetools
 import gevent
 from gevent.event import (
     AsyncResult,
@@ -19,21 +21,33 @@ from raiden.exceptions import (
     RaidenShuttingDown,
 )
 from raiden.constants import UDP_MAX_MESSAGE_SIZE
+from raiden.encoding import messages
 from raiden.messages import (
     message_from_sendevent,
-    decode,
     Delivered,
+    DeliveredBatch,
+    EnvelopeMessage,
     Message,
     Ping,
     Pong,
+    SignedMessage,
 )
-from raiden.settings import CACHE_TTL
 from raiden.utils import pex, typing
 from raiden.utils.notifying_queue import NotifyingQueue
+from raiden.utils.results_registry import ResultsRegistry
 from raiden.udp_message_handler import on_udp_message
+from raiden.transfer import channel, views
 from raiden.transfer.state_change import ReceiveDelivered
 from raiden.transfer.state_change import ActionChangeNodeNetworkState
-from raiden.network.transport.udp import healthcheck
+from raiden.network.throttle import (
+    PRIORITY_ACK,
+    PRIORITY_MESSAGE,
+    PRIORITY_RETRY,
+    ThrottleMetrics,
+)
+from raiden.network.transport.delivered import DeliveredCoalescer
+from raiden.network.transport.verifier import SignatureVerifier
+from raiden.network.transport.udp import healthcheck, udp_framing
 from raiden.network.transport.udp.udp_utils import (
     event_first_of,
     timeout_exponential_backoff,
@@ -56,6 +70,49 @@ Queue_T = typing.List[QueueItem_T]
 # - The state of the node must be synchronized among all tasks that are
 # handling messages.
 
+#: Messages with a balance proof, the nonce allows the recipient to restore
+#: their order, so these can be in flight together
+PIPELINED_CMDIDS = frozenset((
+    messages.SECRET,
+    messages.DIRECTTRANSFER,
+    messages.LOCKEDTRANSFER,
+    messages.REFUNDTRANSFER,
+))
+
+
+def send_until_acknowledged(
+        transport: 'UDPTransport',
+        recipient: typing.Address,
+        messagedata: bytes,
+        message_id: int,
+        event_stop: Event,
+        event_healthy: Event,
+        event_unhealthy: Event,
+        message_retries: int,
+        message_retry_timeout: int,
+        message_retry_max_timeout: int,
+) -> bool:
+    """ Retry a single in-flight message with its own backoff. """
+    backoff = timeout_exponential_backoff(
+        message_retries,
+        message_retry_timeout,
+        message_retry_max_timeout,
+    )
+
+    try:
+        return retry_with_recovery(
+            transport,
+            messagedata,
+            message_id,
+            recipient,
+            event_stop,
+            event_healthy,
+            event_unhealthy,
+            backoff,
+        )
+    except RaidenShuttingDown:  # For a clean shutdown process
+        return False
+
 
 def single_queue_send(
         transport: 'UDPTransport',
@@ -67,9 +124,17 @@ def single_queue_send(
         message_retries: int,
         message_retry_timeout: int,
         message_retry_max_timeout: int,
+        window_size: int = 1,
 ):
     """ Handles a single message queue for `recipient`.
 
+    Up to `window_size` messages are sent without waiting for the previous
+    ones to be acknowledged, each message is retried independently until its
+    `Delivered` arrives. Only messages with a balance proof are pipelined, the
+    receiver uses the nonce to process them in order, see
+    `UDPTransport.receive_message`. Any other message is sent alone, after the
+    messages before it are acknowledged and before the next ones are sent.
+
     Notes:
     - This task must be the only consumer of queue.
     - This task can be killed at any time, but the intended usage is to stop it
@@ -87,11 +152,16 @@ def single_queue_send(
     if not isinstance(queue, NotifyingQueue):
         raise ValueError('queue must be a NotifyingQueue.')
 
-    # Reusing the event, clear must be carefully done
-    data_or_stop = event_first_of(
-        queue,
-        event_stop,
-    )
+    # Set on a new item, an acknowledgement, or to quit. The queue only
+    # notifies when it becomes non-empty, so the messages are removed from it
+    # once they are in flight, otherwise new items would go unnoticed.
+    event_wakeup = Event()
+    wakeup = lambda _: event_wakeup.set()  # noqa: E731
+
+    # The queue may be initialized with items, these don't notify
+    event_wakeup.set()
+    queue.rawlink(wakeup)
+    event_stop.rawlink(wakeup)
 
     # Wait for the endpoint registration or to quit
     event_first_of(
@@ -99,48 +169,64 @@ def single_queue_send(
         event_stop,
     ).wait()
 
-    while True:
-        data_or_stop.wait()
+    # List of (greenlet, pipelined) in the queue order
+    in_flight = list()
 
-        if event_stop.is_set():
-            return
+    try:
+        while True:
+            event_wakeup.wait()
 
-        # The queue is not empty at this point, so this won't raise Empty.
-        # This task being the only consumer is a requirement.
-        (messagedata, message_id) = queue.peek(block=False)
+            # Clear before checking the state, a concurrent notification will
+            # set the event again and the state is checked once more.
+            event_wakeup.clear()
 
-        backoff = timeout_exponential_backoff(
-            message_retries,
-            message_retry_timeout,
-            message_retry_max_timeout,
-        )
+            if event_stop.is_set():
+                return
 
-        try:
-            acknowledged = retry_with_recovery(
-                transport,
-                messagedata,
-                message_id,
-                recipient,
-                event_stop,
-                event_healthy,
-                event_unhealthy,
-                backoff,
-            )
-        except RaidenShuttingDown:  # For a clean shutdown process
-            return
+            for greenlet, _ in in_flight:
+                # The task is shutting down
+                if greenlet.ready() and not greenlet.value:
+                    return
 
-        if acknowledged:
-            queue.get()
+            in_flight = [
+                (greenlet, pipelined)
+                for greenlet, pipelined in in_flight
+                if not greenlet.ready()
+            ]
 
             # Checking the length of the queue does not trigger a
             # context-switch, so it's safe to assume the length of the queue
-            # won't change under our feet and when a new item will be added the
-            # event will be set again.
-            if not queue:
-                data_or_stop.clear()
-
-                if event_stop.is_set():
-                    return
+            # won't change under our feet.
+            while queue and len(in_flight) < window_size:
+                # The queue is not empty at this point, so this won't raise
+                # Empty. This task being the only consumer is a requirement.
+                (messagedata, message_id) = queue.peek(block=False)
+                pipelined = messagedata[0] in PIPELINED_CMDIDS
+
+                if in_flight and not (pipelined and in_flight[-1][1]):
+                    break
+
+                queue.get()
+
+                greenlet = gevent.spawn(
+                    send_until_acknowledged,
+                    transport,
+                    recipient,
+                    messagedata,
+                    message_id,
+                    event_stop,
+                    event_healthy,
+                    event_unhealthy,
+                    message_retries,
+                    message_retry_timeout,
+                    message_retry_max_timeout,
+                )
+                greenlet.rawlink(wakeup)
+                in_flight.append((greenlet, pipelined))
+    finally:
+        queue.unlink(wakeup)
+        event_stop.unlink(wakeup)
+        gevent.killall([greenlet for greenlet, _ in in_flight])
 
 
 class UDPTransport:
@@ -157,26 +243,58 @@ class UDPTransport:
         self.nat_keepalive_retries = config['nat_keepalive_retries']
         self.nat_keepalive_timeout = config['nat_keepalive_timeout']
         self.nat_invitation_timeout = config['nat_invitation_timeout']
+        self.window_size = config['window_size']
+        self.packing_window = config['packing_window']
+        self.delivered_delay = config['delivered_delay']
 
         self.event_stop = Event()
 
         self.greenlets = list()
-        self.addresses_events = dict()
-
-        self.messageids_to_asyncresults = dict()
+        self.healthcheck = healthcheck.HealthCheckScheduler(
+            self,
+            self.event_stop,
+            self.nat_keepalive_retries,
+            self.nat_keepalive_timeout,
+            self.nat_invitation_timeout,
+        )
 
-        # Maps the addresses to a dict with the latest nonce (using a dict
-        # because python integers are immutable)
-        self.nodeaddresses_to_nonces = dict()
+        # The results of the messages waiting for an acknowledgement. An entry
+        # expires if the message is not retransmitted for `results_ttl`
+        # seconds, the retransmission adds a new one, see `udp_utils.retry`.
+        self.messageids_to_asyncresults = ResultsRegistry(
+            config['results_ttl'],
+            config['results_max_size'],
+        )
 
-        cache = cachetools.TTLCache(
-            maxsize=50,
-            ttl=CACHE_TTL,
+        # Balance proofs received ahead of their nonce, these are processed
+        # once the previous ones arrive. Maps (sender, token network, channel)
+        # to a dict nonce -> message.
+        self.channels_to_pending_messages = dict()
+
+        # Messages waiting to be packed in a datagram, and the task which
+        # flushes them after the packing window
+        self.hostport_to_packedmessages = dict()
+        self.hostport_to_packedpriority = dict()
+        self.hostport_to_flushtask = dict()
+
+        # The messages handled recently, keyed by their encoding, the
+        # retransmissions are answered without recovering the signature again
+        self.recent_messages = ResultsRegistry(
+            config['recent_messages_ttl'],
+            config['recent_messages_size'],
         )
-        cache_wrapper = cachetools.cached(cache=cache)
-        self.get_host_port = cache_wrapper(discovery.get)
+        self.receive_metrics = Counter()
+        self.verifier = SignatureVerifier(config['verifier_workers'])
+
+        # First transmission of the messages waiting for an acknowledgement,
+        # used to measure the round trip time
+        self.messageids_to_senttimes = dict()
+
+        # The discovery caches the endpoints, see ContractDiscovery
+        self.get_host_port = discovery.get
 
         self.throttle_policy = throttle_policy
+        self.throttle_metrics = ThrottleMetrics()
         self.server = DatagramServer(udpsocket, handle=self._receive)
 
     def start(
@@ -186,11 +304,21 @@ class UDPTransport:
     ):
         self.raiden = raiden
         self.queueids_to_queues = dict()
+        self.channels_to_pending_messages = dict()
+        self.delivered_coalescer = DeliveredCoalescer(
+            raiden.sign,
+            partial(self.maybe_send, priority=PRIORITY_ACK),
+            self.delivered_delay,
+        )
 
         # server.stop() clears the handle. Since this may be a restart the
         # handle must always be set
         self.server.set_handle(self._receive)
 
+        healthcheck = gevent.spawn(self.healthcheck.run)
+        healthcheck.link_exception(self._on_healthcheck_exception)
+        self.greenlets.append(healthcheck)
+
         for (recipient, queue_name), queue in queueids_to_queues.items():
             encoded_queue = list()
 
@@ -205,6 +333,14 @@ class UDPTransport:
 
         self.server.start()
 
+    def _on_healthcheck_exception(self, greenlet):
+        # The network state of the peers is not updated anymore
+        log.critical(
+            'health check scheduler failed',
+            node=pex(self.raiden.address),
+            error=greenlet.exception,
+        )
+
     def stop_and_wait(self):
         # Stop handling incoming packets, but don't close the socket. The
         # socket can only be safely closed after all outgoing tasks are stopped
@@ -214,10 +350,38 @@ class UDPTransport:
         self.event_stop.set()
         gevent.wait(self.greenlets)
 
+        # Send the messages that are waiting to be packed, e.g. a Delivered
+        self.delivered_coalescer.flush_all()
+        for host_port in list(self.hostport_to_packedmessages):
+            self.flush(host_port)
+
+        log.debug(
+            'throttling metrics',
+            node=pex(self.raiden.address),
+            metrics=self.throttle_metrics.report(),
+        )
+        log.debug(
+            'receive metrics',
+            node=pex(self.raiden.address),
+            metrics=dict(self.receive_metrics),
+        )
+        log.debug(
+            'results metrics',
+            node=pex(self.raiden.address),
+            metrics=self.messageids_to_asyncresults.metrics(),
+        )
+        log.debug(
+            'healthcheck metrics',
+            node=pex(self.raiden.address),
+            peers=len(self.healthcheck.peers),
+            pings_signed=self.healthcheck.pings_signed,
+        )
+
         # All outgoing tasks are stopped. Now it's safe to close the socket. At
         # this point there might be some incoming message being processed,
         # keeping the socket open is not useful for these.
         self.server.stop()
+        self.verifier.stop()
 
         # Calling `.close()` on a gevent socket doesn't actually close the underlying os socket
         # so we do that ourselves here.
@@ -233,43 +397,16 @@ class UDPTransport:
             async_result.set(False)
 
     def get_health_events(self, recipient):
-        """ Starts a healthcheck task for `recipient` and returns a
-        HealthEvents with locks to react on its current state.
+        """ Starts healthchecking `recipient` and returns a HealthEvents with
+        locks to react on its current state.
         """
-        if recipient not in self.addresses_events:
-            self.start_health_check(recipient)
-
-        return self.addresses_events[recipient]
+        return self.healthcheck.start_health_check(recipient)
 
     def start_health_check(self, recipient):
-        """ Starts a task for healthchecking `recipient` if there is not
-        one yet.
+        """ Starts healthchecking `recipient` if it is not checked yet. All
+        the peers are checked by a single task, see HealthCheckScheduler.
         """
-        if recipient not in self.addresses_events:
-            ping_nonce = self.nodeaddresses_to_nonces.setdefault(
-                recipient,
-                {'nonce': 0},  # HACK: Allows the task to mutate the object
-            )
-
-            events = healthcheck.HealthEvents(
-                event_healthy=Event(),
-                event_unhealthy=Event(),
-            )
-
-            self.addresses_events[recipient] = events
-
-            self.greenlets.append(gevent.spawn(
-                healthcheck.healthcheck,
-                self,
-                recipient,
-                self.event_stop,
-                events.event_healthy,
-                events.event_unhealthy,
-                self.nat_keepalive_retries,
-                self.nat_keepalive_timeout,
-                self.nat_invitation_timeout,
-                ping_nonce,
-            ))
+        self.healthcheck.start_health_check(recipient)
 
     def init_queue_for(
             self,
@@ -300,6 +437,7 @@ class UDPTransport:
             self.retries_before_backoff,
             self.retry_interval,
             self.retry_interval * 10,
+            self.window_size,
         ))
 
         log.debug(
@@ -344,7 +482,7 @@ class UDPTransport:
             raise ValueError('Invalid address {}'.format(pex(recipient)))
 
         # These are not protocol messages, but transport specific messages
-        if isinstance(message, (Delivered, Ping, Pong)):
+        if isinstance(message, (Delivered, DeliveredBatch, Ping, Pong)):
             raise ValueError('Do not use send for {} messages'.format(message.__class__.__name__))
 
         messagedata = message.encode()
@@ -371,7 +509,12 @@ class UDPTransport:
                 message=message,
             )
 
-    def maybe_send(self, recipient: typing.Address, message: Message):
+    def maybe_send(
+            self,
+            recipient: typing.Address,
+            message: Message,
+            priority: int = PRIORITY_MESSAGE,
+    ):
         """ Send message to recipient if the transport is running. """
 
         if not is_binary_address(recipient):
@@ -380,37 +523,126 @@ class UDPTransport:
         messagedata = message.encode()
         host_port = self.get_host_port(recipient)
 
-        self.maybe_sendraw(host_port, messagedata)
+        self.maybe_sendraw(host_port, messagedata, priority)
 
     def maybe_sendraw_with_result(
             self,
             recipient: typing.Address,
             messagedata: bytes,
             message_id: int,
+            priority: int = PRIORITY_MESSAGE,
     ) -> AsyncResult:
         """ Send message to recipient if the transport is running.
 
+        A retransmission must use `PRIORITY_RETRY`, it informs the throttling
+        policy of the loss.
+
         Returns:
             An AsyncResult that will be set once the message is delivered. As
             long as the message has not been acknowledged with a Delivered
-            message the function will return the same AsyncResult.
+            message the function will return the same AsyncResult, unless it
+            expired because the message was not sent for `results_ttl`
+            seconds.
         """
         async_result = self.messageids_to_asyncresults.get(message_id)
         if async_result is None:
             async_result = AsyncResult()
             self.messageids_to_asyncresults[message_id] = async_result
+        else:
+            self.messageids_to_asyncresults.touch(message_id)
 
         host_port = self.get_host_port(recipient)
-        self.maybe_sendraw(host_port, messagedata)
+
+        if priority == PRIORITY_RETRY:
+            # The round trip time of a retransmitted message is ambiguous
+            self.messageids_to_senttimes.pop(message_id, None)
+            self.throttle_policy.lost(host_port)
+        elif message_id not in self.messageids_to_senttimes:
+            self.messageids_to_senttimes[message_id] = (host_port, time.monotonic())
+
+        self.maybe_sendraw(host_port, messagedata, priority)
 
         return async_result
 
-    def maybe_sendraw(self, host_port: typing.Tuple[int, int], messagedata: bytes):
-        """ Send message to recipient if the transport is running. """
+    def sample_round_trip(self, message_id):
+        """ Inform the throttling policy of the round trip time of the
+        acknowledged `message_id`.
+        """
+        sent = self.messageids_to_senttimes.pop(message_id, None)
+
+        if sent is not None:
+            host_port, sent_at = sent
+            self.throttle_policy.delivered(host_port, time.monotonic() - sent_at)
+
+    def maybe_sendraw(
+            self,
+            host_port: typing.Tuple[int, int],
+            messagedata: bytes,
+            priority: int = PRIORITY_MESSAGE,
+    ):
+        """ Send message to recipient if the transport is running.
+
+        The messages sent to the same `host_port` within the packing window
+        are packed in a single datagram, see `udp_framing`. The datagram is
+        throttled with the most urgent priority of its messages.
+        """
+        if not self.packing_window:
+            self.maybe_senddatagram(host_port, messagedata, priority)
+            return
+
+        messages = self.hostport_to_packedmessages.get(host_port)
+        if messages and not udp_framing.can_pack(messages, messagedata):
+            self.flush(host_port)
+            messages = None
+
+        if messages is None:
+            messages = self.hostport_to_packedmessages[host_port] = list()
+
+        messages.append(messagedata)
+        self.hostport_to_packedpriority[host_port] = min(
+            priority,
+            self.hostport_to_packedpriority.get(host_port, priority),
+        )
+
+        if host_port not in self.hostport_to_flushtask:
+            self.hostport_to_flushtask[host_port] = gevent.spawn_later(
+                self.packing_window,
+                self.flush,
+                host_port,
+            )
+
+    def flush(self, host_port: typing.Tuple[int, int]):
+        """ Send the messages waiting to be packed for `host_port`. """
+        messages = self.hostport_to_packedmessages.pop(host_port, None)
+        priority = self.hostport_to_packedpriority.pop(host_port, PRIORITY_MESSAGE)
+        flush_task = self.hostport_to_flushtask.pop(host_port, None)
+
+        if flush_task is not None and flush_task is not gevent.getcurrent():
+            flush_task.kill(block=False)
+
+        if not messages:
+            return
+
+        # A single message is sent as is
+        if len(messages) == 1:
+            datagram = messages[0]
+        else:
+            datagram = udp_framing.pack_messages(messages)
+
+        self.maybe_senddatagram(host_port, datagram, priority)
+
+    def maybe_senddatagram(
+            self,
+            host_port: typing.Tuple[int, int],
+            datagram: bytes,
+            priority: int = PRIORITY_MESSAGE,
+    ):
+        """ Send datagram to host_port if the transport is running. """
 
         # Don't sleep if timeout is zero, otherwise a context-switch is done
         # and the message is delayed, increasing it's latency
-        sleep_timeout = self.throttle_policy.consume(1)
+        sleep_timeout = self.throttle_policy.consume(1, host_port, priority)
+        self.throttle_metrics.record(priority, sleep_timeout)
         if sleep_timeout:
             gevent.sleep(sleep_timeout)
 
@@ -418,7 +650,7 @@ class UDPTransport:
         # message. There must be *no context-switches after this test*.
         if hasattr(self.server, 'socket'):
             self.server.sendto(
-                messagedata,
+                datagram,
                 host_port,
             )
 
@@ -430,7 +662,6 @@ class UDPTransport:
 
     def receive(self, messagedata: bytes):
         """ Handle an UDP packet. """
-        # pylint: disable=unidiomatic-typecheck
 
         if len(messagedata) > UDP_MAX_MESSAGE_SIZE:
             log.error(
@@ -439,26 +670,217 @@ class UDPTransport:
                 message=hexlify(messagedata),
                 length=len(messagedata),
             )
+            self.receive_metrics['oversized'] += 1
             return
 
-        message = decode(messagedata)
+        # The packed messages are slices of the view, these are only copied
+        # if the message is decoded
+        datagram = memoryview(messagedata)
+
+        if udp_framing.is_packed(datagram):
+            try:
+                packed_messages = udp_framing.unpack_messages(datagram)
+            except ValueError:
+                log.error(
+                    'INVALID MESSAGE: Malformed packed datagram',
+                    node=pex(self.raiden.address),
+                    message=hexlify(messagedata),
+                )
+                self.receive_metrics['malformed'] += 1
+                return
+        else:
+            packed_messages = [datagram]
+
+        self.receive_batch(packed_messages)
+
+    def receive_batch(self, batch: typing.List[memoryview]):
+        """ Handle the encoded messages of a datagram.
+
+        The cheap checks are done before the signature is recovered: the
+        header of the message, the duplicates of the recently handled
+        messages and the channel of a balance proof. The remaining messages
+        are decoded together, see SignatureVerifier.
+        """
+        # pylint: disable=unidiomatic-typecheck
+
+        to_decode = list()
+        for messagedata in batch:
+            rejected = self.reject_reason(messagedata)
+            if rejected is not None:
+                log.debug(
+                    'Dropping message',
+                    node=pex(self.raiden.address),
+                    reason=rejected,
+                    message=hexlify(messagedata),
+                )
+                self.receive_metrics[rejected] += 1
+                continue
+
+            duplicate = self.recent_messages.get(messagedata)
+            if duplicate is not None:
+                self.receive_metrics['duplicate'] += 1
+                self.receive_duplicate(duplicate)
+                continue
+
+            to_decode.append(bytes(messagedata))
+
+        decoded = self.verifier.decode_batch(to_decode)
+
+        for messagedata, message in zip(to_decode, decoded):
+            if message is None:
+                log.error(
+                    'INVALID MESSAGE: Invalid signature',
+                    node=pex(self.raiden.address),
+                    message=hexlify(messagedata),
+                )
+                self.receive_metrics['invalid_signature'] += 1
+                continue
+
+            self.receive_metrics['processed'] += 1
+
+            # Any authenticated message shows the sender is alive, its next
+            # keepalive Ping is not needed
+            if isinstance(message, SignedMessage):
+                self.healthcheck.heard_from(message.sender)
+
+            handled = True
+            if type(message) == Pong:
+                self.receive_pong(message)
+            elif type(message) == Ping:
+                self.receive_ping(message)
+            elif type(message) == Delivered:
+                self.receive_delivered(message)
+            elif type(message) == DeliveredBatch:
+                self.receive_delivered_batch(message)
+            else:
+                handled = self.receive_message(message)
+
+            if handled:
+                self.recent_messages[messagedata] = message
+
+    def reject_reason(self, messagedata: memoryview) -> typing.Optional[str]:
+        """ Return why `messagedata` must be dropped, None if it is valid.
+
+        Only the header of the message is read, the signature is not checked.
+        """
+        klass = messages.CMDID_MESSAGE.get(messagedata[0]) if messagedata else None
+
+        if klass is None:
+            return 'unknown_cmdid'
+
+        if len(messagedata) != klass.size:
+            return 'invalid_size'
+
+        if messagedata[0] in PIPELINED_CMDIDS:
+            channel_state = views.get_channelstate_by_token_network_identifier(
+                views.state_from_raiden(self.raiden),
+                bytes(klass.get_bytes_from(messagedata, 'token_network_address')),
+                bytes(klass.get_bytes_from(messagedata, 'channel')),
+            )
+
+            # The sender will retry, the channel may be known by then
+            if channel_state is None:
+                return 'unknown_channel'
+
+        return None
+
+    def receive_duplicate(self, message: Message):
+        """ Handle a retransmission of the recently handled `message`. """
+        # pylint: disable=unidiomatic-typecheck
 
-        if type(message) == Pong:
-            self.receive_pong(message)
-        elif type(message) == Ping:
+        if type(message) == Ping:
+            # The Pong may have been lost
             self.receive_ping(message)
-        elif type(message) == Delivered:
-            self.receive_delivered(message)
-        elif message is not None:
-            self.receive_message(message)
-        else:
-            log.error(
-                'INVALID MESSAGE: Unknown cmdid',
-                node=pex(self.raiden.address),
-                message=hexlify(messagedata),
+
+        elif isinstance(message, (Pong, Delivered, DeliveredBatch)):
+            return
+
+        elif not self.is_pending(message):
+            # The message was processed, the Delivered may have been lost
+            self.delivered_coalescer.delivered(
+                message.sender,
+                message.message_identifier,
             )
 
+    def is_pending(self, message: Message) -> bool:
+        """ True if `message` waits for the previous balance proofs. """
+        if not isinstance(message, EnvelopeMessage):
+            return False
+
+        key = (message.sender, message.token_network_address, message.channel)
+        return message.nonce in self.channels_to_pending_messages.get(key, ())
+
     def receive_message(self, message: Message):
+        """ Process `message` in the order of the balance proofs.
+
+        The sender pipelines the messages with a balance proof, so these may
+        arrive out-of-order. A message with a nonce ahead of the channel is
+        kept, without acknowledging it, until the previous ones are
+        processed. At most `window_size` messages are kept per channel, the
+        others are dropped and will be retried by the sender.
+
+        Returns:
+            bool: False if the message was dropped.
+        """
+        if not isinstance(message, EnvelopeMessage):
+            self.process_message(message)
+            return True
+
+        key = (message.sender, message.token_network_address, message.channel)
+        expected_nonce = self.get_expected_nonce(message)
+
+        if expected_nonce is not None and message.nonce > expected_nonce:
+            pending = self.channels_to_pending_messages.setdefault(key, dict())
+
+            if message.nonce in pending or len(pending) < self.window_size:
+                pending[message.nonce] = message
+            else:
+                log.debug(
+                    'Dropping out-of-order message',
+                    node=pex(self.raiden.address),
+                    sender=pex(message.sender),
+                    nonce=message.nonce,
+                    expected_nonce=expected_nonce,
+                )
+                return False
+
+            return True
+
+        self.process_message(message)
+
+        # Processing may switch context, the pending messages are checked
+        # against the current nonce of the channel
+        pending = self.channels_to_pending_messages.get(key)
+        while pending:
+            nonce = min(pending)
+            expected_nonce = self.get_expected_nonce(pending[nonce])
+
+            if expected_nonce is not None and nonce > expected_nonce:
+                break
+
+            self.process_message(pending.pop(nonce))
+
+        if pending is not None and not pending:
+            self.channels_to_pending_messages.pop(key, None)
+
+        return True
+
+    def get_expected_nonce(self, message: EnvelopeMessage) -> typing.Optional[int]:
+        """ Return the nonce of the next balance proof from the sender of
+        `message`, None if the channel is not known.
+        """
+        channel_state = views.get_channelstate_by_token_network_identifier(
+            views.state_from_raiden(self.raiden),
+            message.token_network_address,
+            message.channel,
+        )
+
+        if channel_state is None or channel_state.partner_state.address != message.sender:
+            return None
+
+        return channel.get_next_nonce(channel_state.partner_state)
+
+    def process_message(self, message: Message):
         """ Handle a Raiden protocol message.
 
         The protocol requires durability of the messages. The UDP transport
@@ -481,12 +903,12 @@ class UDPTransport:
             #   state change
             # - Decode it, save to the WAL, and process it (the current
             #   implementation)
-            delivered_message = Delivered(message.message_identifier)
-            self.raiden.sign(delivered_message)
-
-            self.maybe_send(
+            #
+            # The messages received together are acknowledged with a single
+            # signature, see DeliveredCoalescer.
+            self.delivered_coalescer.delivered(
                 message.sender,
-                delivered_message,
+                message.message_identifier,
             )
 
     def receive_delivered(self, delivered: Delivered):
@@ -497,10 +919,21 @@ class UDPTransport:
         protocol, but it's required by this transport to provide the required
         properties.
         """
-        processed = ReceiveDelivered(delivered.delivered_message_identifier)
+        self.message_delivered(delivered.delivered_message_identifier)
+
+    def receive_delivered_batch(self, delivered: DeliveredBatch):
+        """ Handle a DeliveredBatch message, which acknowledges many messages
+        at once.
+        """
+        for message_id in delivered.delivered_message_identifiers:
+            self.message_delivered(message_id)
+
+    def message_delivered(self, message_id: int):
+        self.sample_round_trip(message_id)
+
+        processed = ReceiveDelivered(message_id)
         self.raiden.handle_state_change(processed)
 
-        message_id = delivered.delivered_message_identifier
         async_result = self.raiden.transport.messageids_to_asyncresults.get(message_id)
 
         # clear the async result, otherwise we have a memory leak
@@ -526,7 +959,7 @@ class UDPTransport:
         self.raiden.sign(pong)
 
         try:
-            self.maybe_send(ping.sender, pong)
+            self.maybe_send(ping.sender, pong, PRIORITY_ACK)
         except (InvalidAddress, UnknownAddress) as e:
             log.debug("Couldn't send the `Delivered` message", e=e)
 
@@ -534,6 +967,7 @@ class UDPTransport:
         """ Handles a Pong message. """
 
         message_id = ('ping', pong.nonce, pong.sender)
+        self.sample_round_trip(message_id)
         async_result = self.messageids_to_asyncresults.get(message_id)
 
         if async_result is not None:
@@ -545,6 +979,8 @@ class UDPTransport:
 
             async_result.set(True)
 
+        self.healthcheck.pong_received(pong.sender, pong.nonce)
+
     def get_ping(self, nonce: int) -> Ping:
         """ Returns a signed Ping message.
 
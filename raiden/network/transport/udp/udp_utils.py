@@ -7,6 +7,7 @@ from gevent.event import (
     Event,
 )
 
+from raiden.network.throttle import PRIORITY_RETRY
 from raiden.utils import typing
 # type alias to avoid both circular dependencies and flake8 errors
 UDPTransport = 'UDPTransport'
@@ -106,12 +107,20 @@ def retry(
         if event_quit.wait(timeout=timeout) is True:
             break
 
-        transport.maybe_sendraw_with_result(
+        retry_result = transport.maybe_sendraw_with_result(
             recipient,
             messagedata,
             message_id,
+            PRIORITY_RETRY,
         )
 
+        # The result expired while the message was not retransmitted, e.g.
+        # waiting for the recovery of the node, the acknowledgement will set
+        # the new one
+        if retry_result is not async_result:
+            async_result = retry_result
+            async_result.rawlink(lambda _: event_quit.set())
+
     return async_result.ready()
 
 
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from gevent.event import Event
+from gevent.threadpool import ThreadPool
+
+from raiden.messages import decode
+from raiden.utils import typing
+
+
+class SignatureVerifier:
+    """ Decodes the received messages and recovers their signers.
+
+    With `workers` native threads the messages of a batch are decoded in
+    parallel, the signature recovery of coincurve releases the GIL. The
+    batches are returned in the order they were submitted, so the messages
+    are handled in the order they were received. With zero workers the
+    messages are decoded by the calling greenlet.
+
+    Args:
+        workers: Number of threads, zero to disable the pool.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pool = ThreadPool(workers) if workers else None
+
+        self.next_ticket = 0
+        self.turn = 0
+        self.finished_tickets = set()
+        self.tickets_to_waiters = dict()
+
+    def decode_batch(self, batch: typing.List[bytes]) -> typing.List:
+        """ Decode the encoded messages of `batch`, an entry is None if its
+        signature is invalid.
+        """
+        if self.pool is None:
+            return [decode(messagedata) for messagedata in batch]
+
+        if not batch:
+            return []
+
+        ticket = self.next_ticket
+        self.next_ticket += 1
+
+        try:
+            results = [self.pool.spawn(decode, messagedata) for messagedata in batch]
+            messages = [result.get() for result in results]
+
+            if ticket != self.turn:
+                waiter = self.tickets_to_waiters[ticket] = Event()
+                waiter.wait()
+
+            return messages
+        finally:
+            self.release(ticket)
+
+    def release(self, ticket: int):
+        """ Let the batches after `ticket` return. A batch which failed or was
+        killed releases its ticket too, otherwise the next ones would wait
+        forever.
+        """
+        self.tickets_to_waiters.pop(ticket, None)
+        self.finished_tickets.add(ticket)
+
+        while self.turn in self.finished_tickets:
+            self.finished_tickets.remove(self.turn)
+            self.turn += 1
+
+        waiter = self.tickets_to_waiters.get(self.turn)
+        if waiter is not None:
+            waiter.set()
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.kill()
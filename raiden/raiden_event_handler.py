@@ -136,19 +136,18 @@ def handle_transfersentsuccess(
         raiden: RaidenService,
         transfer_sent_success_event: EventTransferSentSuccess,
 ):
-    for result in raiden.identifier_to_results[transfer_sent_success_event.identifier]:
+    results = raiden.identifier_to_results.pop(transfer_sent_success_event.identifier, ())
+    for result in results:
         result.set(True)
 
-    del raiden.identifier_to_results[transfer_sent_success_event.identifier]
-
 
 def handle_transfersentfailed(
         raiden: RaidenService,
         transfer_sent_failed_event: EventTransferSentFailed,
 ):
-    for result in raiden.identifier_to_results[transfer_sent_failed_event.identifier]:
+    results = raiden.identifier_to_results.pop(transfer_sent_failed_event.identifier, ())
+    for result in results:
         result.set(False)
-    del raiden.identifier_to_results[transfer_sent_failed_event.identifier]
 
 
 def handle_unlockfailed(
@@ -222,13 +221,17 @@ def handle_contract_channelunlock(
     channel = raiden.chain.netting_channel(channel_unlock_event.channel_identifier)
     block_number = raiden.get_block_number()
 
+    unlock_proofs = list()
     for unlock_proof in channel_unlock_event.unlock_proofs:
         lock = Lock.from_bytes(unlock_proof.lock_encoded)
 
         if lock.expiration < block_number:
             log.error('Lock has expired!', lock=lock)
         else:
-            channel.unlock(unlock_proof)
+            unlock_proofs.append(unlock_proof)
+
+    if unlock_proofs:
+        channel.batch_unlock(unlock_proofs)
 
 
 def handle_contract_channelsettle(
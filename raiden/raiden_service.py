@@ -3,16 +3,18 @@
 import os
 import random
 import sys
-from collections import defaultdict
+import time
 
 import filelock
 import gevent
 from gevent.event import AsyncResult, Event
+from gevent.queue import Queue
 from coincurve import PrivateKey
 import structlog
 from eth_utils import is_binary_address
 
 from raiden.network.blockchain_service import BlockChainService
+from raiden.network.discovery import ContractDiscovery
 from raiden import routing, waiting
 from raiden.blockchain_events_handler import on_blockchain_event
 from raiden.constants import (
@@ -24,6 +26,10 @@ from raiden.blockchain.events import (
     get_relevant_proxies,
     BlockchainEvents,
 )
+from raiden.contract_send_dispatcher import (
+    ContractSendDispatcher,
+    is_contract_send_event,
+)
 from raiden.raiden_event_handler import on_raiden_event
 from raiden.tasks import AlarmTask
 from raiden.transfer import views, node
@@ -48,6 +54,7 @@ from raiden.transfer.mediated_transfer.state_change import (
     ActionInitMediator,
     ActionInitTarget,
 )
+from raiden.encoding.signing import Signer
 from raiden.exceptions import InvalidAddress, RaidenShuttingDown
 from raiden.messages import (LockedTransfer, SignedMessage)
 from raiden.connection_manager import ConnectionManager
@@ -57,11 +64,23 @@ from raiden.utils import (
     random_secret,
     create_default_identifier,
 )
+from raiden.utils.notifier import Notifier
+from raiden.utils.results_registry import ResultsRegistry
 from raiden.storage import wal, serialize, sqlite
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
+def payment_results_expired(identifier, results):
+    """ The payment didn't finish in time, its waiters are informed of the
+    failure.
+    """
+    log.warning('payment result expired', identifier=identifier)
+
+    for async_result in results:
+        async_result.set(False)
+
+
 def initiator_init(
         raiden,
         transfer_identifier,
@@ -171,13 +190,20 @@ class RaidenService:
             ))
 
         self.tokens_to_connectionmanagers = dict()
-        self.identifier_to_results = defaultdict(list)
+        # Entries of payments which never finish expire, the results are set
+        # to False
+        self.identifier_to_results = ResultsRegistry(
+            config['payment_results_ttl'],
+            config['payment_results_max_size'],
+            on_expire=payment_results_expired,
+        )
 
         self.chain: BlockChainService = chain
         self.default_registry = default_registry
         self.config = config
         self.privkey = private_key_bin
         self.address = privatekey_to_address(private_key_bin)
+        self.discovery = discovery
 
         if config['transport_type'] == 'udp':
             endpoint_registration_event = gevent.spawn(
@@ -189,11 +215,14 @@ class RaidenService:
             endpoint_registration_event.link_exception(endpoint_registry_exception_handler)
 
         self.private_key = PrivateKey(private_key_bin)
+        self.signer = Signer(self.private_key)
         self.pubkey = self.private_key.public_key.format(compressed=False)
         self.transport = transport
 
         self.blockchain_events = BlockchainEvents()
-        self.alarm = AlarmTask(chain)
+        # Wakes up the waiters from raiden.waiting on every state change
+        self.state_change_notifier = Notifier()
+        self.alarm = AlarmTask(chain, config['use_block_filter'])
         self.shutdown_timeout = config['shutdown_timeout']
         self.stop_event = Event()
         self.start_event = Event()
@@ -224,6 +253,21 @@ class RaidenService:
 
         self.event_poll_lock = gevent.lock.Semaphore()
 
+        # Events polled ahead of their block, and the newest block for which
+        # all the events were polled, see `_callback_new_block`.
+        self.polled_events = list()
+        self.events_polled_until = None
+
+        # Blocks with their polled events, waiting to be applied by the
+        # dispatcher, see `_callback_new_block`.
+        self.block_dispatch_queue = Queue()
+        self.block_dispatcher = None
+
+        self.contract_send_dispatcher = ContractSendDispatcher(
+            self,
+            config['contract_send_workers'],
+        )
+
         self.start()
 
     def start(self):
@@ -242,6 +286,13 @@ class RaidenService:
             storage,
         )
 
+        # The pending contract calls of the previous run are resumed, and from
+        # now on the contract calls are saved until they are done.
+        unapplied_events = self.contract_send_dispatcher.start(
+            storage,
+            unapplied_events,
+        )
+
         if self.wal.state_manager.current_state is None:
             block_number = self.chain.block_number()
 
@@ -270,6 +321,10 @@ class RaidenService:
         #   have effect.
         # - Install the filters using the correct from_block value, otherwise
         #   blockchain logs can be lost.
+        self.polled_events = list()
+        self.events_polled_until = None
+        self.block_dispatcher = gevent.spawn(self._dispatch_blocks)
+        self.block_dispatcher.link_exception(self._on_block_dispatcher_exception)
         self.alarm.register_callback(self._callback_new_block)
         self.alarm.start()
 
@@ -277,6 +332,7 @@ class RaidenService:
             self.default_registry.address,
             last_log_block_number,
         )
+        self.install_discovery_filters()
 
         # Start the transport after the registry is queried to avoid warning
         # about unknown channels.
@@ -287,7 +343,7 @@ class RaidenService:
         self.start_neighbours_healthcheck()
 
         for event in unapplied_events:
-            on_raiden_event(self, event)
+            self.handle_event(event)
 
         self.start_event.set()
 
@@ -309,6 +365,16 @@ class RaidenService:
         # contact the disconnected client
         gevent.wait(wait_for, timeout=self.shutdown_timeout)
 
+        # The alarm task is the only producer for the dispatcher, once it is
+        # stopped the already polled blocks can be applied.
+        if self.block_dispatcher is not None:
+            self.block_dispatch_queue.put(None)
+            gevent.wait([self.block_dispatcher], timeout=self.shutdown_timeout)
+
+        # The pending contract calls fail with RaidenShuttingDown once the
+        # stop event is set.
+        self.contract_send_dispatcher.stop(timeout=self.shutdown_timeout)
+
         # Filters must be uninstalled after the alarm task has stopped. Since
         # the events are polled by an alarm task callback, if the filters are
         # uninstalled before the alarm task is fully stopped the callback
@@ -322,6 +388,21 @@ class RaidenService:
         except (gevent.timeout.Timeout, RaidenShuttingDown):
             pass
 
+        # Without the filters the cached endpoints may become stale
+        if isinstance(self.discovery, ContractDiscovery):
+            self.discovery.subscribed = False
+
+        log.debug(
+            'payment results metrics',
+            node=pex(self.address),
+            metrics=self.identifier_to_results.metrics(),
+        )
+        log.debug(
+            'signing metrics',
+            node=pex(self.address),
+            metrics=self.signer.metrics(),
+        )
+
         if self.db_lock is not None:
             self.db_lock.release()
 
@@ -338,17 +419,31 @@ class RaidenService:
             block_number = self.get_block_number()
 
         event_list = self.wal.log_and_dispatch(state_change, block_number)
+        self.state_change_notifier.notify()
 
         for event in event_list:
             log.debug('EVENT', node=pex(self.address), chain_event=event)
 
-            on_raiden_event(self, event)
+            self.handle_event(event)
 
         return event_list
 
+    def handle_event(self, event):
+        """ Handle an event produced by the state machine.
+
+        The contract calls wait for the transaction to be mined, these are
+        handled in the background by the `contract_send_dispatcher`, all the
+        other events are handled right away.
+        """
+        if is_contract_send_event(event):
+            self.contract_send_dispatcher.dispatch(event)
+        else:
+            on_raiden_event(self, event)
+
     def set_node_network_state(self, node_address, network_state):
         state_change = ActionChangeNodeNetworkState(node_address, network_state)
         self.wal.log_and_dispatch(state_change, self.get_block_number())
+        self.state_change_notifier.notify()
 
     def start_health_check_for(self, node_address):
         self.transport.start_health_check(node_address)
@@ -356,6 +451,16 @@ class RaidenService:
     def _callback_new_block(self, current_block_number):
         """Called once a new block is detected by the alarm task.
 
+        This is the event fetching stage of the block pipeline, the events
+        of the block are handed over with it to `_dispatch_blocks`, which
+        applies them. Polling for the next block can proceed while the state
+        changes for the previous one are dispatched.
+
+        The filters return the logs of every block mined since the last poll,
+        so while the pipeline lags the filters are polled once for all the
+        detected blocks, and the events of the later blocks are kept until
+        their block is fetched.
+
         Note:
             This should be called only once per block, otherwise there will be
             duplicated `Block` state changes in the log.
@@ -364,6 +469,13 @@ class RaidenService:
             mined with the appropriate block_number argument from the
             AlarmTask.
         """
+        started_at = time.time()
+        detected_at = self.alarm.block_detected_at or started_at
+
+        # The in-flight transactions are checked by the transaction manager
+        # once per block, announce the block so it doesn't poll on its own.
+        self.chain.client.transaction_manager.new_block(current_block_number)
+
         # Raiden relies on blockchain events to update its off-chain state,
         # therefore some APIs /used/ to forcefully poll for events.
         #
@@ -378,7 +490,55 @@ class RaidenService:
         # expected side-effects are properly applied (introduced by the commit
         # 3686b3275ff7c0b669a6d5e2b34109c3bdf1921d)
         with self.event_poll_lock:
-            for event in self.blockchain_events.poll_blockchain_events():
+            # The filters return the logs up to the latest block of the
+            # ethereum node, which is not older than the newest block detected
+            # by the alarm task.
+            if (
+                self.events_polled_until is None or
+                current_block_number > self.events_polled_until
+            ):
+                newest_block_number = self.alarm.last_block_number
+                self.polled_events.extend(self.blockchain_events.poll_blockchain_events())
+                self.events_polled_until = max(newest_block_number, current_block_number)
+
+            events = [
+                event
+                for event in self.polled_events
+                if event.event_data['block_number'] <= current_block_number
+            ]
+            self.polled_events = [
+                event
+                for event in self.polled_events
+                if event.event_data['block_number'] > current_block_number
+            ]
+
+        # The dispatcher is the single consumer of the queue, so the blocks
+        # and its events are applied in the same order they were polled.
+        self.block_dispatch_queue.put((current_block_number, events, detected_at))
+        self.alarm.stage_metrics('fetch').record(current_block_number, detected_at, started_at)
+
+    def _on_block_dispatcher_exception(self, block_dispatcher):
+        # The state of the node would stop advancing, an exception in the
+        # dispatch stops the alarm task the same way a failing callback does.
+        log.error(
+            'block dispatch failed',
+            node=pex(self.address),
+            error=block_dispatcher.exception,
+        )
+        self.alarm.kill(block_dispatcher.exception, block=False)
+
+    def _dispatch_blocks(self):
+        """ State dispatch stage of the block pipeline. """
+        while True:
+            item = self.block_dispatch_queue.get()
+
+            if item is None:
+                return
+
+            current_block_number, events, detected_at = item
+            started_at = time.time()
+
+            for event in events:
                 # These state changes will be procesed with a block_number
                 # which is /larger/ than the NodeState's block_number.
                 on_blockchain_event(self, event, current_block_number)
@@ -396,12 +556,18 @@ class RaidenService:
             state_change = Block(current_block_number)
             self.handle_state_change(state_change, current_block_number)
 
+            self.alarm.stage_metrics('dispatch').record(
+                current_block_number,
+                detected_at,
+                started_at,
+            )
+
     def sign(self, message):
         """ Sign message inplace. """
         if not isinstance(message, SignedMessage):
             raise ValueError('{} is not signable.'.format(repr(message)))
 
-        message.sign(self.private_key, self.address)
+        message.sign(self.signer, self.address)
 
     def install_payment_network_filters(self, payment_network_id, from_block=None):
         proxies = get_relevant_proxies(
@@ -429,6 +595,22 @@ class RaidenService:
         state_change = ContractReceiveNewPaymentNetwork(payment_network)
         self.handle_state_change(state_change)
 
+    def install_discovery_filters(self):
+        """ Load the endpoints of the registered nodes and keep them updated
+        from the `AddressRegistered` events, so the transport doesn't query
+        the contract for every peer.
+        """
+        if not isinstance(self.discovery, ContractDiscovery):
+            return
+
+        # Install the filter first to avoid missing a registration, the
+        # endpoints registered in between are loaded twice
+        self.blockchain_events.add_discovery_listener(self.discovery.discovery_proxy)
+
+        partners = views.all_neighbour_nodes(views.state_from_raiden(self))
+        self.discovery.prefetch(partners)
+        self.discovery.subscribed = True
+
     def connection_manager_for_token(self, registry_address, token_address):
         if not is_binary_address(token_address):
             raise InvalidAddress('token address is not valid.')
@@ -451,7 +633,7 @@ class RaidenService:
 
     def leave_all_token_networks(self):
         state_change = ActionLeaveAllNetworks()
-        self.wal.log_and_dispatch(state_change, self.get_block_number())
+        self.handle_state_change(state_change)
 
     def close_and_settle(self):
         log.info('raiden will close and settle all channels now')
@@ -548,7 +730,7 @@ class RaidenService:
         assert identifier not in self.identifier_to_results
 
         async_result = AsyncResult()
-        self.identifier_to_results[identifier].append(async_result)
+        self.identifier_to_results[identifier] = [async_result]
 
         secret = random_secret()
         init_initiator_statechange = initiator_init(
@@ -6,15 +6,27 @@ INITIAL_PORT = 38647
 
 RPC_CACHE_TTL = 600
 CACHE_TTL = 60
+DISCOVERY_UNKNOWN_BACKOFF_MIN = 5
+DISCOVERY_UNKNOWN_BACKOFF_MAX = 300
 ESTIMATED_BLOCK_TIME = 7
 GAS_LIMIT = 10 * 10**6
 GAS_LIMIT_HEX = '0x' + hexlify(int_to_big_endian(GAS_LIMIT)).decode('utf-8')
 GAS_PRICE = denoms.shannon * 20
 
 DEFAULT_TRANSPORT_RETRIES_BEFORE_BACKOFF = 5
-DEFAULT_TRANSPORT_THROTTLE_CAPACITY = 10.
-DEFAULT_TRANSPORT_THROTTLE_FILL_RATE = 10.
+DEFAULT_TRANSPORT_THROTTLE_CAPACITY = 100.
+DEFAULT_TRANSPORT_THROTTLE_FILL_RATE = 100.
+DEFAULT_TRANSPORT_THROTTLE_PEER_CAPACITY = 10.
+DEFAULT_TRANSPORT_THROTTLE_PEER_FILL_RATE = 10.
 DEFAULT_TRANSPORT_RETRY_INTERVAL = 1.
+DEFAULT_TRANSPORT_WINDOW_SIZE = 8
+DEFAULT_TRANSPORT_PACKING_WINDOW = 0.001
+DEFAULT_TRANSPORT_DELIVERED_DELAY = 0.005
+DEFAULT_TRANSPORT_RESULTS_TTL = 3600
+DEFAULT_TRANSPORT_RESULTS_MAX_SIZE = 100000
+DEFAULT_TRANSPORT_RECENT_MESSAGES_TTL = 600
+DEFAULT_TRANSPORT_RECENT_MESSAGES_SIZE = 4096
+DEFAULT_TRANSPORT_VERIFIER_WORKERS = 0
 
 DEFAULT_REVEAL_TIMEOUT = 10
 DEFAULT_SETTLE_TIMEOUT = DEFAULT_REVEAL_TIMEOUT * 9
@@ -24,6 +36,9 @@ DEFAULT_JOINABLE_FUNDS_TARGET = 0.4
 DEFAULT_INITIAL_CHANNEL_TARGET = 3
 DEFAULT_WAIT_FOR_SETTLE = True
 DEFAULT_NUMBER_OF_CONFIRMATIONS_BLOCK = 5
+DEFAULT_CONTRACT_SEND_WORKERS = 20
+DEFAULT_PAYMENT_RESULTS_TTL = 3600
+DEFAULT_PAYMENT_RESULTS_MAX_SIZE = 10000
 
 DEFAULT_NAT_KEEPALIVE_RETRIES = 5
 DEFAULT_NAT_KEEPALIVE_TIMEOUT = 5
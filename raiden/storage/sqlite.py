@@ -39,6 +39,12 @@ class SQLiteStorage:
                 '    FOREIGN KEY(source_statechange_id) REFERENCES state_changes(identifier)'
                 ')',
             )
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS contract_send_queue ('
+                '    identifier INTEGER PRIMARY KEY AUTOINCREMENT, '
+                '    data BINARY'
+                ')',
+            )
 
         # When writting to a table where the primary key is the identifier and we want
         # to return said identifier we use cursor.lastrowid, which uses sqlite's last_insert_rowid
@@ -108,6 +114,44 @@ class SQLiteStorage:
                 events_data,
             )
 
+    def write_contract_send_event(self, event):
+        """ Save a contract call which was not done yet.
+
+        The entry must be removed with `delete_contract_send_event` once the
+        transaction is mined, otherwise it's sent again after a restart.
+        """
+        serialized_data = self.serializer.serialize(event)
+
+        with self.write_lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO contract_send_queue(identifier, data) VALUES(null, ?)',
+                (serialized_data,),
+            )
+            last_id = cursor.lastrowid
+
+        return last_id
+
+    def delete_contract_send_event(self, identifier):
+        with self.write_lock, self.conn:
+            self.conn.execute(
+                'DELETE FROM contract_send_queue WHERE identifier = ?',
+                (identifier,),
+            )
+
+    def get_contract_send_events(self):
+        """ Return the (identifier, event) pairs of the pending contract
+        calls, in the order they were saved.
+        """
+        cursor = self.conn.execute(
+            'SELECT identifier, data FROM contract_send_queue ORDER BY identifier',
+        )
+
+        result = [
+            (entry[0], self.serializer.deserialize(entry[1]))
+            for entry in cursor.fetchall()
+        ]
+        return result
+
     def get_state_snapshot(self) -> Optional[Tuple[int, Any]]:
         """ Return the tuple of (last_applied_state_change_id, snapshot) or None"""
         cursor = self.conn.execute('SELECT statechange_id, data from state_snapshot')
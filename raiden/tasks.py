@@ -10,13 +10,69 @@ from gevent.queue import (
 from raiden.exceptions import RaidenShuttingDown
 
 REMOVE_CALLBACK = object()
+DEFAULT_BLOCK_TIME = 15
+# Weight of the latest block interval in the block time estimate
+BLOCK_TIME_SMOOTHING = 0.2
+# Maximum time between two polls, as a fraction of the block time. The block
+# intervals are irregular, most blocks arrive before the average interval.
+MAX_SLEEP_FRACTION = 0.1
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
+class StageMetrics:
+    """ Lag statistics of a stage of the block processing pipeline.
+
+    The lag of a block is the time from its detection by the AlarmTask until
+    the stage finished processing it, the duration is the time spent in the
+    stage itself.
+    """
+
+    def __init__(self):
+        self.processed_blocks = 0
+        self.last_block_number = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def record(self, block_number, detected_at, started_at):
+        finished_at = time.time()
+
+        self.processed_blocks += 1
+        self.last_block_number = block_number
+        self.last_lag = finished_at - detected_at
+        self.last_duration = finished_at - started_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+        self.max_duration = max(self.max_duration, self.last_duration)
+
+    def to_dict(self):
+        return {
+            'processed_blocks': self.processed_blocks,
+            'last_block_number': self.last_block_number,
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+            'last_duration': self.last_duration,
+            'max_duration': self.max_duration,
+        }
+
+
 class AlarmTask(gevent.Greenlet):
-    """ Task to notify when a block is mined. """
+    """ Task to notify when a block is mined.
 
-    def __init__(self, chain):
+    Instead of polling the ethereum node at a fixed rate, the task learns the
+    average block interval from the block timestamps and polls less often
+    while a new block is not expected, polling at `wait_time` once the block
+    is due. Optionally a block filter is installed in the ethereum node, which
+    is used to check for new heads and avoids querying the block number while
+    no block arrived.
+
+    Block detection is decoupled from the callbacks, new block numbers are
+    queued and a worker greenlet executes the callbacks for every block in
+    order, including the blocks mined in between two polls. A slow callback
+    delays the processing of the following blocks but not their detection.
+    """
+
+    def __init__(self, chain, use_block_filter=False):
         super().__init__()
         self.callbacks = list()
         self.stop_event = AsyncResult()
@@ -24,18 +80,39 @@ class AlarmTask(gevent.Greenlet):
         self.last_block_number = None
         self.response_queue = Queue()
 
-        # TODO: Start with a larger wait_time and decrease it as the
-        # probability of a new block increases.
+        # Polling interval used once a block is due, this is also used by
+        # other components as a sensible polling interval for chain state.
         self.wait_time = 0.5
         self.last_loop = time.time()
 
+        # Estimate of the block interval in seconds, seeded at start with the
+        # average of the recent blocks and adjusted with an exponential moving
+        # average of the intervals between the timestamps of the new blocks.
+        self.block_time = None
+        self.last_block_timestamp = None
+        # Time the last block was detected
+        self.last_block_time = None
+
+        self.use_block_filter = use_block_filter
+        self.block_filter = None
+
+        # Queue of `(block_number, detected_at)` to be processed by the worker
+        self.block_queue = Queue()
+        self.worker = None
+        self.processed_block_number = None
+        # Detection time of the block being processed by the callbacks
+        self.block_detected_at = None
+        self.metrics = {
+            'callbacks': StageMetrics(),
+        }
+
     def register_callback(self, callback):
         """ Register a new callback.
 
         Note:
-            The callback will be executed in the AlarmTask context and for
-            this reason it should not block, otherwise we can miss block
-            changes.
+            The callbacks are executed sequentially by the worker greenlet,
+            once per block and in order. A blocking callback delays the
+            processing of the next blocks.
         """
         if not callable(callback):
             raise ValueError('callback is not a callable')
@@ -49,55 +126,226 @@ class AlarmTask(gevent.Greenlet):
 
     def _run(self):  # pylint: disable=method-hidden
         self.last_block_number = self.chain.block_number()
+        self.last_block_time = time.time()
+        self.last_block_timestamp = self.block_timestamp(self.last_block_number)
         log.debug('starting block number', block_number=self.last_block_number)
 
+        self.block_time = self._initial_block_time()
+        if self.use_block_filter:
+            self._install_block_filter()
+
+        self.processed_block_number = self.last_block_number
+        self.worker = gevent.spawn(self._process_blocks)
+        self.worker.link_exception(self._on_worker_exception)
+
         sleep_time = 0
         while self.stop_event.wait(sleep_time) is not True:
+            # take into account how long the callbacks took to execute, the
+            # next poll is scheduled relative to the start of this one.
+            loop_start = time.time()
             try:
                 self.poll_for_new_block()
             except RaidenShuttingDown:
                 break
 
-            # we want this task to iterate in the tick of `wait_time`, so take
-            # into account how long we spent executing one tick.
             self.last_loop = time.time()
-            work_time = self.last_loop - self.last_loop
-            if work_time > self.wait_time:
+            work_time = self.last_loop - loop_start
+            if work_time > self.block_time:
                 log.warning(
-                    'alarm loop is taking longer than the wait time',
+                    'alarm loop is taking longer than the block time',
                     work_time=work_time,
-                    wait_time=self.wait_time,
+                    block_time=self.block_time,
                 )
-                sleep_time = 0.001
-            else:
-                sleep_time = self.wait_time - work_time
 
-        # stopping
+            sleep_time = self.next_sleep_time(self.last_loop)
+
+        # stopping, the blocks already detected are processed before the
+        # callbacks are cleared
+        self.block_queue.put(None)
+        self.worker.join()
         self.callbacks = list()
+        self._uninstall_block_filter()
+
+    def _on_worker_exception(self, worker):
+        # Preserve the behavior of the callbacks running in the AlarmTask, an
+        # exception in a callback stops the task.
+        self.kill(worker.exception, block=False)
+
+    def _process_blocks(self):
+        while True:
+            item = self.block_queue.get()
+
+            if item is None:
+                return
+
+            block_number, detected_at = item
+            self.run_callbacks(block_number, detected_at)
+
+    def process_pending_blocks(self):
+        """ Execute the callbacks for the queued blocks in the current
+        greenlet, used when the worker is not running.
+        """
+        while not self.block_queue.empty():
+            item = self.block_queue.get()
+
+            if item is not None:
+                block_number, detected_at = item
+                self.run_callbacks(block_number, detected_at)
+
+    def run_callbacks(self, block_number, detected_at):
+        started_at = time.time()
+        self.block_detected_at = detected_at
+
+        remove = list()
+        for callback in self.callbacks:
+            result = callback(block_number)
+            if result is REMOVE_CALLBACK:
+                remove.append(callback)
+
+        for callback in remove:
+            self.callbacks.remove(callback)
+
+        self.processed_block_number = block_number
+        self.metrics['callbacks'].record(block_number, detected_at, started_at)
+
+    def stage_metrics(self, name):
+        """ Return the metrics of the pipeline stage `name`, stages executed
+        by the callbacks register their metrics here.
+        """
+        if name not in self.metrics:
+            self.metrics[name] = StageMetrics()
+
+        return self.metrics[name]
+
+    @property
+    def pending_blocks(self):
+        return self.block_queue.qsize()
+
+    def _initial_block_time(self):
+        try:
+            block_time = self.chain.estimate_blocktime()
+        except Exception:  # pylint: disable=broad-except
+            log.exception('could not estimate the block time')
+            block_time = DEFAULT_BLOCK_TIME
+
+        return max(block_time, self.wait_time)
+
+    def _install_block_filter(self):
+        try:
+            self.block_filter = self.chain.client.new_block_filter()
+        except Exception:  # pylint: disable=broad-except
+            log.exception('could not install a block filter, falling back to polling')
+            self.block_filter = None
+
+    def _uninstall_block_filter(self):
+        if self.block_filter is not None:
+            try:
+                self.chain.client.uninstall_filter(self.block_filter.filter_id)
+            except Exception:  # pylint: disable=broad-except
+                pass
+            self.block_filter = None
+
+    def next_sleep_time(self, now):
+        """ Return how long to wait until the next poll.
+
+        The task sleeps at most a fraction of the block time, and half of the
+        time until the expected arrival, so the polls become more frequent as
+        the block is due. Once the block is due the node is polled every
+        `wait_time`.
+        """
+        expected_arrival = self.last_block_time + self.block_time
+        sleep_time = min(
+            (expected_arrival - now) / 2,
+            self.block_time * MAX_SLEEP_FRACTION,
+        )
+
+        return max(sleep_time, self.wait_time)
+
+    def block_timestamp(self, block_number):
+        try:
+            return self.chain.block_timestamp(block_number)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('could not fetch the block timestamp', block_number=block_number)
+            return None
+
+    def update_block_time(self, blocks, timestamp):
+        """ Update the block interval estimate after `blocks` were mined, the
+        last of them with `timestamp`.
+
+        The detection times are not used, these are delayed by the polling.
+        """
+        if self.last_block_timestamp is not None and timestamp is not None and blocks > 0:
+            interval = (timestamp - self.last_block_timestamp) / blocks
+            block_time = (
+                BLOCK_TIME_SMOOTHING * interval +
+                (1 - BLOCK_TIME_SMOOTHING) * (self.block_time or interval)
+            )
+            self.block_time = max(block_time, self.wait_time)
+
+        self.last_block_timestamp = timestamp
+
+    def has_new_heads(self):
+        """ True if the block filter reported new heads or if the filter is
+        not available.
+        """
+        if self.block_filter is None:
+            return True
+
+        try:
+            return bool(self.block_filter.get_new_entries())
+        except Exception:  # pylint: disable=broad-except
+            # The filter may have expired in the ethereum node, fallback to
+            # polling the block number.
+            log.exception('block filter failed, falling back to polling')
+            self.block_filter = None
+            return True
 
     def poll_for_new_block(self):
-        current_block = self.chain.block_number()
+        if not self.has_new_heads():
+            return
 
-        if current_block > self.last_block_number + 1:
-            difference = current_block - self.last_block_number - 1
-            log.error('alarm missed %s blocks' % (difference))
+        current_block = self.chain.block_number()
 
-        if current_block != self.last_block_number:
+        # There must be no context switches from the check to the update of
+        # last_block_number, otherwise concurrent polls would queue the same
+        # block twice.
+        if current_block > self.last_block_number:
+            now = time.time()
             log.debug(
                 'new block',
                 number=current_block,
-                timestamp=self.last_loop,
+                timestamp=now,
+                blocks=current_block - self.last_block_number,
+                pending_blocks=self.block_queue.qsize(),
             )
 
+            first_block = self.last_block_number + 1
+            blocks = current_block - self.last_block_number
             self.last_block_number = current_block
-            remove = list()
-            for callback in self.callbacks:
-                result = callback(current_block)
-                if result is REMOVE_CALLBACK:
-                    remove.append(callback)
-
-            for callback in remove:
-                self.callbacks.remove(callback)
+            self.last_block_time = now
+
+            for block_number in range(first_block, current_block + 1):
+                self.block_queue.put((block_number, now))
+
+            if self.worker is None:
+                self.process_pending_blocks()
+
+            # Fetched after the blocks are queued to not delay the callbacks
+            self.update_block_time(blocks, self.block_timestamp(current_block))
+
+        elif current_block < self.last_block_number:
+            log.warning(
+                'block number decreased',
+                current_block=current_block,
+                last_block_number=self.last_block_number,
+            )
+
+    def wait_for_pending_blocks(self, poll_timeout=None):
+        """ Wait until all the detected blocks have been processed. """
+        poll_timeout = poll_timeout or self.wait_time
+
+        while self.processed_block_number != self.last_block_number:
+            gevent.sleep(poll_timeout)
 
     def stop_async(self):
         self.stop_event.set(True)
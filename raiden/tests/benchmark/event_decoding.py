@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark script to compare the decoding of blockchain logs using the
+precompiled EventDecoder against the per-log ABI lookup done by web3.
+"""
+import argparse
+import os
+import random
+import time
+
+from eth_abi import encode_abi, encode_single
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from web3.utils.abi import filter_by_type
+from web3.utils.events import get_event_abi_types_for_decoding, get_event_data
+
+from raiden.blockchain.abi import (
+    CONTRACT_MANAGER,
+    CONTRACT_CHANNEL_MANAGER,
+    CONTRACT_NETTING_CHANNEL,
+    CONTRACT_REGISTRY,
+)
+from raiden.blockchain.events import Event, decode_event_to_internal
+from raiden.network.rpc.smartcontract_proxy import EventDecoder
+
+CONTRACTS = (
+    CONTRACT_CHANNEL_MANAGER,
+    CONTRACT_NETTING_CHANNEL,
+    CONTRACT_REGISTRY,
+)
+
+
+def random_value(abi_type):
+    if abi_type == 'address':
+        return to_checksum_address(os.urandom(20))
+    if abi_type == 'bool':
+        return random.choice((True, False))
+    if abi_type == 'string':
+        return 'benchmark'
+    if abi_type == 'bytes':
+        return os.urandom(random.randint(1, 64))
+    if abi_type.startswith('bytes'):
+        return os.urandom(int(abi_type[len('bytes'):]))
+    if abi_type.startswith('uint'):
+        return random.randint(0, 2 ** 64)
+    if abi_type.startswith('int'):
+        return random.randint(-2 ** 63, 2 ** 63)
+
+    raise ValueError('unsupported type {}'.format(abi_type))
+
+
+def synthetic_log(contract_address, event_abi, block_number, log_index):
+    topic_inputs = [arg for arg in event_abi['inputs'] if arg['indexed']]
+    data_inputs = [arg for arg in event_abi['inputs'] if not arg['indexed']]
+    topic_types = list(get_event_abi_types_for_decoding(topic_inputs))
+    data_types = list(get_event_abi_types_for_decoding(data_inputs))
+
+    topics = [event_abi_to_log_topic(event_abi)]
+    topics.extend(
+        encode_single(abi_type, random_value(abi_type))
+        for abi_type in topic_types
+    )
+    data = encode_abi(data_types, [random_value(abi_type) for abi_type in data_types])
+
+    return {
+        'address': contract_address,
+        'topics': topics,
+        'data': '0x' + data.hex(),
+        'blockNumber': block_number,
+        'blockHash': os.urandom(32),
+        'transactionHash': os.urandom(32),
+        'transactionIndex': 0,
+        'logIndex': log_index,
+    }
+
+
+def synthetic_logs(quantity):
+    """ Returns a list of `(abi, log)` for random events of the raiden
+    contracts.
+    """
+    contracts_events = list()
+    for contract_name in CONTRACTS:
+        abi = CONTRACT_MANAGER.get_contract_abi(contract_name)
+        address = to_checksum_address(os.urandom(20))
+
+        for event_abi in filter_by_type('event', abi):
+            contracts_events.append((abi, address, event_abi))
+
+    result = list()
+    for log_index in range(quantity):
+        abi, address, event_abi = random.choice(contracts_events)
+        result.append((abi, synthetic_log(address, event_abi, log_index // 10, log_index)))
+
+    return result
+
+
+def legacy_decode(abi, log):
+    """ The decoding path prior to the introduction of the EventDecoder. """
+    topic_to_event_abi = {
+        event_abi_to_log_topic(event_abi): event_abi
+        for event_abi in filter_by_type('event', abi)
+    }
+    event_abi = topic_to_event_abi[log['topics'][0]]
+
+    decoded_event = dict(get_event_data(event_abi, log))
+    decoded_event['block_number'] = log.get('blockNumber', 0)
+    return decode_event_to_internal(Event(log['address'], decoded_event))
+
+
+def run(quantity, repetitions):
+    logs = synthetic_logs(quantity)
+
+    abi_to_decoder = {
+        id(abi): EventDecoder(abi)
+        for abi, _ in logs
+    }
+
+    def decoder_decode(abi, log):
+        return abi_to_decoder[id(abi)].decode_internal(log)
+
+    for name, decode in (('legacy', legacy_decode), ('decoder', decoder_decode)):
+        best = None
+
+        for _ in range(repetitions):
+            start = time.perf_counter()
+
+            for abi, log in logs:
+                decode(abi, log)
+
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+
+        print('{:<10} {:>10} logs {:>10.4f}s {:>12.0f} logs/s'.format(
+            name,
+            quantity,
+            best,
+            quantity / best,
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--logs', type=int, default=50000, help='Number of synthetic logs')
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run(args.logs, args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
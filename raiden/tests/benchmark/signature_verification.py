@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark script for the SignatureVerifier, it decodes signed direct
+transfers with an increasing number of worker threads.
+"""
+import argparse
+import os
+import random
+import time
+
+import gevent
+
+from raiden.network.transport.verifier import SignatureVerifier
+from raiden.tests.utils.factories import make_privkey_address
+from raiden.tests.utils.messages import make_direct_transfer
+
+
+def signed_messages(quantity):
+    private_key, address = make_privkey_address()
+
+    result = list()
+    for nonce in range(1, quantity + 1):
+        message = make_direct_transfer(nonce=nonce, channel=os.urandom(20))
+        message.sign(private_key, address)
+        result.append(message.encode())
+
+    return result
+
+
+def run(quantity, batch_size, workers_list, repetitions):
+    messages = signed_messages(quantity)
+    batches = [
+        messages[position:position + batch_size]
+        for position in range(0, quantity, batch_size)
+    ]
+
+    baseline = None
+    for workers in workers_list:
+        verifier = SignatureVerifier(workers)
+        best = None
+
+        for _ in range(repetitions):
+            start = time.perf_counter()
+
+            # Every batch is submitted by its own greenlet, like the datagrams
+            # received by the transport
+            greenlets = [gevent.spawn(verifier.decode_batch, batch) for batch in batches]
+            gevent.joinall(greenlets, raise_error=True)
+
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+
+        verifier.stop()
+
+        if baseline is None:
+            baseline = best
+
+        print('{:>3} workers {:>10} messages {:>10.4f}s {:>12.0f} messages/s {:>6.2f}x'.format(
+            workers,
+            quantity,
+            best,
+            quantity / best,
+            baseline / best,
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=10000, help='Number of signed messages')
+    parser.add_argument('--batch-size', type=int, default=16, help='Messages per datagram')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[0, 1, 2, 4, 8],
+        help='Numbers of worker threads to compare, 0 decodes in the hub thread',
+    )
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    run(args.messages, args.batch_size, args.workers, args.repetitions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark script to measure the startup time of a Raiden node.
+
+Measures the time to run `raiden --help` and `raiden version` and to import
+`raiden.app` in a new interpreter, the first access to the contract ABIs, and
+the construction of an `App` with in-memory storage, a mocked blockchain and
+an in-memory transport.
+
+With `--check` it fails if the CLI loads one of the HEAVY_MODULES before a
+command needs it.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from copy import deepcopy
+
+from raiden.app import App
+from raiden.network.discovery import Discovery
+from raiden.network.throttle import DummyPolicy
+from raiden.tests.benchmark.transfer_throughput import (
+    InProcessNetwork,
+    InProcessTransport,
+    MockBlockchain,
+    MockChain,
+)
+from raiden.utils import privatekey_to_address, sha3
+
+#: Modules which must only be loaded by the commands that use them
+HEAVY_MODULES = (
+    'flask',
+    'matrix_client',
+    'networkx',
+    'web3',
+    'raiden.api.rest',
+    'raiden.network.matrixtransport',
+    'raiden.network.transport.udp.udp_transport',
+    'raiden.tests.utils.smoketest',
+    'raiden.ui.console',
+)
+
+CLI_MODULES = (
+    'import json, sys;'
+    'import raiden.ui.cli;'
+    'print(json.dumps(sorted(sys.modules)))'
+)
+
+FIRST_ABI_ACCESS = (
+    'import time;'
+    'start = time.perf_counter();'
+    'from raiden.blockchain.abi import CONTRACT_MANAGER, CONTRACT_NETTING_CHANNEL;'
+    'CONTRACT_MANAGER.get_contract_abi(CONTRACT_NETTING_CHANNEL);'
+    'print(time.perf_counter() - start)'
+)
+
+
+def best_of(repetitions, function):
+    timings = list()
+
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def run_python(*arguments):
+    subprocess.run(
+        [sys.executable, *arguments],
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def first_abi_access():
+    """ Time to load the ABIs, measured inside the new interpreter so the
+    interpreter startup is not included.
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', FIRST_ABI_ACCESS],
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def heavy_modules_loaded_by_cli():
+    output = subprocess.run(
+        [sys.executable, '-c', CLI_MODULES],
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    modules = json.loads(output.decode().strip().splitlines()[-1])
+    return [module for module in HEAVY_MODULES if module in modules]
+
+
+def app_construction(position, blockchain, network, discovery):
+    private_key = sha3('startup:{}'.format(position).encode())
+    host_port = ('127.0.0.1', 40000 + position)
+
+    config = deepcopy(App.DEFAULT_CONFIG)
+    config.update({
+        'host': host_port[0],
+        'port': host_port[1],
+        'external_ip': host_port[0],
+        'external_port': host_port[1],
+        'privatekey_hex': private_key.hex(),
+        'database_path': ':memory:',
+    })
+
+    transport = InProcessTransport(
+        network,
+        host_port,
+        discovery,
+        DummyPolicy(),
+        config['transport'],
+        lambda message: None,
+    )
+    chain = MockChain(blockchain, privatekey_to_address(private_key))
+    registry = chain.registry(blockchain.registry_address)
+
+    return App(config, chain, registry, transport, discovery)
+
+
+def run(repetitions):
+    results = [
+        ('raiden --help', best_of(repetitions, lambda: run_python('-m', 'raiden', '--help'))),
+        ('raiden version', best_of(repetitions, lambda: run_python('-m', 'raiden', 'version'))),
+        ('import raiden.app', best_of(repetitions, lambda: run_python('-c', 'import raiden.app'))),
+        ('first abi access', min(first_abi_access() for _ in range(repetitions))),
+    ]
+
+    blockchain = MockBlockchain(blocktime=1)
+    network = InProcessNetwork()
+    discovery = Discovery()
+    positions = iter(range(repetitions))
+
+    results.append((
+        'App()',
+        best_of(
+            repetitions,
+            lambda: app_construction(next(positions), blockchain, network, discovery),
+        ),
+    ))
+
+    for name, elapsed in results:
+        print('{:<20} {:>10.4f}s'.format(name, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Fail if the CLI imports a heavy module on startup',
+    )
+    args = parser.parse_args()
+
+    run(args.repetitions)
+
+    loaded = heavy_modules_loaded_by_cli()
+    for module in loaded:
+        print('{} is imported by the CLI on startup'.format(module))
+
+    if args.check and loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
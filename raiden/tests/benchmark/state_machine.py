@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark script to measure the cost of the state machine, without any I/O.
+
+A synthetic NodeState is built with a configurable number of token networks,
+channels and pending mediated transfers, afterwards a stream of state changes
+with the same shape as a mediator's workload is applied and the time and
+allocated memory blocks of every `node.state_transition` are recorded per
+state change type.
+
+The results can be saved as JSON and compared with a previous run, e.g.:
+
+    python raiden/tests/benchmark/state_machine.py --output before.json
+    git checkout other-branch
+    python raiden/tests/benchmark/state_machine.py --compare before.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from copy import deepcopy
+
+from coincurve import PrivateKey
+
+from raiden.messages import LockedTransfer, Secret
+from raiden.routing import make_graph
+from raiden.tests.benchmark.utils import percentile
+from raiden.transfer import channel, node
+from raiden.transfer.architecture import SendMessageEvent
+from raiden.transfer.mediated_transfer.state import lockedtransfersigned_from_message
+from raiden.transfer.mediated_transfer.state_change import (
+    ActionInitMediator,
+    ReceiveSecretReveal,
+)
+from raiden.transfer.state import (
+    NettingChannelEndState,
+    NettingChannelState,
+    PaymentNetworkState,
+    RouteState,
+    TokenNetworkGraphState,
+    TokenNetworkState,
+    TransactionExecutionStatus,
+    balanceproof_from_envelope,
+)
+from raiden.transfer.state_change import (
+    ActionInitNode,
+    Block,
+    ContractReceiveNewPaymentNetwork,
+    ReceiveDelivered,
+    ReceiveUnlock,
+)
+from raiden.utils import privatekey_to_address, sha3
+
+REVEAL_TIMEOUT = 10
+SETTLE_TIMEOUT = 100000
+TRANSFER_AMOUNT = 1
+PAYMENT_NETWORK_ADDRESS = sha3(b'payment network')[:20]
+
+
+class Partner:
+    """ A channel partner, which keeps its own view of the channel to create
+    valid signed messages for the benchmarked node.
+    """
+
+    def __init__(self, position, our_address, token_network_identifier, token_address, deposit):
+        private_key_bin = sha3('partner:{}'.format(position).encode())
+        self.private_key = PrivateKey(private_key_bin)
+        self.address = privatekey_to_address(private_key_bin)
+        self.channel_identifier = sha3(self.address + our_address)[:20]
+
+        # The benchmarked node's view of the channel
+        self.channel_state = make_channel_state(
+            self.channel_identifier,
+            token_address,
+            token_network_identifier,
+            our_address,
+            self.address,
+            deposit,
+        )
+
+        # The partner's view of the same channel
+        self.partner_view = make_channel_state(
+            self.channel_identifier,
+            token_address,
+            token_network_identifier,
+            self.address,
+            our_address,
+            deposit,
+        )
+
+    def locked_transfer(self, message_identifier, payment_identifier, target, expiration, secret):
+        send_event = channel.send_lockedtransfer(
+            self.partner_view,
+            self.address,
+            target,
+            TRANSFER_AMOUNT,
+            message_identifier,
+            payment_identifier,
+            expiration,
+            sha3(secret),
+        )
+
+        message = LockedTransfer.from_event(send_event)
+        message.sign(self.private_key, self.address)
+        return lockedtransfersigned_from_message(message)
+
+    def unlock(self, message_identifier, payment_identifier, secret):
+        send_event = channel.send_unlock(
+            self.partner_view,
+            message_identifier,
+            payment_identifier,
+            secret,
+            sha3(secret),
+        )
+
+        message = Secret.from_event(send_event)
+        message.sign(self.private_key, self.address)
+        return ReceiveUnlock(
+            message_identifier,
+            secret,
+            balanceproof_from_envelope(message),
+        )
+
+
+def make_channel_state(
+        channel_identifier,
+        token_address,
+        token_network_identifier,
+        our_address,
+        partner_address,
+        deposit,
+):
+    open_transaction = TransactionExecutionStatus(
+        None,
+        1,
+        TransactionExecutionStatus.SUCCESS,
+    )
+
+    return NettingChannelState(
+        channel_identifier,
+        token_address,
+        token_network_identifier,
+        REVEAL_TIMEOUT,
+        SETTLE_TIMEOUT,
+        NettingChannelEndState(our_address, deposit),
+        NettingChannelEndState(partner_address, deposit),
+        open_transaction,
+        None,
+        None,
+    )
+
+
+class Workload:
+    """ Generates the state changes and keeps the node state. """
+
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.address = sha3(b'benchmark node')[:20]
+        self.block_number = 1
+        self.message_identifier = 0
+        self.payment_identifier = 0
+        self.state_changes_since_block = 0
+
+        self.token_networks = list()
+        self.pending_deliveries = list()
+
+        self.node_state = None
+        self.stats = defaultdict(lambda: {'latencies': list(), 'blocks': list()})
+
+    def next_message_identifier(self):
+        self.message_identifier += 1
+        return self.message_identifier
+
+    def next_payment_identifier(self):
+        self.payment_identifier += 1
+        return self.payment_identifier
+
+    def setup(self):
+        """ Build the initial node state, the setup is not measured. """
+        args = self.args
+        partner_position = 0
+
+        token_network_states = list()
+        for token_position in range(args.token_networks):
+            token_address = sha3('token:{}'.format(token_position).encode())[:20]
+            token_network_identifier = sha3('network:{}'.format(token_position).encode())[:20]
+
+            partners = list()
+            for _ in range(args.channels):
+                partners.append(Partner(
+                    partner_position,
+                    self.address,
+                    token_network_identifier,
+                    token_address,
+                    args.deposit,
+                ))
+                partner_position += 1
+
+            graph = make_graph([(self.address, partner.address) for partner in partners])
+            token_network_states.append(TokenNetworkState(
+                token_network_identifier,
+                token_address,
+                TokenNetworkGraphState(graph),
+                [partner.channel_state for partner in partners],
+            ))
+            self.token_networks.append(partners)
+
+        self.apply(ActionInitNode(random.Random(args.seed), self.block_number), measure=False)
+        self.apply(
+            ContractReceiveNewPaymentNetwork(
+                PaymentNetworkState(PAYMENT_NETWORK_ADDRESS, token_network_states),
+            ),
+            measure=False,
+        )
+
+        # Mediated transfers which are never completed, these keep payment
+        # tasks and locks in the merkle trees during the measurement
+        for _ in range(args.pending_transfers):
+            self.init_mediator(measure=False)
+            self.deliver_all(measure=False)
+
+    def apply(self, state_change, measure=True):
+        if measure:
+            blocks_before = sys.getallocatedblocks()
+            start = time.perf_counter()
+
+        if self.args.with_copy:
+            # The StateManager copies the state before every transition
+            next_state = deepcopy(self.node_state)
+        else:
+            next_state = self.node_state
+
+        iteration = node.state_transition(next_state, state_change)
+
+        if measure:
+            elapsed = time.perf_counter() - start
+            blocks = sys.getallocatedblocks() - blocks_before
+
+            stats = self.stats[type(state_change).__name__]
+            stats['latencies'].append(elapsed)
+            stats['blocks'].append(blocks)
+
+        self.node_state = iteration.new_state
+
+        for event in iteration.events:
+            if isinstance(event, SendMessageEvent) and event.message_identifier:
+                self.pending_deliveries.append(event.message_identifier)
+
+        self.state_changes_since_block += 1
+        if measure and self.state_changes_since_block >= self.args.block_interval:
+            self.state_changes_since_block = 0
+            self.block_number += 1
+            self.apply(Block(self.block_number))
+
+        return iteration
+
+    def deliver_all(self, measure=True):
+        while self.pending_deliveries:
+            message_identifier = self.pending_deliveries.pop()
+            self.apply(ReceiveDelivered(message_identifier), measure=measure)
+
+    def init_mediator(self, measure=True):
+        """ Start a new mediated transfer from a random payer to a random
+        payee of the same token network, returns the secret and the partners.
+        """
+        partners = self.random.choice(self.token_networks)
+        payer, payee = self.random.sample(partners, 2)
+
+        secret = sha3('secret:{}'.format(self.next_payment_identifier()).encode())
+        target = payee.address
+        from_transfer = payer.locked_transfer(
+            self.next_message_identifier(),
+            self.payment_identifier,
+            target,
+            self.block_number + SETTLE_TIMEOUT // 2,
+            secret,
+        )
+
+        routes = [RouteState(payee.address, payee.channel_identifier)]
+        from_route = RouteState(payer.address, payer.channel_identifier)
+        self.apply(ActionInitMediator(routes, from_route, from_transfer), measure=measure)
+
+        return secret, payer, payee
+
+    def mediated_transfer(self):
+        """ A complete mediated transfer from the mediator's perspective. """
+        secret, payer, payee = self.init_mediator()
+        self.deliver_all()
+
+        self.apply(ReceiveSecretReveal(secret, payee.address))
+        self.deliver_all()
+
+        unlock = payer.unlock(self.next_message_identifier(), self.payment_identifier, secret)
+        self.apply(unlock)
+        self.deliver_all()
+
+    def run(self):
+        for _ in range(self.args.transfers):
+            self.mediated_transfer()
+
+
+def summarize(stats):
+    result = dict()
+
+    for name, values in sorted(stats.items()):
+        latencies = sorted(values['latencies'])
+        blocks = values['blocks']
+
+        result[name] = {
+            'count': len(latencies),
+            'mean': sum(latencies) / len(latencies),
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1],
+            'allocated_blocks_mean': sum(blocks) / len(blocks),
+        }
+
+    return result
+
+
+def git_revision():
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode().strip()
+
+
+def print_results(results, baseline=None):
+    header = '{:<28} {:>7} {:>11} {:>11} {:>11} {:>10}'.format(
+        'state change',
+        'count',
+        'p50 (us)',
+        'p99 (us)',
+        'mean (us)',
+        'blocks',
+    )
+    if baseline:
+        header += ' {:>9}'.format('mean diff')
+    print(header)
+
+    for name, values in results['state_changes'].items():
+        line = '{:<28} {:>7} {:>11.1f} {:>11.1f} {:>11.1f} {:>10.1f}'.format(
+            name,
+            values['count'],
+            values['p50'] * 1e6,
+            values['p99'] * 1e6,
+            values['mean'] * 1e6,
+            values['allocated_blocks_mean'],
+        )
+
+        if baseline:
+            previous = baseline['state_changes'].get(name)
+            if previous:
+                change = (values['mean'] - previous['mean']) / previous['mean'] * 100
+                line += ' {:>+8.1f}%'.format(change)
+
+        print(line)
+
+    if results['traced_memory_peak'] is not None:
+        print('traced memory peak: {} bytes'.format(results['traced_memory_peak']))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--token-networks', type=int, default=1)
+    parser.add_argument('--channels', type=int, default=10, help='Channels per token network')
+    parser.add_argument(
+        '--pending-transfers',
+        type=int,
+        default=100,
+        help='Mediated transfers with pending locks kept during the benchmark',
+    )
+    parser.add_argument('--transfers', type=int, default=1000)
+    parser.add_argument('--deposit', type=int, default=2 ** 64)
+    parser.add_argument(
+        '--block-interval',
+        type=int,
+        default=50,
+        help='Number of state changes between Block state changes',
+    )
+    parser.add_argument(
+        '--with-copy',
+        action='store_true',
+        help='Include the deepcopy done by the StateManager',
+    )
+    parser.add_argument(
+        '--tracemalloc',
+        action='store_true',
+        help='Trace the memory allocations, this slows down the benchmark',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='File to save the results as JSON')
+    parser.add_argument('--compare', help='JSON results of a previous run')
+    args = parser.parse_args()
+
+    if args.channels < 2:
+        parser.error('at least two channels per token network are required')
+
+    workload = Workload(args)
+    workload.setup()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    workload.run()
+
+    traced_memory_peak = None
+    if args.tracemalloc:
+        _, traced_memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'parameters': vars(args),
+        'traced_memory_peak': traced_memory_peak,
+        'state_changes': summarize(workload.stats),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handler:
+            baseline = json.load(handler)
+
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(results, handler, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
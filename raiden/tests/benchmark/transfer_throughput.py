@@ -0,0 +1,568 @@
+# -*- coding: utf-8 -*-
+"""
+A benchmark script to measure the transfer throughput of a network of Raiden
+nodes.
+
+All the nodes run in the same process, with in-memory databases, a mocked
+blockchain and a transport that exchanges the UDP datagrams in memory, so the
+benchmark runs offline and measures only the cost of the node itself: message
+encoding, signing, the state machine and the WAL.
+
+`--latency`, `--jitter`, `--loss`, `--reorder` and `--bandwidth` set the
+conditions of the links of the emulated network, use them with
+`--window-size` to measure the pipelining of the transport.
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from copy import deepcopy
+
+import gevent
+from gevent.event import AsyncResult
+from gevent.pool import Pool
+
+from raiden.app import App
+from raiden.log_config import configure_logging
+from raiden.messages import DirectTransfer
+from raiden.network.discovery import Discovery
+from raiden.network.rpc.transaction_manager import TransactionManager
+from raiden.network.throttle import DummyPolicy, FairSharePolicy, TokenBucket
+from raiden.network.transport.udp.udp_transport import UDPTransport
+from raiden.raiden_service import RaidenService
+from raiden.settings import (
+    DEFAULT_REVEAL_TIMEOUT,
+    DEFAULT_SETTLE_TIMEOUT,
+    DEFAULT_TRANSPORT_PACKING_WINDOW,
+    DEFAULT_TRANSPORT_WINDOW_SIZE,
+)
+from raiden.tests.benchmark.utils import percentile
+from raiden.tests.utils.emulator import LinkProfile, NetworkEmulator
+from raiden.transfer import views
+from raiden.transfer.state import NODE_NETWORK_REACHABLE
+from raiden.utils import privatekey_to_address, sha3
+
+TOPOLOGIES = ('line', 'ring', 'star', 'full')
+TRANSFER_AMOUNT = 1
+
+
+class MockFilter:
+    """ A filter for a mocked contract, the benchmark does not produce
+    blockchain events.
+    """
+
+    def __init__(self):
+        self.filter_id = 0
+
+    def get_new_entries(self):  # pylint: disable=no-self-use
+        return []
+
+
+class MockBlockchain:
+    """ Shared state of the mocked blockchain. """
+
+    def __init__(self, blocktime):
+        self.blocktime = blocktime
+        self.block_number = 1
+
+        self.registry_address = sha3(b'registry')[:20]
+        self.manager_address = sha3(b'manager')[:20]
+        self.token_address = sha3(b'token')[:20]
+
+        # channel address -> [participant1, balance1, participant2, balance2]
+        self.channels = dict()
+
+    def new_channel(self, participant1, participant2, deposit):
+        channel_address = sha3(participant1 + participant2)[:20]
+        self.channels[channel_address] = [participant1, deposit, participant2, deposit]
+        return channel_address
+
+    def mine(self):
+        while True:
+            gevent.sleep(self.blocktime)
+            self.block_number += 1
+
+
+class MockClient:
+    def __init__(self):
+        self.stop_event = None
+        self.transaction_manager = TransactionManager(self)
+
+    def inject_stop_event(self, event):
+        self.stop_event = event
+
+
+class MockNettingChannel:
+    def __init__(self, blockchain, node_address, channel_address):
+        self.blockchain = blockchain
+        self.node_address = node_address
+        self.address = channel_address
+
+    def settle_timeout(self):  # pylint: disable=no-self-use
+        return DEFAULT_SETTLE_TIMEOUT
+
+    def detail(self):
+        participant1, balance1, participant2, balance2 = self.blockchain.channels[self.address]
+
+        if participant1 == self.node_address:
+            our_address, our_balance = participant1, balance1
+            partner_address, partner_balance = participant2, balance2
+        else:
+            our_address, our_balance = participant2, balance2
+            partner_address, partner_balance = participant1, balance1
+
+        return {
+            'our_address': our_address,
+            'our_balance': our_balance,
+            'partner_address': partner_address,
+            'partner_balance': partner_balance,
+            'settle_timeout': self.settle_timeout(),
+        }
+
+    def opened(self):  # pylint: disable=no-self-use
+        return 1
+
+    def closed(self):  # pylint: disable=no-self-use
+        return 0
+
+    def all_events_filter(self, from_block=None, to_block=None):  # pylint: disable=unused-argument
+        return MockFilter()
+
+
+class MockChannelManager:
+    def __init__(self, blockchain, node_address):
+        self.blockchain = blockchain
+        self.node_address = node_address
+        self.address = blockchain.manager_address
+
+    def token_address(self):
+        return self.blockchain.token_address
+
+    def channels_addresses(self):
+        return [
+            (participant1, participant2)
+            for participant1, _, participant2, _ in self.blockchain.channels.values()
+        ]
+
+    def channels_by_participant(self, participant_address):
+        return [
+            channel_address
+            for channel_address, details in self.blockchain.channels.items()
+            if participant_address in (details[0], details[2])
+        ]
+
+    def channelnew_filter(self, from_block=None, to_block=None):  # pylint: disable=unused-argument
+        return MockFilter()
+
+
+class MockRegistry:
+    def __init__(self, blockchain, node_address):
+        self.blockchain = blockchain
+        self.node_address = node_address
+        self.address = blockchain.registry_address
+
+    def manager_addresses(self):
+        return [self.blockchain.manager_address]
+
+    def manager(self, manager_address):  # pylint: disable=unused-argument
+        return MockChannelManager(self.blockchain, self.node_address)
+
+    def tokenadded_filter(self, from_block=None, to_block=None):  # pylint: disable=unused-argument
+        return MockFilter()
+
+
+class MockChain:
+    """ Implements the subset of the BlockChainService used by the
+    RaidenService when no on-chain operations are done.
+    """
+
+    def __init__(self, blockchain, node_address):
+        self.blockchain = blockchain
+        self.node_address = node_address
+        self.client = MockClient()
+
+    def block_number(self):
+        return self.blockchain.block_number
+
+    def estimate_blocktime(self):
+        return self.blockchain.blocktime
+
+    def block_timestamp(self, block_number):
+        return block_number * self.blockchain.blocktime
+
+    def registry(self, registry_address):  # pylint: disable=unused-argument
+        return MockRegistry(self.blockchain, self.node_address)
+
+    def netting_channel(self, channel_address):
+        return MockNettingChannel(self.blockchain, self.node_address, channel_address)
+
+
+class InProcessTransport(UDPTransport):
+    """ UDPTransport exchanging datagrams in memory.
+
+    `received_direct_transfers` is called for every processed DirectTransfer,
+    used to measure the latency of direct transfers.
+    """
+
+    def __init__(
+            self,
+            network,
+            host_port,
+            discovery,
+            throttle_policy,
+            config,
+            received_direct_transfer,
+    ):
+        # The DatagramServer does not bind until started, it's replaced
+        # before that.
+        super().__init__(discovery, host_port, throttle_policy, config)
+        self.server = network.datagram_server(host_port)
+        self.received_direct_transfer = received_direct_transfer
+
+    def process_message(self, message):
+        super().process_message(message)
+
+        if isinstance(message, DirectTransfer):
+            self.received_direct_transfer(message)
+
+
+def topology_edges(topology, number_of_nodes):
+    nodes = range(number_of_nodes)
+
+    if topology == 'line':
+        return list(zip(nodes, nodes[1:]))
+
+    if topology == 'ring':
+        return list(zip(nodes, nodes[1:])) + [(number_of_nodes - 1, 0)]
+
+    if topology == 'star':
+        return [(0, node) for node in nodes[1:]]
+
+    if topology == 'full':
+        return list(itertools.combinations(nodes, 2))
+
+    raise ValueError('unknown topology {}'.format(topology))
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.blockchain = MockBlockchain(args.blocktime)
+        self.network = NetworkEmulator(
+            LinkProfile(
+                latency=args.latency,
+                jitter=args.jitter,
+                loss=args.loss,
+                reorder=args.reorder,
+                bandwidth=args.bandwidth,
+            ),
+            seed=args.seed,
+        )
+        self.discovery = Discovery()
+        self.pending_direct_transfers = dict()
+        self.identifiers = itertools.count(1)
+        self.services = list()
+
+    def received_direct_transfer(self, message):
+        async_result = self.pending_direct_transfers.get(message.payment_identifier)
+
+        if async_result is not None and not async_result.ready():
+            async_result.set(True)
+
+    def throttle_policy(self):
+        if self.args.throttle_fill_rate and self.args.fair_share:
+            return FairSharePolicy(self.args.throttle_capacity, self.args.throttle_fill_rate)
+
+        if self.args.throttle_fill_rate:
+            return TokenBucket(self.args.throttle_capacity, self.args.throttle_fill_rate)
+
+        return DummyPolicy()
+
+    def start(self):
+        args = self.args
+
+        private_keys = [
+            sha3('benchmark:{}'.format(position).encode())
+            for position in range(args.nodes)
+        ]
+        addresses = [privatekey_to_address(key) for key in private_keys]
+
+        for node1, node2 in topology_edges(args.topology, args.nodes):
+            self.blockchain.new_channel(addresses[node1], addresses[node2], args.deposit)
+
+        for position, private_key in enumerate(private_keys):
+            host_port = ('127.0.0.1', args.base_port + position)
+
+            config = deepcopy(App.DEFAULT_CONFIG)
+            config.update({
+                'host': host_port[0],
+                'port': host_port[1],
+                'external_ip': host_port[0],
+                'external_port': host_port[1],
+                'privatekey_hex': private_key.hex(),
+                'reveal_timeout': DEFAULT_REVEAL_TIMEOUT,
+                'settle_timeout': DEFAULT_SETTLE_TIMEOUT,
+                'database_path': ':memory:',
+            })
+            config['transport']['retry_interval'] = args.retry_interval
+            config['transport']['window_size'] = args.window_size
+            config['transport']['packing_window'] = args.packing_window
+
+            transport = InProcessTransport(
+                self.network,
+                host_port,
+                self.discovery,
+                self.throttle_policy(),
+                config['transport'],
+                self.received_direct_transfer,
+            )
+
+            chain = MockChain(self.blockchain, addresses[position])
+            registry = chain.registry(self.blockchain.registry_address)
+
+            service = RaidenService(
+                chain,
+                registry,
+                private_key,
+                transport,
+                config,
+                self.discovery,
+            )
+            self.services.append(service)
+
+        gevent.spawn(self.blockchain.mine)
+
+        # The transport only sends messages to healthy nodes
+        with gevent.Timeout(args.timeout):
+            for service in self.services:
+                node_state = views.state_from_raiden(service)
+                for neighbour in views.all_neighbour_nodes(node_state):
+                    while views.get_node_network_status(
+                        views.state_from_raiden(service),
+                        neighbour,
+                    ) != NODE_NETWORK_REACHABLE:
+                        gevent.sleep(0.1)
+
+    def stop(self):
+        for service in self.services:
+            service.stop()
+
+    def transfer_pairs(self):
+        """ Return the list of (initiator, target) used for the transfers. """
+        edges = topology_edges(self.args.topology, self.args.nodes)
+
+        if self.args.mode == 'direct':
+            pairs = edges + [(node2, node1) for node1, node2 in edges]
+        elif self.args.topology == 'line':
+            pairs = [(0, self.args.nodes - 1), (self.args.nodes - 1, 0)]
+        else:
+            pairs = [
+                (node1, node2)
+                for node1, node2 in itertools.permutations(range(self.args.nodes), 2)
+                if (node1, node2) not in edges and (node2, node1) not in edges
+            ]
+            pairs = pairs or edges
+
+        return pairs
+
+    def do_transfer(self, initiator, target):
+        token_network_identifier = self.blockchain.manager_address
+        identifier = next(self.identifiers)
+        start = time.time()
+
+        if self.args.mode == 'direct':
+            async_result = AsyncResult()
+            self.pending_direct_transfers[identifier] = async_result
+
+            initiator.direct_transfer_async(
+                token_network_identifier,
+                TRANSFER_AMOUNT,
+                target.address,
+                identifier,
+            )
+        else:
+            async_result = initiator.mediated_transfer_async(
+                token_network_identifier,
+                TRANSFER_AMOUNT,
+                target.address,
+                identifier,
+            )
+
+        success = async_result.wait(timeout=self.args.timeout)
+        self.pending_direct_transfers.pop(identifier, None)
+
+        return bool(success), time.time() - start
+
+    def run(self):
+        pairs = self.transfer_pairs()
+        schedule = [
+            random.choice(pairs)
+            for _ in range(self.args.transfers)
+        ]
+
+        pool = Pool(self.args.concurrency)
+        datagrams_start = self.network.datagrams
+        cpu_start = time.process_time()
+        wall_start = time.time()
+
+        greenlets = [
+            pool.spawn(self.do_transfer, self.services[initiator], self.services[target])
+            for initiator, target in schedule
+        ]
+        gevent.joinall(greenlets, raise_error=True)
+
+        elapsed = time.time() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        datagrams = self.network.datagrams - datagrams_start
+        throttle_delay = sum(
+            metrics['total_delay']
+            for service in self.services
+            for metrics in service.transport.throttle_metrics.report().values()
+        )
+        results = [greenlet.value for greenlet in greenlets]
+        latencies = sorted(latency for success, latency in results if success)
+        completed = len(latencies)
+
+        return {
+            'mode': self.args.mode,
+            'topology': self.args.topology,
+            'nodes': self.args.nodes,
+            'concurrency': self.args.concurrency,
+            'window_size': self.args.window_size,
+            'latency': self.args.latency,
+            'jitter': self.args.jitter,
+            'loss': self.args.loss,
+            'reorder': self.args.reorder,
+            'bandwidth': self.args.bandwidth,
+            'transfers': len(results),
+            'completed': completed,
+            'failed': len(results) - completed,
+            'elapsed': elapsed,
+            'transfers_per_second': completed / elapsed if elapsed else 0.0,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p99': percentile(latencies, 99),
+            'cpu_per_transfer': cpu / completed if completed else 0.0,
+            'datagrams_per_second': datagrams / elapsed if elapsed else 0.0,
+            'throttle_delay': throttle_delay,
+            'network': dict(self.network.metrics),
+        }
+
+
+def print_result(result):
+    print('{mode} transfers, {topology} topology with {nodes} nodes'.format(**result))
+    print(
+        '  link:               {latency}s latency, {jitter}s jitter, {loss} loss, '
+        '{reorder} reorder, {bandwidth} bytes/s'.format(**result)
+    )
+    print('  window size:        {window_size}'.format(**result))
+    print('  transfers:          {completed}/{transfers}'.format(**result))
+    print('  elapsed:            {elapsed:.3f}s'.format(**result))
+    print('  transfers/s:        {transfers_per_second:.2f}'.format(**result))
+    print('  latency p50:        {:.2f}ms'.format(result['latency_p50'] * 1000))
+    print('  latency p99:        {:.2f}ms'.format(result['latency_p99'] * 1000))
+    print('  cpu per transfer:   {:.2f}ms'.format(result['cpu_per_transfer'] * 1000))
+    print('  datagrams/s:        {datagrams_per_second:.2f}'.format(**result))
+    print('  throttle delay:     {throttle_delay:.3f}s'.format(**result))
+    print('  network:            {network}'.format(**result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=3)
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='line')
+    parser.add_argument('--mode', choices=('direct', 'mediated'), default='mediated')
+    parser.add_argument('--transfers', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--deposit', type=int, default=2 ** 64)
+    parser.add_argument('--blocktime', type=float, default=15)
+    parser.add_argument('--retry-interval', type=float, default=1)
+    parser.add_argument(
+        '--window-size',
+        type=int,
+        default=DEFAULT_TRANSPORT_WINDOW_SIZE,
+        help='Unacknowledged messages in flight per queue, 1 is stop-and-wait',
+    )
+    parser.add_argument(
+        '--packing-window',
+        type=float,
+        default=DEFAULT_TRANSPORT_PACKING_WINDOW,
+        help='Seconds to wait to pack messages in a datagram, 0 disables packing',
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0,
+        help='One-way delay of every datagram in seconds',
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0,
+        help='Maximum random delay added to the latency in seconds',
+    )
+    parser.add_argument(
+        '--loss',
+        type=float,
+        default=0,
+        help='Probability of a datagram being lost',
+    )
+    parser.add_argument(
+        '--reorder',
+        type=float,
+        default=0,
+        help='Probability of a datagram being held back and overtaken',
+    )
+    parser.add_argument(
+        '--bandwidth',
+        type=float,
+        default=None,
+        help='Bytes per second of every link, by default unlimited',
+    )
+    parser.add_argument(
+        '--throttle-capacity',
+        type=float,
+        default=10,
+        help='Token bucket capacity, only used with --throttle-fill-rate',
+    )
+    parser.add_argument(
+        '--throttle-fill-rate',
+        type=float,
+        default=0,
+        help='Token bucket fill rate, by default the transport is not throttled',
+    )
+    parser.add_argument(
+        '--fair-share',
+        action='store_true',
+        help='Throttle with per-peer buckets, see FairSharePolicy',
+    )
+    parser.add_argument('--base-port', type=int, default=40000)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='Print the results as json')
+    parser.add_argument('--log-level', default='CRITICAL')
+    args = parser.parse_args()
+
+    if args.nodes < 2:
+        parser.error('at least two nodes are required')
+
+    configure_logging({'': args.log_level}, colorize=False)
+    random.seed(args.seed)
+
+    benchmark = Benchmark(args)
+    benchmark.start()
+
+    try:
+        result = benchmark.run()
+    finally:
+        benchmark.stop()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_result(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 
 
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+
+    position = int(round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[position]
+
+
 def print_serialization(pstats):  # pylint: disable=too-many-locals
     print('ncalls         tottime  percall  %    cumtime  percall  function')
     total_pct = 0.0
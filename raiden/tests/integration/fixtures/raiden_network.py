@@ -268,5 +268,11 @@ def raiden_network(
     # Force blocknumber update
     for app in raiden_apps:
         app.raiden.alarm.poll_for_new_block()
+        app.raiden.alarm.wait_for_pending_blocks()
+        waiting.wait_for_block(
+            app.raiden,
+            app.raiden.alarm.last_block_number,
+            app.raiden.alarm.wait_time,
+        )
 
     return raiden_apps
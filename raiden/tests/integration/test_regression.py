@@ -188,7 +188,7 @@ def test_regression_multiple_revealsecret(raiden_network, token_addresses, trans
         random.randint(0, UINT64_MAX),
         payment_identifier,
         nonce,
-        app0.raiden.default_registry.address,
+        token_network_identifier,
         token,
         channelstate_0_1.identifier,
         transferred_amount,
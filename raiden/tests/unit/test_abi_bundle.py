@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from raiden.blockchain.abi import (
+    CONTRACT_REGISTRY,
+    EVENT_TOKEN_ADDED,
+    LazyContractManager,
+    bundle_checksum,
+    load_abi_bundle,
+    sources_checksum,
+)
+
+TOKEN_ADDED_ABI = {
+    'anonymous': False,
+    'inputs': [
+        {'indexed': False, 'name': 'token_address', 'type': 'address'},
+        {'indexed': False, 'name': 'channel_manager_address', 'type': 'address'},
+    ],
+    'name': EVENT_TOKEN_ADDED,
+    'type': 'event',
+}
+
+
+def write_bundle(directory):
+    with open(os.path.join(directory, 'Registry.sol'), 'w') as handler:
+        handler.write('contract Registry {}')
+
+    contracts = {
+        CONTRACT_REGISTRY: {'abi': [TOKEN_ADDED_ABI], 'version': '0.2._'},
+    }
+    bundle = {
+        'sources_checksum': sources_checksum(directory),
+        'checksum': bundle_checksum(contracts),
+        'contracts': contracts,
+    }
+
+    bundle_path = os.path.join(directory, 'contracts.json')
+    with open(bundle_path, 'w') as handler:
+        json.dump(bundle, handler)
+
+    return bundle_path
+
+
+def test_abi_bundle_is_loaded_without_compiling(tmpdir):
+    directory = str(tmpdir)
+    bundle_path = write_bundle(directory)
+    manager = LazyContractManager(directory, bundle_path)
+
+    assert manager.get_contract_abi(CONTRACT_REGISTRY) == [TOKEN_ADDED_ABI]
+    assert manager.get_event_abi(CONTRACT_REGISTRY, EVENT_TOKEN_ADDED) == TOKEN_ADDED_ABI
+    assert manager.get_event_id(EVENT_TOKEN_ADDED).startswith('0x')
+    assert manager.get_version(CONTRACT_REGISTRY) == '0.2._'
+    assert manager._compiled is None  # pylint: disable=protected-access
+
+
+def test_outdated_abi_bundle_is_ignored(tmpdir):
+    directory = str(tmpdir)
+    bundle_path = write_bundle(directory)
+    assert load_abi_bundle(directory, bundle_path) is not None
+
+    with open(os.path.join(directory, 'Registry.sol'), 'a') as handler:
+        handler.write('\n')
+    assert load_abi_bundle(directory, bundle_path) is None
+
+
+def test_corrupted_abi_bundle_is_ignored(tmpdir):
+    directory = str(tmpdir)
+    bundle_path = write_bundle(directory)
+
+    with open(bundle_path) as handler:
+        bundle = json.load(handler)
+    bundle['contracts'][CONTRACT_REGISTRY]['version'] = '9.9._'
+    with open(bundle_path, 'w') as handler:
+        json.dump(bundle, handler)
+
+    assert load_abi_bundle(directory, bundle_path) is None
+    assert load_abi_bundle(directory, os.path.join(directory, 'missing.json')) is None
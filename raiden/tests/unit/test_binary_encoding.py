@@ -7,8 +7,10 @@ from raiden.messages import (
     decode,
     Processed,
     Ping,
+    Pong,
 )
 from raiden.constants import UINT256_MAX, UINT64_MAX
+from raiden.encoding.signing import Signer
 from raiden.utils import sha3
 from raiden.tests.utils.messages import (
     make_direct_transfer,
@@ -26,6 +28,27 @@ def test_signature():
     assert ping.sender == ADDRESS
 
 
+def test_signer_caches_signatures():
+    signer = Signer(PRIVKEY, cache_size=2)
+
+    pong = Pong(nonce=1)
+    pong.sign(signer, ADDRESS)
+
+    expected_pong = Pong(nonce=1)
+    expected_pong.sign(PRIVKEY, ADDRESS)
+    assert pong.signature == expected_pong.signature
+
+    repeated_pong = Pong(nonce=1)
+    repeated_pong.sign(signer, ADDRESS)
+    assert repeated_pong.signature == pong.signature
+    assert decode(repeated_pong.encode()).sender == ADDRESS
+
+    metrics = signer.metrics()
+    assert metrics['signatures'] == 1
+    assert metrics['cache_hits'] == 1
+    assert metrics['signatures_per_second'] > 0
+
+
 def test_encoding():
     ping = Ping(nonce=0)
     ping.sign(PRIVKEY, ADDRESS)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import gevent
+import pytest
+
+from raiden import connection_manager
+from raiden.connection_manager import ConnectionManager
+from raiden.exceptions import InsufficientFunds, TransactionThrew
+from raiden.tests.utils.factories import make_address
+from raiden.transfer import views
+
+
+class MockPartnerState:
+    def __init__(self, address):
+        self.address = address
+
+
+class MockChannelState:
+    def __init__(self, partner):
+        self.partner_state = MockPartnerState(partner)
+
+
+class MockRaidenAPI:
+    def __init__(self, participants, failing_opens=(), failing_deposits=()):
+        self.participants = participants
+        self.failing_opens = set(failing_opens)
+        self.failing_deposits = set(failing_deposits)
+
+        #: Deposit of every opened channel, by partner
+        self.channels = dict()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _transaction(self):
+        # Gives the other greenlets a chance to send their transactions
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        gevent.sleep(0.001)
+        self.in_flight -= 1
+
+    def channel_open(self, registry_address, token_address, partner_address):
+        # pylint: disable=unused-argument
+        self._transaction()
+
+        if partner_address in self.failing_opens:
+            raise InsufficientFunds('not enough ether to open the channel')
+
+        self.channels[partner_address] = 0
+
+    def channel_deposit(self, registry_address, token_address, partner_address, amount):
+        # pylint: disable=unused-argument
+        self._transaction()
+
+        if partner_address in self.failing_deposits:
+            raise TransactionThrew('Deposit', {'status': 0})
+
+        self.channels[partner_address] += amount
+
+
+@pytest.fixture
+def mock_views(monkeypatch):
+    """ Make the views used by the ConnectionManager read the channels of the
+    MockRaidenAPI.
+    """
+    def api_of(raiden):
+        return raiden.api
+
+    def get_channelstate_open(api, registry_address, token_address):
+        # pylint: disable=unused-argument
+        return [MockChannelState(partner) for partner in api.channels]
+
+    def get_our_capacity_for_token_network(api, registry_address, token_address):
+        # pylint: disable=unused-argument
+        return sum(api.channels.values())
+
+    def count_token_network_channels(api, registry_address, token_address):
+        # pylint: disable=unused-argument
+        return len(api.participants)
+
+    def get_participants_addresses(api, registry_address, token_address):
+        # pylint: disable=unused-argument
+        return set(api.participants)
+
+    monkeypatch.setattr(views, 'state_from_raiden', api_of)
+    monkeypatch.setattr(views, 'get_channelstate_open', get_channelstate_open)
+    monkeypatch.setattr(
+        views,
+        'get_our_capacity_for_token_network',
+        get_our_capacity_for_token_network,
+    )
+    monkeypatch.setattr(views, 'count_token_network_channels', count_token_network_channels)
+    monkeypatch.setattr(views, 'get_participants_addresses', get_participants_addresses)
+
+
+class MockRaidenService:
+    def __init__(self, api):
+        self.address = make_address()
+        self.api = api
+
+
+def make_connection_manager(api):
+    manager = ConnectionManager(MockRaidenService(api), make_address(), make_address())
+    manager.api = api
+    return manager
+
+
+@pytest.mark.usefixtures('mock_views')
+def test_connect_opens_the_channels_concurrently():
+    partners = [make_address() for _ in range(5)]
+    api = MockRaidenAPI(partners)
+
+    manager = make_connection_manager(api)
+    manager.connect(1000, initial_channel_target=5, joinable_funds_target=0.4)
+
+    assert api.channels == {partner: 120 for partner in partners}
+    assert api.max_in_flight == 5
+    assert manager._funds_remaining == 400  # pylint: disable=protected-access
+    assert not manager.lock.locked()
+
+
+@pytest.mark.usefixtures('mock_views')
+def test_connect_with_a_failed_open_and_a_failed_deposit(monkeypatch):
+    monkeypatch.setattr(connection_manager, 'MAX_CONCURRENT_CHANNEL_OPENS', 2)
+
+    partners = [make_address() for _ in range(5)]
+    failed_open, failed_deposit = partners[0], partners[1]
+    api = MockRaidenAPI(
+        partners,
+        failing_opens=[failed_open],
+        failing_deposits=[failed_deposit],
+    )
+
+    manager = make_connection_manager(api)
+    manager.connect(1000, initial_channel_target=5, joinable_funds_target=0.4)
+
+    # The failures don't stop the other partners from being opened and funded
+    assert failed_open not in api.channels
+    assert api.channels[failed_deposit] == 0
+    assert all(api.channels[partner] == 120 for partner in partners[2:])
+    assert api.max_in_flight == 2
+
+    # The funds of the failed deposit are still available to join the network
+    assert manager.funds == 1000
+    assert manager._funds_remaining == 640  # pylint: disable=protected-access
+    assert not manager.lock.locked()
+
+    # The channel with the failed deposit is already open, only the partner
+    # of the failed open is tried again
+    api.failing_opens.clear()
+    manager.retry_connect(manager.registry_address)
+
+    assert api.channels[failed_open] == 120
+    assert api.channels[failed_deposit] == 0
+    assert not manager.lock.locked()
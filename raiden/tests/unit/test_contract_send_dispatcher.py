@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import gevent
+from gevent.lock import RLock
+
+from raiden.contract_send_dispatcher import ContractSendDispatcher
+from raiden.exceptions import RaidenShuttingDown
+from raiden.storage.serialize import PickleSerializer
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.transfer.events import (
+    ContractSendChannelClose,
+    ContractSendChannelSettle,
+)
+from raiden.tests.utils.factories import make_address
+
+
+class MockNettingChannel:
+    def __init__(self, calls, channel_identifier):
+        self.calls = calls
+        self.channel_identifier = channel_identifier
+        self.channel_operations_lock = RLock()
+        self.shutting_down = False
+
+    def close(self, *args):  # pylint: disable=unused-argument
+        self.calls.append(('close_start', self.channel_identifier))
+        gevent.sleep(0.01)
+        self.calls.append(('close', self.channel_identifier))
+
+    def settle(self):
+        if self.shutting_down:
+            raise RaidenShuttingDown()
+        self.calls.append(('settle', self.channel_identifier))
+
+
+class MockChain:
+    def __init__(self):
+        self.calls = list()
+        self.channels = dict()
+
+    def netting_channel(self, channel_identifier):
+        if channel_identifier not in self.channels:
+            self.channels[channel_identifier] = MockNettingChannel(
+                self.calls,
+                channel_identifier,
+            )
+        return self.channels[channel_identifier]
+
+
+class MockRaidenService:
+    def __init__(self):
+        self.address = make_address()
+        self.chain = MockChain()
+
+
+def test_contract_send_events_are_handled_concurrently():
+    raiden = MockRaidenService()
+    dispatcher = ContractSendDispatcher(raiden, max_workers=10)
+    channels = [make_address() for _ in range(5)]
+
+    for channel_identifier in channels:
+        dispatcher.dispatch(ContractSendChannelClose(channel_identifier, make_address(), None))
+
+    assert len(dispatcher) == len(channels)
+    dispatcher.join(timeout=1)
+    assert len(dispatcher) == 0
+
+    # all the transactions were in flight at the same time
+    started = [call for call, _ in raiden.chain.calls[:len(channels)]]
+    assert started == ['close_start'] * len(channels)
+
+
+def test_contract_send_events_are_ordered_per_channel():
+    raiden = MockRaidenService()
+    dispatcher = ContractSendDispatcher(raiden, max_workers=10)
+    channel_identifier = make_address()
+
+    dispatcher.dispatch(ContractSendChannelClose(channel_identifier, make_address(), None))
+    dispatcher.dispatch(ContractSendChannelSettle(channel_identifier))
+    dispatcher.join(timeout=1)
+
+    assert raiden.chain.calls == [
+        ('close_start', channel_identifier),
+        ('close', channel_identifier),
+        ('settle', channel_identifier),
+    ]
+    assert not dispatcher.channel_tail
+
+
+def test_contract_send_waits_for_the_channel_lock():
+    raiden = MockRaidenService()
+    dispatcher = ContractSendDispatcher(raiden, max_workers=10)
+    channel_identifier = make_address()
+    channel = raiden.chain.netting_channel(channel_identifier)
+
+    channel.channel_operations_lock.acquire()
+    dispatcher.dispatch(ContractSendChannelSettle(channel_identifier))
+    gevent.sleep(0.01)
+    assert not raiden.chain.calls
+
+    channel.channel_operations_lock.release()
+    dispatcher.join(timeout=1)
+    assert raiden.chain.calls == [('settle', channel_identifier)]
+
+
+def test_contract_send_events_are_resumed_after_restart():
+    storage = SQLiteStorage(':memory:', PickleSerializer)
+    channel_identifier = make_address()
+    settle = ContractSendChannelSettle(channel_identifier)
+
+    raiden = MockRaidenService()
+    dispatcher = ContractSendDispatcher(raiden, max_workers=10)
+    assert dispatcher.start(storage, []) == []
+
+    raiden.chain.netting_channel(channel_identifier).shutting_down = True
+    dispatcher.dispatch(settle)
+    dispatcher.join(timeout=1)
+    assert dispatcher.metrics()['handled'] == 0
+    assert len(storage.get_contract_send_events()) == 1
+
+    # The settle is replayed from the write-ahead-log and it's also in the
+    # queue, it must be sent only once
+    raiden = MockRaidenService()
+    dispatcher = ContractSendDispatcher(raiden, max_workers=10)
+    assert dispatcher.start(storage, [settle]) == []
+    assert dispatcher.queue_depth == 1
+
+    dispatcher.join(timeout=1)
+    assert raiden.chain.calls == [('settle', channel_identifier)]
+    assert dispatcher.metrics()['handled'] == 1
+    assert not storage.get_contract_send_events()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from raiden.exceptions import UnknownAddress
+from raiden.network.discovery import ContractDiscovery, Discovery
+from raiden.tests.utils.factories import make_address
+
+
+class MockDiscoveryProxy:
+    def __init__(self):
+        self.endpoints = dict()
+        self.calls = list()
+
+    def endpoint_by_address(self, node_address):
+        self.calls.append('endpoint_by_address')
+        try:
+            return self.endpoints[node_address]
+        except KeyError:
+            raise UnknownAddress()
+
+    def address_by_endpoint(self, endpoint):
+        self.calls.append('address_by_endpoint')
+        for node_address, node_endpoint in self.endpoints.items():
+            if node_endpoint == endpoint:
+                return node_address
+        return None
+
+    def all_endpoints(self):
+        self.calls.append('all_endpoints')
+        return dict(self.endpoints)
+
+
+def test_discovery_reverse_mapping_is_updated():
+    discovery = Discovery()
+    address = make_address()
+
+    discovery.register(address, '127.0.0.1', 44444)
+    discovery.register(address, '127.0.0.1', 44445)
+
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) is None
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44445)) == address
+
+
+def test_contract_discovery_prefetch():
+    proxy = MockDiscoveryProxy()
+    partner = make_address()
+    unregistered = make_address()
+    proxy.endpoints[partner] = '127.0.0.1:44444'
+
+    discovery = ContractDiscovery(make_address(), proxy)
+    discovery.prefetch([partner, unregistered])
+    discovery.subscribed = True
+
+    assert discovery.get(partner) == ('127.0.0.1', 44444)
+    assert discovery.nodeid_by_host_port(('127.0.0.1', 44444)) == partner
+
+    with pytest.raises(UnknownAddress):
+        discovery.get(unregistered)
+
+    assert proxy.calls == ['all_endpoints']
+
+    # The registration events update the cache
+    discovery.update_endpoint(unregistered, '127.0.0.1:44445')
+    assert discovery.get(unregistered) == ('127.0.0.1', 44445)
+    assert proxy.calls == ['all_endpoints']
+
+
+def test_contract_discovery_caches_unknown_addresses():
+    proxy = MockDiscoveryProxy()
+    unregistered = make_address()
+    discovery = ContractDiscovery(make_address(), proxy)
+
+    for _ in range(3):
+        with pytest.raises(UnknownAddress):
+            discovery.get(unregistered)
+
+    assert proxy.calls == ['endpoint_by_address']
+
+    # The backoff doubles on every failed query
+    _, backoff = discovery.unknown_addresses[unregistered]
+    discovery.unknown_addresses[unregistered] = (0, backoff)
+    with pytest.raises(UnknownAddress):
+        discovery.get(unregistered)
+    assert discovery.unknown_addresses[unregistered][1] == backoff * 2
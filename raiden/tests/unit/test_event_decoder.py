@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from eth_abi import encode_abi, encode_single
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from web3.utils.events import get_event_data
+
+from raiden.network.rpc.smartcontract_proxy import EventDecoder
+from raiden.tests.utils.factories import make_address
+
+CHANNEL_NEW_ABI = {
+    'anonymous': False,
+    'inputs': [
+        {'indexed': True, 'name': 'registry_address', 'type': 'address'},
+        {'indexed': False, 'name': 'netting_channel', 'type': 'address'},
+        {'indexed': False, 'name': 'settle_timeout', 'type': 'uint256'},
+        {'indexed': False, 'name': 'secret', 'type': 'bytes32'},
+    ],
+    'name': 'ChannelNew',
+    'type': 'event',
+}
+ABI = [CHANNEL_NEW_ABI]
+
+
+def make_log(registry_address, netting_channel, settle_timeout, secret):
+    data = encode_abi(
+        ['address', 'uint256', 'bytes32'],
+        [netting_channel, settle_timeout, secret],
+    )
+    return {
+        'address': to_checksum_address(make_address()),
+        'topics': [
+            event_abi_to_log_topic(CHANNEL_NEW_ABI),
+            encode_single('address', registry_address),
+        ],
+        'data': '0x' + data.hex(),
+        'blockNumber': 7,
+        'blockHash': b'\x01' * 32,
+        'transactionHash': b'\x02' * 32,
+        'transactionIndex': 0,
+        'logIndex': 3,
+    }
+
+
+def test_event_decoder_matches_web3():
+    log = make_log(make_address(), make_address(), 600, b'\x03' * 32)
+
+    decoded = EventDecoder(ABI).decode(log)
+    expected = get_event_data(CHANNEL_NEW_ABI, log)
+
+    assert decoded['event'] == expected['event']
+    assert decoded['args'] == dict(expected['args'])
+    assert decoded['blockNumber'] == expected['blockNumber']
+    assert decoded['logIndex'] == expected['logIndex']
+
+
+def test_event_decoder_internal():
+    registry_address = make_address()
+    netting_channel = make_address()
+    log = make_log(registry_address, netting_channel, 600, b'\x03' * 32)
+
+    decoded = EventDecoder(ABI).decode_internal(log)
+
+    assert decoded['args']['registry_address'] == registry_address
+    assert decoded['args']['netting_channel'] == netting_channel
+    assert decoded['netting_channel'] == netting_channel
+    assert 'settle_timeout' not in decoded
+    assert decoded['args']['settle_timeout'] == 600
+    assert decoded['block_number'] == 7
+    # log fields are never shadowed by the arguments
+    assert decoded['address'] == log['address']
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import pytest
 
-from raiden.messages import Ping
+from raiden.constants import UINT64_MAX
+from raiden.encoding import signing
+from raiden.encoding.messages import DELIVERED_BATCH_SIZE
+from raiden.messages import DeliveredBatch, Ping, decode, from_dict
 from raiden.tests.utils.messages import (
     make_direct_transfer,
     make_lock,
@@ -51,3 +54,31 @@ def test_direct_transfer_out_of_bounds_values():
 def test_amount_out_of_bounds(amount, make):
     with pytest.raises(ValueError):
         make(amount=amount)
+
+
+def test_delivered_batch():
+    identifiers = [1, 2, UINT64_MAX]
+    delivered = DeliveredBatch(identifiers)
+    delivered.sign(PRIVKEY, ADDRESS)
+
+    decoded = decode(delivered.encode())
+    assert decoded.sender == ADDRESS
+    assert decoded.delivered_message_identifiers == identifiers
+    assert from_dict(delivered.to_dict()).delivered_message_identifiers == identifiers
+
+    with pytest.raises(ValueError):
+        DeliveredBatch([])
+
+
+@pytest.mark.parametrize('delivered_count', [0, DELIVERED_BATCH_SIZE + 1])
+def test_delivered_batch_with_invalid_count(delivered_count):
+    delivered = DeliveredBatch([1])
+    delivered.sign(PRIVKEY, ADDRESS)
+
+    # The size of the datagram is valid, the count is set after the cmdid and
+    # the padding, and the message is signed again by the peer
+    data = bytearray(delivered.encode())
+    data[3] = delivered_count
+    data[-65:] = signing.sign(bytes(data[:-65]), PRIVKEY)
+
+    assert decode(bytes(data)) is None
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from raiden.exceptions import AddressWithoutCode
+from raiden.network.proxies.metadata_cache import CONTRACT_MANAGER, ContractMetadataCache
+from raiden.tests.utils.factories import make_address
+
+GENESIS_HASH = b'\x01' * 32
+
+
+class MockEth:
+    def __init__(self):
+        self.code = b'\x01'
+        self.calls = 0
+
+    def getCode(self, address, block_identifier):  # pylint: disable=unused-argument
+        self.calls += 1
+        return self.code
+
+
+class MockWeb3:
+    def __init__(self):
+        self.eth = MockEth()
+
+
+class MockClient:
+    def __init__(self):
+        self.web3 = MockWeb3()
+
+
+def test_metadata_cache_fetches_once():
+    cache = ContractMetadataCache()
+    address = make_address()
+    fetched = list()
+
+    def fetch():
+        fetched.append(True)
+        return 600
+
+    assert cache.get(address, 'settleTimeout', fetch) == 600
+    assert cache.get(address, 'settleTimeout', fetch) == 600
+    assert len(fetched) == 1
+
+
+def test_metadata_cache_verifies_once():
+    cache = ContractMetadataCache()
+    client = MockClient()
+    address = make_address()
+
+    cache.verify(client, address, 'Token')
+    cache.verify(client, address, 'Token')
+    assert client.web3.eth.calls == 1
+
+    client.web3.eth.code = b''
+    with pytest.raises(AddressWithoutCode):
+        cache.verify(client, make_address(), 'Token')
+
+
+def test_metadata_cache_persistence(tmpdir):
+    path = os.path.join(str(tmpdir), 'netid_1', 'contract_metadata.pickle')
+    address = make_address()
+    client = MockClient()
+
+    cache = ContractMetadataCache(path, GENESIS_HASH)
+    cache.get(address, 'tokenAddress', lambda: address)
+    cache.verify(client, address, 'Token')
+
+    # The cache is only written when the node stops
+    assert not os.path.exists(path)
+    cache.save()
+
+    restored = ContractMetadataCache(path, GENESIS_HASH)
+    assert restored.get(address, 'tokenAddress', lambda: None) == address
+
+    restored.verify(client, address, 'Token')
+    assert client.web3.eth.calls == 1
+
+    # A redeployed chain may reuse the network id
+    redeployed = ContractMetadataCache(path, b'\x02' * 32)
+    assert redeployed.get(address, 'tokenAddress', lambda: None) is None
+
+
+def test_metadata_cache_verifies_the_expected_version(monkeypatch):
+    cache = ContractMetadataCache()
+    client = MockClient()
+    address = make_address()
+    expected_versions = list()
+
+    monkeypatch.setattr(CONTRACT_MANAGER, 'get_version', lambda name: '0.3._')
+    monkeypatch.setattr(
+        CONTRACT_MANAGER,
+        'check_contract_version',
+        lambda version, name: expected_versions.append(version),
+    )
+
+    cache.verify(client, address, 'Registry', lambda: '0.3._')
+    cache.verify(client, address, 'Registry', lambda: '0.3._')
+    assert expected_versions == ['0.3._']
+
+    # After an upgrade of the node the deployed version is checked again
+    monkeypatch.setattr(CONTRACT_MANAGER, 'get_version', lambda name: '0.4._')
+    cache.verify(client, address, 'Registry', lambda: '0.3._')
+    assert expected_versions == ['0.3._', '0.3._']
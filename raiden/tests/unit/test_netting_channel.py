@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import os
+from binascii import hexlify
+from itertools import count
+
+import pytest
+
+from raiden.exceptions import TransactionThrew
+from raiden.messages import Lock
+from raiden.network.proxies import netting_channel
+from raiden.network.proxies.netting_channel import NettingChannel
+from raiden.raiden_event_handler import handle_contract_channelunlock
+from raiden.transfer.events import ContractSendChannelUnlock
+from raiden.transfer.state import UnlockProofState
+from raiden.tests.utils.factories import make_address
+from raiden.utils import sha3
+
+
+class MockClient:
+    def __init__(self, calls, thrown_transactions):
+        self.calls = calls
+        self.thrown_transactions = thrown_transactions
+        self.nonces = count(7)
+
+    def gaslimit(self):  # pylint: disable=no-self-use
+        return 1000000
+
+    def poll(self, transaction_hash, timeout=None):  # pylint: disable=unused-argument
+        self.calls.append(('poll', transaction_hash))
+
+
+class MockProxy:
+    def __init__(self, client, failing_estimates):
+        self.client = client
+        self.failing_estimates = failing_estimates
+
+    def estimate_gas(self, function, lock_encoded, merkleproof, secret):
+        # pylint: disable=unused-argument
+        self.client.calls.append(('estimate_gas', lock_encoded))
+
+        if lock_encoded in self.failing_estimates:
+            return None
+
+        return 30000
+
+    def transact(self, function, lock_encoded, merkleproof, secret, startgas):
+        # pylint: disable=unused-argument
+        nonce = next(self.client.nonces)
+        transaction_hash = sha3(lock_encoded)
+        self.client.calls.append(('transact', lock_encoded, nonce, startgas))
+
+        return hexlify(transaction_hash).decode()
+
+
+def make_unlock_proof(expiration=100):
+    secret = os.urandom(32)
+    lock = Lock(10, expiration, sha3(secret))
+    return UnlockProofState([], lock.as_bytes, secret)
+
+
+def make_netting_channel(monkeypatch, failing_estimates=(), thrown_transactions=()):
+    calls = list()
+    client = MockClient(calls, set(thrown_transactions))
+
+    # The constructor queries the contract, only the attributes used by
+    # batch_unlock are set
+    channel = NettingChannel.__new__(NettingChannel)
+    channel.address = make_address()
+    channel.node_address = make_address()
+    channel.client = client
+    channel.proxy = MockProxy(client, set(failing_estimates))
+    channel.poll_timeout = None
+    channel._check_exists = lambda: None  # pylint: disable=protected-access
+
+    def check_transaction_threw(client, transaction_hash):
+        client.calls.append(('receipt', transaction_hash))
+
+        if transaction_hash in client.thrown_transactions:
+            return {'status': 0}
+
+        return None
+
+    monkeypatch.setattr(netting_channel, 'check_transaction_threw', check_transaction_threw)
+    return channel
+
+
+def transaction_hash_of(unlock_proof):
+    return hexlify(sha3(unlock_proof.lock_encoded)).decode()
+
+
+def test_batch_unlock_sends_the_unlocks_together(monkeypatch):
+    unlock_proofs = [make_unlock_proof() for _ in range(3)]
+    skipped = unlock_proofs[1]
+
+    channel = make_netting_channel(monkeypatch, failing_estimates=[skipped.lock_encoded])
+    channel.batch_unlock(unlock_proofs)
+    calls = channel.client.calls
+
+    # The lock which would fail is skipped without using a nonce
+    transactions = [call for call in calls if call[0] == 'transact']
+    assert [call[1] for call in transactions] == [
+        unlock_proofs[0].lock_encoded,
+        unlock_proofs[2].lock_encoded,
+    ]
+    assert [call[2] for call in transactions] == [7, 8]
+    assert all(
+        call[3] == 30000 * netting_channel.UNLOCK_GAS_FACTOR
+        for call in transactions
+    )
+
+    # All the transactions are sent before waiting for the first one
+    first_poll = next(position for position, call in enumerate(calls) if call[0] == 'poll')
+    assert all(call[0] != 'transact' for call in calls[first_poll:])
+
+    receipts = [call[1] for call in calls if call[0] == 'receipt']
+    assert receipts == [
+        transaction_hash_of(unlock_proofs[0]),
+        transaction_hash_of(unlock_proofs[2]),
+    ]
+
+
+def test_batch_unlock_raises_after_all_receipts(monkeypatch):
+    unlock_proofs = [make_unlock_proof() for _ in range(3)]
+    failed = transaction_hash_of(unlock_proofs[0])
+
+    channel = make_netting_channel(monkeypatch, thrown_transactions=[failed])
+
+    with pytest.raises(TransactionThrew):
+        channel.batch_unlock(unlock_proofs)
+
+    # The failure is reported only once the other unlocks were mined
+    receipts = [call[1] for call in channel.client.calls if call[0] == 'receipt']
+    assert receipts == [transaction_hash_of(unlock_proof) for unlock_proof in unlock_proofs]
+
+
+class MockBatchChannel:
+    def __init__(self):
+        self.batches = list()
+
+    def batch_unlock(self, unlock_proofs):
+        self.batches.append(unlock_proofs)
+
+
+class MockChain:
+    def __init__(self):
+        self.channel = MockBatchChannel()
+
+    def netting_channel(self, channel_identifier):  # pylint: disable=unused-argument
+        return self.channel
+
+
+class MockRaidenService:
+    def __init__(self, block_number):
+        self.chain = MockChain()
+        self.block_number = block_number
+
+    def get_block_number(self):
+        return self.block_number
+
+
+def test_handle_contract_channelunlock_skips_expired_locks():
+    raiden = MockRaidenService(block_number=50)
+    expired = make_unlock_proof(expiration=49)
+    valid = [make_unlock_proof(expiration=50), make_unlock_proof(expiration=60)]
+
+    event = ContractSendChannelUnlock(make_address(), [expired] + valid)
+    handle_contract_channelunlock(raiden, event)
+    assert raiden.chain.channel.batches == [valid]
+
+    # Nothing is sent if all the locks expired
+    event = ContractSendChannelUnlock(make_address(), [expired])
+    handle_contract_channelunlock(raiden, event)
+    assert raiden.chain.channel.batches == [valid]
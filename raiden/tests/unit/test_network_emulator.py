@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import time
+
+import gevent
+
+from raiden.tests.utils.emulator import LinkProfile, NetworkEmulator
+
+HOST_PORT1 = ('127.0.0.1', 1)
+HOST_PORT2 = ('127.0.0.1', 2)
+HOST_PORT3 = ('127.0.0.1', 3)
+
+
+def start_servers(network, *host_ports):
+    received = {host_port: list() for host_port in host_ports}
+    servers = dict()
+
+    def handle(host_port):
+        return lambda data, sender: received[host_port].append((data, sender))
+
+    for host_port in host_ports:
+        server = network.datagram_server(host_port)
+        server.set_handle(handle(host_port))
+        server.start()
+        servers[host_port] = server
+
+    return servers, received
+
+
+def send_and_wait(server, host_port, datagrams, wait=0.05):
+    for data in datagrams:
+        server.sendto(data, host_port)
+    gevent.sleep(wait)
+
+
+def test_network_emulator_is_deterministic():
+    datagrams = [str(position).encode() for position in range(100)]
+    results = list()
+
+    for _ in range(2):
+        network = NetworkEmulator(LinkProfile(jitter=0.01, loss=0.3, reorder=0.2), seed=7)
+        servers, received = start_servers(network, HOST_PORT1, HOST_PORT2)
+        send_and_wait(servers[HOST_PORT1], HOST_PORT2, datagrams)
+        results.append([data for data, _ in received[HOST_PORT2]])
+
+        assert network.metrics['lost'] + network.metrics['delivered'] == len(datagrams)
+
+    assert results[0] == results[1]
+    assert 0 < len(results[0]) < len(datagrams)
+    assert results[0] != sorted(results[0], key=int)
+
+
+def test_network_emulator_order_does_not_depend_on_the_loop_time():
+    datagrams = [str(position).encode() for position in range(100)]
+    results = list()
+
+    for blocked in (0, 0.3):
+        network = NetworkEmulator(LinkProfile(jitter=0.01, reorder=0.2), seed=7)
+        servers, received = start_servers(network, HOST_PORT1, HOST_PORT2)
+
+        # Blocking the hub leaves the time of the gevent loop behind
+        gevent.sleep(0)
+        time.sleep(blocked)
+
+        for data in datagrams:
+            servers[HOST_PORT1].sendto(data, HOST_PORT2)
+
+        with gevent.Timeout(5):
+            while len(received[HOST_PORT2]) < len(datagrams):
+                gevent.sleep(0.01)
+
+        results.append([data for data, _ in received[HOST_PORT2]])
+
+    assert results[0] == results[1]
+    assert results[0] != datagrams
+
+
+def test_network_emulator_partition():
+    network = NetworkEmulator()
+    servers, received = start_servers(network, HOST_PORT1, HOST_PORT2, HOST_PORT3)
+
+    network.partition([HOST_PORT1], [HOST_PORT2])
+    send_and_wait(servers[HOST_PORT1], HOST_PORT2, [b'partitioned'])
+    send_and_wait(servers[HOST_PORT1], HOST_PORT3, [b'reachable'])
+    assert received[HOST_PORT2] == []
+    assert received[HOST_PORT3] == [(b'reachable', HOST_PORT1)]
+
+    network.heal()
+    send_and_wait(servers[HOST_PORT1], HOST_PORT2, [b'healed'])
+    assert received[HOST_PORT2] == [(b'healed', HOST_PORT1)]
+
+    # datagrams to a stopped server are lost
+    servers[HOST_PORT2].stop()
+    send_and_wait(servers[HOST_PORT1], HOST_PORT2, [b'stopped'])
+    assert received[HOST_PORT2] == [(b'healed', HOST_PORT1)]
+    assert network.metrics['partitioned'] == 1
+    assert network.metrics['undelivered'] == 1
+
+
+def test_network_emulator_bandwidth():
+    network = NetworkEmulator()
+    network.set_link(HOST_PORT1, HOST_PORT2, LinkProfile(bandwidth=500))
+    servers, received = start_servers(network, HOST_PORT1, HOST_PORT2, HOST_PORT3)
+
+    # Each datagram takes 0.1 seconds to be transmitted over the slow link
+    send_and_wait(servers[HOST_PORT1], HOST_PORT2, [b'x' * 50] * 4, wait=0)
+    send_and_wait(servers[HOST_PORT1], HOST_PORT3, [b'fast'], wait=0.25)
+
+    assert len(received[HOST_PORT2]) == 2
+    assert len(received[HOST_PORT3]) == 1
+
+    gevent.sleep(0.2)
+    assert len(received[HOST_PORT2]) == 4
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import gevent
+
+from raiden.utils.notifier import Notifier
+
+
+def test_wait_for_returns_immediately():
+    notifier = Notifier()
+    assert notifier.wait_for(lambda: 1) == 1
+
+
+def test_wait_for_is_woken_by_notify():
+    notifier = Notifier()
+    values = list()
+
+    waiter = gevent.spawn(notifier.wait_for, lambda: values)
+    gevent.sleep(0)
+    assert not waiter.ready()
+
+    # a notification without a change in the predicate must not wake it
+    notifier.notify()
+    gevent.sleep(0)
+    assert not waiter.ready()
+
+    values.append(1)
+    notifier.notify()
+
+    # the waiter does not depend on the poll timeout
+    assert waiter.get(timeout=1) == [1]
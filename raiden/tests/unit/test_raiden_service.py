@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import time
+
+import gevent
+from gevent.lock import Semaphore
+from gevent.queue import Queue
+
+from raiden import raiden_service
+from raiden.raiden_service import RaidenService
+from raiden.tasks import AlarmTask
+from raiden.transfer.state_change import Block
+
+
+class MockEvent:
+    def __init__(self, block_number):
+        self.event_data = {'block_number': block_number}
+
+
+class MockTransactionManager:
+    def __init__(self):
+        self.blocks = list()
+
+    def new_block(self, block_number):
+        self.blocks.append(block_number)
+
+
+class MockClient:
+    def __init__(self):
+        self.transaction_manager = MockTransactionManager()
+
+
+class MockChain:
+    def __init__(self):
+        self.client = MockClient()
+
+
+class MockBlockchainEvents:
+    def __init__(self, events):
+        self.events = events
+        self.polls = 0
+
+    def poll_blockchain_events(self):
+        self.polls += 1
+        events, self.events = self.events, list()
+        return events
+
+
+def make_raiden_service(monkeypatch, events):
+    applied = list()
+
+    # The constructor starts the node, only the attributes used by the block
+    # pipeline are set
+    raiden = RaidenService.__new__(RaidenService)
+    raiden.chain = MockChain()
+    raiden.alarm = AlarmTask(raiden.chain)
+    raiden.blockchain_events = MockBlockchainEvents(events)
+    raiden.event_poll_lock = Semaphore()
+    raiden.polled_events = list()
+    raiden.events_polled_until = None
+    raiden.block_dispatch_queue = Queue()
+
+    def on_blockchain_event(raiden, event, current_block_number):
+        # pylint: disable=unused-argument
+        applied.append((event, current_block_number))
+
+    def handle_state_change(state_change, block_number):
+        # The dispatcher is slower than the polling of the events
+        gevent.sleep(0.01)
+        applied.append((state_change, block_number))
+
+    monkeypatch.setattr(raiden_service, 'on_blockchain_event', on_blockchain_event)
+    raiden.handle_state_change = handle_state_change
+
+    return raiden, applied
+
+
+def test_every_queued_block_is_dispatched_in_order(monkeypatch):
+    first_block = 10
+    events = [MockEvent(first_block + 3), MockEvent(first_block + 1), MockEvent(first_block)]
+    raiden, applied = make_raiden_service(monkeypatch, events)
+
+    alarm = raiden.alarm
+    alarm.register_callback(raiden._callback_new_block)  # pylint: disable=protected-access
+    alarm.last_block_number = first_block + 3
+
+    dispatcher = gevent.spawn(raiden._dispatch_blocks)  # pylint: disable=protected-access
+
+    # Four blocks were detected by a single poll of the alarm task
+    now = time.time()
+    for block_number in range(first_block, first_block + 4):
+        alarm.block_queue.put((block_number, now))
+    alarm.process_pending_blocks()
+
+    raiden.block_dispatch_queue.put(None)
+    dispatcher.get(timeout=5)
+
+    assert [block for block, _ in applied if isinstance(block, Block)] == [
+        Block(block_number)
+        for block_number in range(first_block, first_block + 4)
+    ]
+
+    # The filters are polled once, and every event is applied with its own
+    # block before the Block state change of that block
+    assert raiden.blockchain_events.polls == 1
+    assert applied == [
+        (events[2], first_block),
+        (Block(first_block), first_block),
+        (events[1], first_block + 1),
+        (Block(first_block + 1), first_block + 1),
+        (Block(first_block + 2), first_block + 2),
+        (events[0], first_block + 3),
+        (Block(first_block + 3), first_block + 3),
+    ]
+    assert raiden.chain.client.transaction_manager.blocks == list(
+        range(first_block, first_block + 4),
+    )
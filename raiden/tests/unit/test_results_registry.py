@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import tracemalloc
+
+from gevent.event import AsyncResult
+
+from raiden.utils.results_registry import ResultsRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_results_registry_expires_entries():
+    clock = Clock()
+    expired = list()
+    registry = ResultsRegistry(
+        10,
+        100,
+        on_expire=lambda key, value: expired.append(key),
+        time_function=clock,
+    )
+
+    registry['a'] = 1
+    clock.now = 5
+    registry['b'] = 2
+    clock.now = 8
+    registry.touch('a')
+
+    clock.now = 16
+    registry.expire()
+    assert 'a' in registry
+    assert 'b' not in registry
+    assert expired == ['b']
+
+    clock.now = 19
+    registry['c'] = 3
+    assert expired == ['b', 'a']
+    assert registry.metrics() == {'size': 1, 'max_size_seen': 2, 'expired': 2, 'evicted': 0}
+
+
+def test_results_registry_evicts_the_least_recently_touched():
+    registry = ResultsRegistry(10, 2, time_function=Clock())
+
+    registry['a'] = 1
+    registry['b'] = 2
+    registry.touch('a')
+    registry['c'] = 3
+
+    assert 'a' in registry
+    assert 'b' not in registry
+    assert registry.evicted == 1
+
+
+def test_results_registry_soak():
+    """ Unacknowledged results must not grow the memory of a long running
+    node.
+    """
+    clock = Clock()
+    registry = ResultsRegistry(60, 1000, time_function=clock)
+
+    def run_rounds(rounds):
+        for _ in range(rounds):
+            clock.now += 1
+
+            for message_id in range(clock.now * 100, clock.now * 100 + 100):
+                registry[message_id] = AsyncResult()
+
+            # Most of the messages are acknowledged
+            for message_id in range(clock.now * 100, clock.now * 100 + 90):
+                registry.pop(message_id).set()
+
+    tracemalloc.start()
+    try:
+        # Warm up until the registry reaches its steady state
+        run_rounds(100)
+
+        before, _ = tracemalloc.get_traced_memory()
+        run_rounds(1000)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(registry) == 600
+    assert registry.max_size_seen < registry.max_size
+    assert after - before < 64 * 1024
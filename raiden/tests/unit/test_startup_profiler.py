@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import builtins
+import io
+import subprocess
+import sys
+
+from raiden.utils.profiling.startup import StartupProfiler
+
+
+def test_startup_profiler_reports_imports_and_phases():
+    original_import = builtins.__import__
+    profiler = StartupProfiler()
+    profiler.start()
+
+    sys.modules.pop('colorsys', None)
+    import colorsys  # noqa: F401 pylint: disable=unused-variable
+    profiler.phase('imports')
+
+    stream = io.StringIO()
+    profiler.report(stream)
+
+    assert builtins.__import__ is original_import
+    assert 'colorsys' in profiler.imports
+    assert [name for name, _ in profiler.phases] == ['imports']
+
+    report = stream.getvalue()
+    assert 'imports' in report
+    assert 'colorsys' in report
+
+
+def test_cli_does_not_import_the_subsystems():
+    """ The transports, the REST API and web3 are only imported by the
+    commands which need them.
+    """
+    code = (
+        'import sys, raiden.ui.cli;'
+        'print(" ".join(sys.modules))'
+    )
+    output = subprocess.check_output([sys.executable, '-c', code])
+    modules = output.decode().split()
+
+    for module in ('flask', 'matrix_client', 'web3', 'raiden.api.rest'):
+        assert module not in modules
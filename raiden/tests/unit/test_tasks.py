@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from raiden.tasks import MAX_SLEEP_FRACTION, AlarmTask
+
+
+class MockChain:
+    def __init__(self, block_number=0):
+        self.current_block = block_number
+
+    def block_number(self):
+        return self.current_block
+
+    def block_timestamp(self, block_number):
+        return block_number * 15
+
+
+def test_alarm_polls_faster_as_the_block_is_due():
+    alarm = AlarmTask(MockChain())
+    alarm.block_time = 15
+    alarm.last_block_time = 100
+
+    # a block may arrive early, the sleep is limited to a fraction of the
+    # block time
+    assert alarm.next_sleep_time(101) == 15 * MAX_SLEEP_FRACTION
+    assert alarm.next_sleep_time(113) == 1
+
+    # the block is due, poll at the `wait_time` rate
+    assert alarm.next_sleep_time(115) == alarm.wait_time
+    assert alarm.next_sleep_time(130) == alarm.wait_time
+
+
+def test_alarm_block_time_estimate():
+    alarm = AlarmTask(MockChain())
+    alarm.block_time = 15
+    alarm.last_block_timestamp = 100
+
+    alarm.update_block_time(1, 105)
+    assert alarm.last_block_timestamp == 105
+    assert 5 < alarm.block_time < 15
+
+    # multiple blocks mined during a single poll interval
+    block_time = alarm.block_time
+    alarm.update_block_time(4, 109)
+    assert alarm.block_time < block_time
+    assert alarm.block_time >= alarm.wait_time
+
+    # the estimate is not biased by the polling, the blocks may have
+    # timestamps closer than the poll interval
+    for timestamp in range(110, 130):
+        alarm.update_block_time(1, timestamp)
+    assert alarm.block_time < 2
+
+    # a missing timestamp doesn't change the estimate
+    block_time = alarm.block_time
+    alarm.update_block_time(1, None)
+    assert alarm.block_time == block_time
+
+
+def test_alarm_poll_for_new_block():
+    chain = MockChain(block_number=10)
+    alarm = AlarmTask(chain)
+    alarm.last_block_number = 10
+
+    blocks = list()
+    alarm.register_callback(blocks.append)
+
+    alarm.poll_for_new_block()
+    assert blocks == []
+
+    chain.current_block = 11
+    alarm.poll_for_new_block()
+    assert blocks == [11]
+    assert alarm.last_block_time is not None
+
+
+def test_alarm_processes_missed_blocks_in_order():
+    chain = MockChain(block_number=10)
+    alarm = AlarmTask(chain)
+    alarm.last_block_number = 10
+
+    blocks = list()
+    alarm.register_callback(blocks.append)
+
+    chain.current_block = 14
+    alarm.poll_for_new_block()
+    assert blocks == [11, 12, 13, 14]
+    assert alarm.processed_block_number == 14
+    assert alarm.metrics['callbacks'].processed_blocks == 4
+    assert alarm.metrics['callbacks'].last_block_number == 14
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+import gevent
+import pytest
+
+from raiden.network.rpc.transaction_manager import TransactionManager
+from raiden.utils import sha3
+
+
+class MockEth:
+    def __init__(self):
+        self.transaction_count = 7
+        self.blockNumber = 10
+        self.blocks = dict()
+        self.transactions = dict()
+        self.calls = list()
+        self.get_block_errors = 0
+
+    def getTransactionCount(self, address, block_identifier):  # pylint: disable=unused-argument
+        self.calls.append('getTransactionCount')
+        return self.transaction_count
+
+    def getBlock(self, number):
+        self.calls.append('getBlock')
+        if self.get_block_errors:
+            self.get_block_errors -= 1
+            raise ConnectionError('node unavailable')
+        if number > self.blockNumber:
+            return None
+        return self.blocks.get(number, {'transactions': []})
+
+    def getTransactionReceipt(self, transaction_hash):
+        self.calls.append('getTransactionReceipt')
+        transaction = self.transactions.get(transaction_hash)
+        if transaction is None or transaction['blockNumber'] is None:
+            return None
+        return {'blockNumber': transaction['blockNumber'], 'status': 1}
+
+    def getTransaction(self, transaction_hash):
+        self.calls.append('getTransaction')
+        return self.transactions.get(transaction_hash)
+
+    def mine(self, *transaction_hashes):
+        self.blockNumber += 1
+        self.blocks[self.blockNumber] = {'transactions': list(transaction_hashes)}
+        for transaction_hash in transaction_hashes:
+            self.transactions['0x' + transaction_hash.hex()] = {
+                'blockNumber': self.blockNumber,
+            }
+
+
+class MockWeb3:
+    def __init__(self):
+        self.eth = MockEth()
+
+
+class MockClient:
+    def __init__(self):
+        self.web3 = MockWeb3()
+        self.sender = b'\x01' * 20
+        self.gasprice_calls = 0
+
+    def block_number(self):
+        return self.web3.eth.blockNumber
+
+    def _gasprice(self):
+        self.gasprice_calls += 1
+        return 1
+
+    def _gaslimit(self):
+        return 100
+
+
+@pytest.fixture
+def manager():
+    return TransactionManager(MockClient(), sweep_interval=0.001)
+
+
+def test_nonces_are_handed_out_locally(manager):
+    nonces = [manager.reserve_nonce() for _ in range(5)]
+    assert nonces == [7, 8, 9, 10, 11]
+
+    calls = manager.client.web3.eth.calls
+    assert calls.count('getTransactionCount') == 1
+
+
+def test_released_nonces_are_reused(manager):
+    first = manager.reserve_nonce()
+    second = manager.reserve_nonce()
+    third = manager.reserve_nonce()
+
+    manager.release_nonce(second)
+    assert manager.reserve_nonce() == second
+
+    manager.release_nonce(third)
+    manager.release_nonce(second)
+    assert manager.reserve_nonce() == second
+    assert manager.reserve_nonce() == third
+
+    manager.sent(sha3(b'first'), first)
+    assert manager.reserve_nonce() == third + 1
+
+
+def test_nonce_of_an_unanswered_transaction_is_not_reused(manager):
+    eth = manager.client.web3.eth
+
+    # The request timed out after the node accepted the transaction
+    nonce = manager.reserve_nonce()
+    manager.send_failed(nonce)
+    eth.transaction_count = nonce + 1
+
+    assert manager.reserve_nonce() == nonce + 1
+    assert eth.calls.count('getTransactionCount') == 2
+
+
+def test_nonce_of_an_unanswered_transaction_fills_the_gap(manager):
+    first = manager.reserve_nonce()
+    second = manager.reserve_nonce()
+    manager.sent(sha3(b'second'), second)
+
+    # The node never received the first transaction
+    manager.send_failed(first)
+    assert manager.reserve_nonce() == first
+
+
+def test_used_nonce_is_dropped(manager):
+    eth = manager.client.web3.eth
+    first = manager.reserve_nonce()
+    second = manager.reserve_nonce()
+    manager.sent(sha3(b'second'), second)
+    manager.release_nonce(first)
+
+    # Another sender of the account used the released nonce
+    eth.transaction_count = second + 1
+    assert manager.reserve_nonce() == first
+    manager.rejected(first, ValueError({'code': -32000, 'message': 'nonce too low'}))
+
+    assert manager.reserve_nonce() == second + 1
+    assert not manager.released_nonces
+
+    # Any other error means the nonce was not used
+    third = manager.reserve_nonce()
+    manager.rejected(third, ValueError({'code': -32000, 'message': 'insufficient funds'}))
+    assert manager.reserve_nonce() == third
+
+
+def test_pending_transactions_are_swept_together(manager):
+    eth = manager.client.web3.eth
+    hashes = [sha3(bytes([i])) for i in range(3)]
+
+    futures = [
+        manager.sent(transaction_hash, manager.reserve_nonce())
+        for transaction_hash in hashes
+    ]
+
+    manager.new_block(eth.blockNumber)
+    manager.sweep()
+    assert not any(future.ready() for future in futures)
+
+    eth.mine(*hashes)
+    manager.new_block(eth.blockNumber)
+    manager.sweep()
+
+    assert all(future.ready() for future in futures)
+    assert eth.calls.count('getBlock') == 2
+    assert eth.calls.count('getTransaction') == 0
+
+    # The receipt fetched by the sweep is reused
+    receipt_calls = eth.calls.count('getTransactionReceipt')
+    assert manager.receipt(hashes[0])['status'] == 1
+    assert eth.calls.count('getTransactionReceipt') == receipt_calls
+
+
+def test_confirmations(manager):
+    eth = manager.client.web3.eth
+    transaction_hash = sha3(b'tx')
+
+    manager.sent(transaction_hash, manager.reserve_nonce())
+    eth.mine(transaction_hash)
+    confirmed = manager.mined(transaction_hash, confirmations=2)
+
+    for _ in range(2):
+        manager.new_block(eth.blockNumber)
+        manager.sweep()
+        assert not confirmed.ready()
+        eth.mine()
+
+    manager.new_block(eth.blockNumber)
+    manager.sweep()
+    assert confirmed.ready()
+
+
+def test_sweeper_resolves_futures(manager):
+    eth = manager.client.web3.eth
+    transaction_hash = sha3(b'tx')
+
+    mined = manager.sent(transaction_hash, manager.reserve_nonce())
+    gevent.sleep(0.01)
+    eth.mine(transaction_hash)
+
+    assert mined.get(timeout=1)['blockNumber'] == eth.blockNumber
+    manager.sweeper.join(timeout=1)
+    assert not manager.pending
+
+
+def test_idle_blocks_are_not_scanned(manager):
+    eth = manager.client.web3.eth
+    transaction_hash = sha3(b'tx')
+
+    manager.new_block(eth.blockNumber)
+    manager.sent(transaction_hash, manager.reserve_nonce())
+    eth.mine(transaction_hash)
+    manager.new_block(eth.blockNumber)
+    manager.sweep()
+    assert not manager.pending
+
+    eth.blockNumber += 5000
+    manager.new_block(eth.blockNumber)
+    del eth.calls[:]
+
+    manager.sent(sha3(b'after idle'), manager.reserve_nonce())
+    manager.sweep()
+    assert eth.calls.count('getBlock') == 1
+
+
+def test_sweeper_retries_after_an_error(manager):
+    eth = manager.client.web3.eth
+    transaction_hash = sha3(b'tx')
+    eth.get_block_errors = 2
+
+    mined = manager.sent(transaction_hash, manager.reserve_nonce())
+    gevent.sleep(0.01)
+    assert not mined.ready()
+
+    eth.mine(transaction_hash)
+    assert mined.get(timeout=1)['blockNumber'] == eth.blockNumber
+
+
+def test_dropped_transaction(manager):
+    eth = manager.client.web3.eth
+    transaction_hash = sha3(b'dropped')
+
+    mined = manager.sent(transaction_hash, manager.reserve_nonce())
+
+    for _ in range(4):
+        manager.new_block(eth.blockNumber)
+        manager.sweep()
+        eth.mine()
+
+    with pytest.raises(Exception):
+        mined.get(timeout=0)
+
+
+def test_gas_price_is_cached_per_block(manager):
+    client = manager.client
+
+    manager.new_block(1)
+    assert manager.gas_price() == 1
+    assert manager.gas_price() == 1
+    assert client.gasprice_calls == 1
+
+    manager.new_block(2)
+    manager.gas_price()
+    assert client.gasprice_calls == 2
@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
-from raiden.network.throttle import TokenBucket
+from raiden.network.throttle import (
+    FairSharePolicy,
+    PRIORITY_ACK,
+    PRIORITY_MESSAGE,
+    PRIORITY_RETRY,
+    ThrottleMetrics,
+    TokenBucket,
+)
 
 
 def test_token_bucket():
@@ -21,3 +28,92 @@ def test_token_bucket():
 
     for num in range(1, 9):
         assert num * token_refill == bucket.consume(1)
+
+
+def test_fair_share_policy_per_peer_buckets():
+    # return constant time to have a predictable refill result
+    time = lambda: 1
+
+    policy = FairSharePolicy(
+        capacity=10,
+        fill_rate=10,
+        peer_capacity=2,
+        peer_fill_rate=2,
+        retry_reserve=0,
+        time_function=time,
+    )
+
+    assert policy.consume(1, 'dead') == 0
+    assert policy.consume(1, 'dead') == 0
+    assert policy.consume(1, 'dead') == 0.5
+
+    # The other peers are not affected by the retries to 'dead'
+    assert policy.consume(1, 'alive') == 0
+
+    # Acknowledgements are never delayed
+    for _ in range(10):
+        assert policy.consume(1, 'alive', PRIORITY_ACK) == 0
+
+    assert policy.consume(1, 'other') > 0
+
+
+def test_fair_share_policy_retry_reserve():
+    time = lambda: 1
+    policy = FairSharePolicy(
+        capacity=10,
+        fill_rate=10,
+        peer_capacity=10,
+        peer_fill_rate=10,
+        retry_reserve=5,
+        time_function=time,
+    )
+
+    for _ in range(5):
+        assert policy.consume(1, 'peer', PRIORITY_RETRY) == 0
+
+    assert policy.consume(1, 'peer', PRIORITY_RETRY) == 0.1
+    assert policy.consume(1, 'peer', PRIORITY_MESSAGE) == 0
+
+
+def test_fair_share_policy_adapts_the_peer_rate():
+    policy = FairSharePolicy(
+        capacity=100,
+        fill_rate=100,
+        peer_capacity=10,
+        peer_fill_rate=10,
+        peer_min_fill_rate=1,
+        peer_rate_increase=1,
+    )
+    bucket = policy.peer_bucket('peer')
+
+    policy.lost('peer')
+    assert bucket.fill_rate == 5
+
+    for _ in range(10):
+        policy.lost('peer')
+    assert bucket.fill_rate == 1
+
+    policy.delivered('peer', rtt=1)
+    assert bucket.fill_rate == 2
+    assert bucket.capacity == 10
+
+    for _ in range(200):
+        policy.delivered('peer', rtt=1)
+    assert bucket.fill_rate == 100
+    assert bucket.capacity == 100
+
+
+def test_throttle_metrics():
+    metrics = ThrottleMetrics()
+    metrics.record(PRIORITY_ACK, 0)
+    metrics.record(PRIORITY_RETRY, 0.5)
+    metrics.record(PRIORITY_RETRY, 0.25)
+
+    report = metrics.report()
+    assert report['ack'] == {'datagrams': 1, 'delayed': 0, 'total_delay': 0, 'max_delay': 0}
+    assert report['retry'] == {
+        'datagrams': 2,
+        'delayed': 2,
+        'total_delay': 0.75,
+        'max_delay': 0.5,
+    }
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+from copy import deepcopy
+
+import gevent
+import pytest
+from gevent.event import AsyncResult, Event
+
+from raiden.app import App
+from raiden.constants import UDP_MAX_MESSAGE_SIZE
+from raiden.encoding.messages import DIRECTTRANSFER, SECRETREQUEST
+from raiden.network.discovery import Discovery
+from raiden.messages import Delivered, DeliveredBatch, Ping
+from raiden.network.throttle import DummyPolicy
+from raiden.network.transport.delivered import DeliveredCoalescer
+from raiden.network.transport.udp import udp_framing
+from raiden.network.transport.udp.healthcheck import HealthCheckScheduler
+from raiden.network.transport.udp.udp_transport import UDPTransport, single_queue_send
+from raiden.network.transport.verifier import SignatureVerifier
+from raiden.tests.utils.factories import make_address, make_privkey_address
+from raiden.tests.utils.messages import make_direct_transfer
+from raiden.transfer import views
+from raiden.transfer.state import NODE_NETWORK_REACHABLE, NODE_NETWORK_UNREACHABLE
+from raiden.utils.notifying_queue import NotifyingQueue
+
+PRIVKEY, ADDRESS = make_privkey_address()
+
+
+class MockServer:
+    def __init__(self):
+        self.socket = self
+        self.datagrams = list()
+
+    def sendto(self, datagram, host_port):
+        self.datagrams.append((datagram, host_port))
+
+
+class MockTransport:
+    def __init__(self):
+        self.sent = list()
+        self.messageids_to_asyncresults = dict()
+
+    def maybe_sendraw_with_result(self, recipient, messagedata, message_id):
+        self.sent.append(message_id)
+        return self.messageids_to_asyncresults.setdefault(message_id, AsyncResult())
+
+    def acknowledge(self, message_id):
+        self.messageids_to_asyncresults.pop(message_id).set()
+
+
+def balance_proof(message_id):
+    return (bytes([DIRECTTRANSFER]), message_id)
+
+
+def secret_request(message_id):
+    return (bytes([SECRETREQUEST]), message_id)
+
+
+def spawn_sender(transport, queue, window_size):
+    event_stop = Event()
+    event_healthy = Event()
+    event_healthy.set()
+
+    greenlet = gevent.spawn(
+        single_queue_send,
+        transport,
+        make_address(),
+        queue,
+        event_stop,
+        event_healthy,
+        Event(),
+        5,
+        10,
+        100,
+        window_size,
+    )
+    return greenlet, event_stop
+
+
+def test_single_queue_send_pipelines_balance_proofs():
+    transport = MockTransport()
+    queue = NotifyingQueue(items=[balance_proof(identifier) for identifier in range(5)])
+    greenlet, event_stop = spawn_sender(transport, queue, window_size=3)
+
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1, 2]
+
+    # Any acknowledgement opens the window
+    transport.acknowledge(1)
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1, 2, 3]
+
+    queue.put(balance_proof(5))
+    transport.acknowledge(0)
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1, 2, 3, 4]
+
+    event_stop.set()
+    greenlet.get(timeout=1)
+
+
+def test_single_queue_send_sends_other_messages_alone():
+    transport = MockTransport()
+    queue = NotifyingQueue(items=[
+        balance_proof(0),
+        balance_proof(1),
+        secret_request(2),
+        balance_proof(3),
+    ])
+    greenlet, event_stop = spawn_sender(transport, queue, window_size=8)
+
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1]
+
+    transport.acknowledge(0)
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1]
+
+    transport.acknowledge(1)
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1, 2]
+
+    transport.acknowledge(2)
+    gevent.sleep(0.01)
+    assert transport.sent == [0, 1, 2, 3]
+
+    event_stop.set()
+    greenlet.get(timeout=1)
+
+
+def test_receive_message_restores_the_nonce_order():
+    config = deepcopy(App.DEFAULT_CONFIG['transport'])
+    transport = UDPTransport(Discovery(), ('127.0.0.1', 0), DummyPolicy(), config)
+
+    processed = list()
+    transport.process_message = lambda message: processed.append(message.nonce)
+    transport.get_expected_nonce = lambda message: len(processed) + 1
+
+    messages = dict()
+    for nonce in range(1, 5):
+        message = make_direct_transfer(nonce=nonce)
+        message.sign(PRIVKEY, ADDRESS)
+        messages[nonce] = message
+
+    for nonce in (3, 2, 4):
+        transport.receive_message(messages[nonce])
+    assert processed == []
+
+    transport.receive_message(messages[1])
+    assert processed == [1, 2, 3, 4]
+    assert not transport.channels_to_pending_messages
+
+
+def test_pack_messages():
+    messages = [b'\x01' * 10, b'\x02' * 200, b'\x03']
+    datagram = udp_framing.pack_messages(messages)
+
+    assert udp_framing.is_packed(datagram)
+    assert len(datagram) == udp_framing.packed_size(messages)
+    assert udp_framing.unpack_messages(datagram) == messages
+
+    with pytest.raises(ValueError):
+        udp_framing.unpack_messages(datagram[:-1])
+
+    with pytest.raises(ValueError):
+        udp_framing.unpack_messages(udp_framing.pack_messages([datagram]))
+
+
+def test_maybe_sendraw_packs_messages():
+    config = deepcopy(App.DEFAULT_CONFIG['transport'])
+    config['packing_window'] = 0.01
+    transport = UDPTransport(Discovery(), ('127.0.0.1', 0), DummyPolicy(), config)
+    transport.server = MockServer()
+
+    host_port = ('127.0.0.1', 1)
+    small = [bytes([identifier]) * 100 for identifier in range(3)]
+    for messagedata in small:
+        transport.maybe_sendraw(host_port, messagedata)
+
+    assert transport.server.datagrams == []
+    gevent.sleep(0.05)
+    assert transport.server.datagrams == [(udp_framing.pack_messages(small), host_port)]
+
+    # A full datagram is sent right away
+    large = [bytes([identifier]) * (UDP_MAX_MESSAGE_SIZE // 2) for identifier in range(2)]
+    for messagedata in large:
+        transport.maybe_sendraw(host_port, messagedata)
+
+    assert transport.server.datagrams[1:] == [(large[0], host_port)]
+    gevent.sleep(0.05)
+    assert transport.server.datagrams[2:] == [(large[1], host_port)]
+
+
+def test_delivered_coalescer():
+    sent = list()
+    coalescer = DeliveredCoalescer(
+        lambda message: message.sign(PRIVKEY, ADDRESS),
+        lambda recipient, message: sent.append((recipient, message)),
+        0.01,
+    )
+    partner1, partner2 = make_address(), make_address()
+
+    coalescer.delivered(partner1, 1)
+    coalescer.delivered(partner1, 2)
+    coalescer.delivered(partner2, 3)
+    assert sent == []
+
+    gevent.sleep(0.05)
+    messages = dict(sent)
+    assert isinstance(messages[partner1], DeliveredBatch)
+    assert messages[partner1].delivered_message_identifiers == [1, 2]
+    assert isinstance(messages[partner2], Delivered)
+    assert messages[partner2].delivered_message_identifier == 3
+
+
+class MockHealthTransport:
+    def __init__(self):
+        self.raiden = self
+        self.address = ADDRESS
+        self.pings = list()
+        self.sent = list()
+        self.network_states = list()
+        self.messageids_to_asyncresults = dict()
+        self.unavailable = set()
+
+    def get_host_port(self, recipient):
+        if recipient in self.unavailable:
+            raise ConnectionError('ethereum node unavailable')
+        return ('127.0.0.1', 1)
+
+    def get_ping(self, nonce):
+        self.pings.append(nonce)
+        return nonce
+
+    def maybe_sendraw_with_result(self, recipient, messagedata, message_id, priority):
+        self.sent.append((recipient, message_id))
+        return self.messageids_to_asyncresults.setdefault(message_id, AsyncResult())
+
+    def set_node_network_state(self, node_address, node_state):
+        self.network_states.append((node_address, node_state))
+
+
+def test_healthcheck_scheduler():
+    transport = MockHealthTransport()
+    scheduler = HealthCheckScheduler(transport, Event(), 2, 10, 30, time_function=lambda: 0)
+    partner1, partner2 = make_address(), make_address()
+
+    events1 = scheduler.start_health_check(partner1)
+    scheduler.start_health_check(partner2)
+    scheduler.check_due(0)
+    assert events1.event_healthy.is_set()
+
+    # The first pings are spread over a fraction of the interval
+    scheduler.check_due(1)
+
+    # A single signed Ping is sent to both peers
+    assert transport.pings == [1]
+    assert sorted(transport.sent) == sorted([
+        (partner1, ('ping', 1, partner1)),
+        (partner2, ('ping', 1, partner2)),
+    ])
+
+    scheduler.time_function = lambda: 2
+    scheduler.pong_received(partner1, 1)
+    scheduler.pong_received(partner2, 1)
+    assert (partner1, NODE_NETWORK_REACHABLE) in transport.network_states
+    assert not transport.messageids_to_asyncresults
+
+    # A peer which was heard from recently is not pinged, the other peer
+    # already answered the nonce 1 so a new Ping is signed
+    scheduler.time_function = lambda: 8
+    scheduler.heard_from(partner2)
+    scheduler.check_due(12)
+    assert transport.pings == [1, 2]
+    assert transport.sent[2:] == [(partner1, ('ping', 2, partner1))]
+
+    # Without a Pong the peer becomes unreachable after the retries
+    scheduler.check_due(22)
+    scheduler.check_due(32)
+    assert transport.network_states[-1] == (partner1, NODE_NETWORK_UNREACHABLE)
+    assert events1.event_unhealthy.is_set()
+    assert transport.pings == [1, 2]
+
+
+def test_healthcheck_scheduler_survives_a_failed_check():
+    transport = MockHealthTransport()
+    scheduler = HealthCheckScheduler(transport, Event(), 2, 10, 30, time_function=lambda: 0)
+    partner1, partner2 = make_address(), make_address()
+    transport.unavailable.add(partner1)
+
+    events1 = scheduler.start_health_check(partner1)
+    events2 = scheduler.start_health_check(partner2)
+    scheduler.check_due(0)
+
+    # The failure is isolated to the peer, which is checked again later
+    assert events2.event_healthy.is_set()
+    assert not events1.event_healthy.is_set()
+
+    transport.unavailable.clear()
+    scheduler.check_due(10)
+    assert events1.event_healthy.is_set()
+
+
+class MockRaiden:
+    def __init__(self):
+        self.address = ADDRESS
+
+
+def test_receive_drops_invalid_and_duplicate_messages(monkeypatch):
+    config = deepcopy(App.DEFAULT_CONFIG['transport'])
+    transport = UDPTransport(Discovery(), ('127.0.0.1', 0), DummyPolicy(), config)
+    transport.raiden = MockRaiden()
+
+    pings = list()
+    transport.receive_ping = pings.append
+
+    ping = Ping(nonce=1)
+    ping.sign(PRIVKEY, ADDRESS)
+    pingdata = ping.encode()
+
+    transport.receive(pingdata)
+    transport.receive(udp_framing.pack_messages([pingdata, pingdata]))
+    assert len(pings) == 3
+    assert transport.receive_metrics['processed'] == 1
+    assert transport.receive_metrics['duplicate'] == 2
+
+    transport.receive(b'\xfe' + pingdata[1:])
+    transport.receive(pingdata[:-1])
+    assert transport.receive_metrics['unknown_cmdid'] == 1
+    assert transport.receive_metrics['invalid_size'] == 1
+
+    # A balance proof for an unknown channel is dropped before its signature
+    # is checked
+    monkeypatch.setattr(views, 'state_from_raiden', lambda raiden: None)
+    monkeypatch.setattr(
+        views,
+        'get_channelstate_by_token_network_identifier',
+        lambda node_state, token_network_id, channel_id: None,
+    )
+    direct_transfer = make_direct_transfer()
+    direct_transfer.sign(PRIVKEY, ADDRESS)
+    transport.receive(direct_transfer.encode())
+    assert transport.receive_metrics['unknown_channel'] == 1
+    assert transport.receive_metrics['processed'] == 1
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_signature_verifier_keeps_the_order(workers):
+    verifier = SignatureVerifier(workers)
+
+    def encoded_pings(nonces):
+        pings = list()
+        for nonce in nonces:
+            ping = Ping(nonce=nonce)
+            ping.sign(PRIVKEY, ADDRESS)
+            pings.append(ping.encode())
+        return pings
+
+    returned = list()
+
+    def decode_batch(batch):
+        messages = verifier.decode_batch(batch)
+        returned.append([message.nonce for message in messages])
+
+    # The larger batch is submitted first and must be returned first
+    greenlets = [
+        gevent.spawn(decode_batch, encoded_pings(range(50))),
+        gevent.spawn(decode_batch, encoded_pings([50])),
+        gevent.spawn(decode_batch, encoded_pings([51, 52])),
+    ]
+    gevent.joinall(greenlets, raise_error=True)
+
+    assert returned == [list(range(50)), [50], [51, 52]]
+
+    invalid = bytearray(encoded_pings([53])[0])
+    invalid[-1] = 0
+    assert verifier.decode_batch([bytes(invalid)]) == [None]
+
+    verifier.stop()
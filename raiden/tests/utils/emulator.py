@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+""" An in-process network to exchange the datagrams of the UDP transports. """
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+
+import gevent
+from gevent.event import Event
+
+from raiden.utils import typing
+
+
+class LinkProfile:
+    """ The conditions of the link from a node to another.
+
+    Args:
+        latency: One-way delay of every datagram in seconds.
+        jitter: Maximum random delay added to the latency, datagrams with
+            different delays may arrive out of order.
+        loss: Probability of a datagram being lost.
+        reorder: Probability of a datagram being held back by
+            `reorder_delay`, so the datagrams sent after it overtake it.
+        reorder_delay: Extra delay of a reordered datagram.
+        bandwidth: Bytes per second of the link, datagrams wait for the
+            previous ones to be transmitted. None for an unlimited link.
+    """
+
+    def __init__(
+            self,
+            latency: float = 0,
+            jitter: float = 0,
+            loss: float = 0,
+            reorder: float = 0,
+            reorder_delay: float = 0.01,
+            bandwidth: float = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay
+        self.bandwidth = bandwidth
+
+
+class NetworkEmulator:
+    """ Delivers datagrams among the servers of the same process.
+
+    Every link between two servers has the conditions of `default_link`
+    unless it's changed with `set_link`. Servers in different groups of a
+    `partition` can't reach each other until the partition is healed.
+
+    The random decisions are taken from a generator seeded with `seed`, so a
+    run sending the same datagrams in the same order loses, delays and
+    reorders the same datagrams. The datagrams in flight are delivered by a
+    single greenlet in the order of their delivery time, which is computed
+    from `time_function` when the datagram is sent, so the order doesn't
+    depend on the time kept by the gevent loop. The datagrams sent in the same
+    iteration of the loop share the send time, their order depends only on
+    their delays and on the order they were sent.
+
+    Args:
+        default_link: The conditions of the links without a profile.
+        seed: Seed of the random decisions.
+        time_function: Returns the current time, defaults to
+            `time.monotonic`.
+    """
+
+    def __init__(
+            self,
+            default_link: LinkProfile = None,
+            seed: int = 0,
+            time_function: typing.Callable = None,
+    ):
+        self.default_link = default_link or LinkProfile()
+        self.random = random.Random(seed)
+        self.time_function = time_function or time.monotonic
+
+        self.hostport_to_server = dict()
+        self.links_to_profiles = dict()
+        #: Time at which each link finishes transmitting its last datagram
+        self.links_to_busy_until = dict()
+        self.hostport_to_group = dict()
+
+        #: Heap of the datagrams in flight, ordered by delivery time and by
+        #: the order they were sent
+        self.in_flight = list()
+        self.sequence = itertools.count()
+        self.current_send_time = None
+        self.datagram_sent = Event()
+        self.deliverer = None
+
+        self.metrics = Counter()
+
+    @property
+    def datagrams(self) -> int:
+        return self.metrics['sent']
+
+    def datagram_server(self, host_port: typing.Tuple[str, int]) -> 'EmulatedDatagramServer':
+        """ Return a replacement for the DatagramServer of a transport. """
+        return EmulatedDatagramServer(self, host_port)
+
+    def set_link(self, source, target, profile: LinkProfile, symmetric: bool = True):
+        """ Change the conditions of the link from `source` to `target`, and
+        of the way back if `symmetric`.
+        """
+        self.links_to_profiles[(source, target)] = profile
+
+        if symmetric:
+            self.links_to_profiles[(target, source)] = profile
+
+    def link_profile(self, source, target) -> LinkProfile:
+        return self.links_to_profiles.get((source, target), self.default_link)
+
+    def partition(self, *groups):
+        """ Split the network, the servers of a group can only reach the
+        servers of the same group. Servers which are not in a group can reach
+        everyone.
+        """
+        self.hostport_to_group = {
+            host_port: position
+            for position, group in enumerate(groups)
+            for host_port in group
+        }
+
+    def heal(self):
+        self.hostport_to_group = dict()
+
+    def is_partitioned(self, source, target) -> bool:
+        source_group = self.hostport_to_group.get(source)
+        target_group = self.hostport_to_group.get(target)
+
+        return (
+            source_group is not None and
+            target_group is not None and
+            source_group != target_group
+        )
+
+    def sendto(self, source, target, data: bytes):
+        """ Send the datagram `data` from `source` to `target`. """
+        self.metrics['sent'] += 1
+        self.metrics['bytes_sent'] += len(data)
+
+        if self.is_partitioned(source, target):
+            self.metrics['partitioned'] += 1
+            return
+
+        profile = self.link_profile(source, target)
+
+        if profile.loss and self.random.random() < profile.loss:
+            self.metrics['lost'] += 1
+            return
+
+        delay = profile.latency
+
+        if profile.jitter:
+            delay += self.random.uniform(0, profile.jitter)
+
+        if profile.reorder and self.random.random() < profile.reorder:
+            self.metrics['reordered'] += 1
+            delay += profile.reorder_delay
+
+        now = self.send_time()
+
+        if profile.bandwidth:
+            link = (source, target)
+
+            start = max(now, self.links_to_busy_until.get(link, now))
+            transmitted = start + len(data) / profile.bandwidth
+            self.links_to_busy_until[link] = transmitted
+
+            delay += transmitted - now
+
+        # The sender may reuse its buffer, the datagram is copied as it
+        # would be by the socket
+        heapq.heappush(
+            self.in_flight,
+            (now + delay, next(self.sequence), source, target, bytes(data)),
+        )
+        self.datagram_sent.set()
+
+        if self.deliverer is None or self.deliverer.dead:
+            self.deliverer = gevent.spawn(self._deliver_in_flight)
+
+    def send_time(self) -> float:
+        """ Return the time the datagrams of the current iteration of the
+        gevent loop are sent.
+        """
+        if self.current_send_time is None:
+            self.current_send_time = self.time_function()
+            gevent.get_hub().loop.run_callback(self._clear_send_time)
+
+        return self.current_send_time
+
+    def _clear_send_time(self):
+        self.current_send_time = None
+
+    def _deliver_in_flight(self):
+        while True:
+            now = self.time_function()
+            while self.in_flight and self.in_flight[0][0] <= now:
+                _, _, source, target, data = heapq.heappop(self.in_flight)
+                self.deliver(source, target, data)
+
+            self.datagram_sent.clear()
+
+            timeout = None
+            if self.in_flight:
+                timeout = max(self.in_flight[0][0] - self.time_function(), 0)
+
+            # Woken up early if a datagram is sent with a shorter delay
+            self.datagram_sent.wait(timeout)
+
+    def deliver(self, source, target, data: bytes):
+        server = self.hostport_to_server.get(target)
+
+        # datagrams to stopped servers are lost, the partition is checked
+        # again since it may have started while the datagram was in flight
+        if server is None or server.handle is None or self.is_partitioned(source, target):
+            self.metrics['undelivered'] += 1
+            return
+
+        self.metrics['delivered'] += 1
+
+        # The handlers run in their own greenlets, as with a DatagramServer,
+        # in the order the datagrams are delivered
+        gevent.spawn(server.handle, data, source)
+
+
+class EmulatedDatagramServer:
+    """ Replacement for the gevent DatagramServer used by the UDPTransport,
+    the datagrams are exchanged through a NetworkEmulator.
+    """
+
+    def __init__(self, network: NetworkEmulator, host_port: typing.Tuple[str, int]):
+        self.network = network
+        self.address = host_port
+        self.handle = None
+
+    def set_handle(self, handle):
+        self.handle = handle
+
+    def start(self):
+        # The transport only sends while the server has a socket
+        self.socket = self
+        self._socket = self
+        self.network.hostport_to_server[self.address] = self
+
+    def stop_accepting(self):
+        self.network.hostport_to_server.pop(self.address, None)
+
+    def stop(self):
+        self.stop_accepting()
+        if hasattr(self, 'socket'):
+            del self.socket
+
+    def close(self):
+        pass
+
+    def sendto(self, data, host_port):
+        self.network.sendto(self.address, host_port, data)
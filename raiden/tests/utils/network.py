@@ -11,6 +11,16 @@ from raiden.app import App
 from raiden.network.matrixtransport import MatrixTransport
 from raiden.network.transport.udp.udp_transport import UDPTransport
 from raiden.network.throttle import TokenBucket
+from raiden.settings import (
+    DEFAULT_TRANSPORT_DELIVERED_DELAY,
+    DEFAULT_TRANSPORT_PACKING_WINDOW,
+    DEFAULT_TRANSPORT_RECENT_MESSAGES_SIZE,
+    DEFAULT_TRANSPORT_RECENT_MESSAGES_TTL,
+    DEFAULT_TRANSPORT_RESULTS_MAX_SIZE,
+    DEFAULT_TRANSPORT_RESULTS_TTL,
+    DEFAULT_TRANSPORT_VERIFIER_WORKERS,
+    DEFAULT_TRANSPORT_WINDOW_SIZE,
+)
 from raiden.utils import privatekey_to_address
 
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
@@ -214,8 +224,13 @@ def create_apps(
         nat_keepalive_retries,
         nat_keepalive_timeout,
         local_matrix_url=None,
+        network_emulator=None,
 ):
-    """ Create the apps."""
+    """ Create the apps.
+
+    With a `network_emulator` the UDP transports exchange their datagrams
+    through it instead of sockets.
+    """
     # pylint: disable=too-many-locals
     services = zip(blockchain_services, endpoint_discovery_services)
 
@@ -246,6 +261,14 @@ def create_apps(
                 'nat_invitation_timeout': nat_invitation_timeout,
                 'nat_keepalive_retries': nat_keepalive_retries,
                 'nat_keepalive_timeout': nat_keepalive_timeout,
+                'window_size': DEFAULT_TRANSPORT_WINDOW_SIZE,
+                'packing_window': DEFAULT_TRANSPORT_PACKING_WINDOW,
+                'delivered_delay': DEFAULT_TRANSPORT_DELIVERED_DELAY,
+                'results_ttl': DEFAULT_TRANSPORT_RESULTS_TTL,
+                'results_max_size': DEFAULT_TRANSPORT_RESULTS_MAX_SIZE,
+                'recent_messages_ttl': DEFAULT_TRANSPORT_RECENT_MESSAGES_TTL,
+                'recent_messages_size': DEFAULT_TRANSPORT_RECENT_MESSAGES_SIZE,
+                'verifier_workers': DEFAULT_TRANSPORT_VERIFIER_WORKERS,
             },
             'rpc': True,
             'console': False,
@@ -280,12 +303,23 @@ def create_apps(
                 config['transport']['throttle_fill_rate'],
             )
 
-            transport = UDPTransport(
-                discovery,
-                server._udp_socket((host, port)),  # pylint: disable=protected-access
-                throttle_policy,
-                config['transport'],
-            )
+            if network_emulator is not None:
+                # The DatagramServer does not bind until started, it's
+                # replaced before that.
+                transport = UDPTransport(
+                    discovery,
+                    (host, port),
+                    throttle_policy,
+                    config['transport'],
+                )
+                transport.server = network_emulator.datagram_server((host, port))
+            else:
+                transport = UDPTransport(
+                    discovery,
+                    server._udp_socket((host, port)),  # pylint: disable=protected-access
+                    throttle_policy,
+                    config['transport'],
+                )
 
         app = App(
             config_copy,
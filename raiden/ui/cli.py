@@ -15,7 +15,6 @@ import click
 import gevent
 import gevent.monkey
 gevent.monkey.patch_all()
-import requests
 from eth_utils import (
     to_int,
     denoms,
@@ -24,23 +23,15 @@ from eth_utils import (
     to_canonical_address,
 )
 import structlog
-from requests.exceptions import RequestException
 
-from raiden.accounts import AccountManager
-from raiden.api.rest import APIServer, RestAPI
+# The REST API, the transports, web3 and the smoketest are imported by the
+# commands which use them, so that e.g. `raiden version` starts quickly
 from raiden.constants import (
     ID_TO_NETWORKNAME,
     ROPSTEN_DISCOVERY_ADDRESS,
     ROPSTEN_REGISTRY_ADDRESS,
 )
 from raiden.exceptions import EthNodeCommunicationError, ContractVersionMismatch
-from raiden.network.discovery import ContractDiscovery
-from raiden.network.matrixtransport import MatrixTransport
-from raiden.network.transport.udp.udp_transport import UDPTransport
-from raiden.network.rpc.client import JSONRPCClient
-from raiden.network.sockfactory import SocketFactory
-from raiden.network.throttle import TokenBucket
-from raiden.network.utils import get_free_port
 from raiden.settings import (
     DEFAULT_NAT_KEEPALIVE_RETRIES,
     ETHERSCAN_API,
@@ -53,12 +44,6 @@ from raiden.utils import (
     is_supported_client,
     split_endpoint,
 )
-from raiden.tests.utils.smoketest import (
-    load_smoketest_config,
-    start_ethereum,
-    run_smoketests,
-)
-
 from raiden.utils.cli import (
     ADDRESS_TYPE,
     command,
@@ -71,6 +56,11 @@ from raiden.utils.cli import (
     LOG_LEVEL_CONFIG_TYPE,
 )
 from raiden.log_config import configure_logging
+from raiden.utils.profiling.startup import (
+    report_startup,
+    start_startup_profiler,
+    startup_phase,
+)
 
 
 # ansi escape code for moving the cursor and clearing the line
@@ -114,6 +104,8 @@ def toggle_trace_profiler(raiden):
 
 
 def check_json_rpc(client):
+    import requests
+
     try:
         client_version = client.web3.version.node
     except (requests.exceptions.ConnectionError, EthNodeCommunicationError):
@@ -134,6 +126,8 @@ def check_json_rpc(client):
 
 
 def check_synced(blockchain_service):
+    from requests.exceptions import RequestException
+
     net_id = blockchain_service.network_id
     try:
         network = ID_TO_NETWORKNAME[net_id]
@@ -182,6 +176,9 @@ def check_discovery_registration_gas(blockchain_service, account_address):
 
 
 def etherscan_query_with_retries(url, sleep, retries=3):
+    import requests
+    from requests.exceptions import RequestException
+
     for _ in range(retries - 1):
         try:
             etherscan_block = to_int(hexstr=requests.get(url).json()['result'])
@@ -241,6 +238,8 @@ def wait_for_sync_rpc_api(blockchain_service, sleep):
 
 
 def wait_for_sync(blockchain_service, url, tolerance, sleep):
+    from requests.exceptions import RequestException
+
     # print something since the actual test may take a few moments for the first
     # iteration
     print('Checking if the ethereum node is synchronized')
@@ -461,6 +460,14 @@ def options(func):
                 is_flag=True,
             ),
         ),
+        option_group(
+            'Debugging Options',
+            option(
+                '--profile-startup',
+                help='Report the time spent importing and initializing the node, to stderr.',
+                is_flag=True,
+            ),
+        ),
         option_group(
             'RPC Options',
             option(
@@ -529,11 +536,13 @@ def app(
         transport,
         matrix_server,
         network_id,
+        profile_startup,
 ):
     # pylint: disable=too-many-locals,too-many-branches,too-many-statements,unused-argument
 
     from raiden.app import App
     from raiden.network.blockchain_service import BlockChainService
+    from raiden.network.rpc.client import JSONRPCClient
 
     if transport == 'udp' and not mapped_socket:
         raise RuntimeError('Missing socket')
@@ -621,6 +630,13 @@ def app(
 
     database_path = os.path.join(datadir, 'netid_%s' % net_id, address_hex[:8], 'log.db')
     config['database_path'] = database_path
+
+    # The contract versions and immutable properties are kept across
+    # restarts, next to the node's database
+    blockchain_service.metadata_cache.load(
+        os.path.join(os.path.dirname(database_path), 'contract_metadata.pickle'),
+        bytes(blockchain_service.client.web3.eth.getBlock(0)['hash']),
+    )
     print(
         'You are connected to the \'{}\' network and the DB path is: {}'.format(
             ID_TO_NETWORKNAME[net_id],
@@ -641,6 +657,10 @@ def app(
 
     discovery = None
     if transport == 'udp':
+        from raiden.network.discovery import ContractDiscovery
+        from raiden.network.throttle import FairSharePolicy
+        from raiden.network.transport.udp.udp_transport import UDPTransport
+
         check_discovery_registration_gas(blockchain_service, address)
         try:
             discovery = ContractDiscovery(
@@ -651,9 +671,11 @@ def app(
             print('Deployed discovery contract version mismatch. '
                   'Please update your Raiden installation.')
             sys.exit(1)
-        throttle_policy = TokenBucket(
+        throttle_policy = FairSharePolicy(
             config['transport']['throttle_capacity'],
             config['transport']['throttle_fill_rate'],
+            config['transport']['throttle_peer_capacity'],
+            config['transport']['throttle_peer_fill_rate'],
         )
 
         transport = UDPTransport(
@@ -663,6 +685,8 @@ def app(
             config['transport'],
         )
     elif transport == 'matrix':
+        from raiden.network.matrixtransport import MatrixTransport
+
         transport = MatrixTransport(config['matrix'])
     else:
         raise RuntimeError(f'Unknown transport type "{transport}" given')
@@ -679,6 +703,8 @@ def app(
 
 
 def prompt_account(address_hex, keystore_path, password_file):
+    from raiden.accounts import AccountManager
+
     accmgr = AccountManager(keystore_path)
     if not accmgr.accounts:
         raise RuntimeError('No Ethereum accounts found in the user\'s system')
@@ -754,6 +780,12 @@ def prompt_account(address_hex, keystore_path, password_file):
 def run(ctx, **kwargs):
     # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 
+    if kwargs['profile_startup']:
+        # Already started by `raiden.__main__` to include the imports, unless
+        # the option was given through the environment
+        start_startup_profiler()
+        ctx.call_on_close(report_startup)
+
     if ctx.invoked_subcommand is not None:
         # Pass parsed args on to subcommands.
         ctx.obj = kwargs
@@ -762,6 +794,8 @@ def run(ctx, **kwargs):
     print('Welcome to Raiden, version {}!'.format(get_system_spec()['raiden']))
     from raiden.ui.console import Console
     from raiden.api.python import RaidenAPI
+    from raiden.api.rest import APIServer, RestAPI
+    from raiden.network.sockfactory import SocketFactory
 
     configure_logging(
         kwargs['log_config'],
@@ -780,6 +814,8 @@ def run(ctx, **kwargs):
         except EthNodeCommunicationError:
             sys.exit(1)
 
+        startup_phase('app construction')
+
         domain_list = []
         if kwargs['rpccorsdomain']:
             if ',' in kwargs['rpccorsdomain']:
@@ -800,6 +836,7 @@ def run(ctx, **kwargs):
             )
             (api_host, api_port) = split_endpoint(kwargs['api_address'])
             api_server.start(api_host, api_port)
+            startup_phase('api server')
 
             print(
                 'The Raiden API RPC server is now running at http://{}:{}/.\n\n'
@@ -814,6 +851,8 @@ def run(ctx, **kwargs):
             console = Console(app_)
             console.start()
 
+        report_startup()
+
         # wait for interrupt
         event = gevent.event.Event()
         gevent.signal(signal.SIGQUIT, event.set)
@@ -886,8 +925,16 @@ def version(short, **kwargs):  # pylint: disable=unused-argument
 def smoketest(ctx, debug, **kwargs):  # pylint: disable=unused-argument
     """ Test, that the raiden installation is sane."""
     from raiden.api.python import RaidenAPI
+    from raiden.api.rest import APIServer, RestAPI
     from raiden.blockchain.abi import get_static_or_compile
+    from raiden.network.sockfactory import SocketFactory
+    from raiden.network.utils import get_free_port
     from raiden.utils import get_contract_path
+    from raiden.tests.utils.smoketest import (
+        load_smoketest_config,
+        start_ethereum,
+        run_smoketests,
+    )
 
     # Check the solidity compiler early in the smoketest.
     #
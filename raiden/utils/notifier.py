@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from gevent.event import Event
+
+
+class Notifier:
+    """ Wakes up the greenlets waiting on a predicate every time `notify` is
+    called, so the waiters don't have to poll.
+    """
+
+    def __init__(self):
+        self._waiters = set()
+
+    def notify(self):
+        """ Re-evaluate the predicates of all the waiters. """
+        for event in list(self._waiters):
+            event.set()
+
+    def wait_for(self, predicate, poll_timeout=None):
+        """ Block until `predicate()` returns a truthy value and return it.
+
+        The predicate is evaluated once and after every notification.
+        `poll_timeout` is used as a fallback to re-evaluate the predicate for
+        changes that are not notified.
+
+        Note:
+            This does not time out, use gevent.Timeout.
+        """
+        event = Event()
+        self._waiters.add(event)
+
+        try:
+            result = predicate()
+
+            while not result:
+                event.wait(poll_timeout)
+                # Clear before evaluating the predicate, otherwise a
+                # notification between the evaluation and the clear is lost
+                event.clear()
+                result = predicate()
+
+            return result
+        finally:
+            self._waiters.discard(event)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import builtins
+import cProfile
+import io
+import pstats
+import sys
+import time
+
+#: The profiler started by `raiden --profile-startup`
+STARTUP_PROFILER = None
+
+
+class StartupProfiler:
+    """ Measures where the time is spent until the node is running.
+
+    The time of every module import is recorded, the cumulative time includes
+    the modules it imports in turn, and everything else is profiled with
+    cProfile. `phase` marks the end of a step, e.g. the imports or the App
+    construction, which are reported with the elapsed time.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.original_import = None
+        self.started_at = None
+        self.last_phase_at = None
+        self.phases = list()
+        self.running = False
+
+        #: module name -> [cumulative time, self time]
+        self.imports = dict()
+        self.import_stack = list()
+
+    def start(self):
+        if self.running:
+            return
+
+        self.original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+        self.started_at = self.last_phase_at = time.perf_counter()
+        self.running = True
+        self.profile.enable()
+
+    def stop(self):
+        if not self.running:
+            return
+
+        self.profile.disable()
+        builtins.__import__ = self.original_import
+        self.running = False
+
+    def phase(self, name: str):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last_phase_at))
+        self.last_phase_at = now
+
+    def _timed_import(self, name, *args, **kwargs):
+        # Only the first import of a module loads it, the others are a lookup
+        # in `sys.modules`
+        if not name or name in sys.modules or name in self.imports:
+            return self.original_import(name, *args, **kwargs)
+
+        self.import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.import_stack.pop()
+
+            if self.import_stack:
+                self.import_stack[-1] += elapsed
+
+            self.imports[name] = [elapsed, elapsed - children]
+
+    def report(self, stream=None, limit: int = 20):
+        """ Stop profiling and write the report to `stream`. """
+        if not self.running:
+            return
+
+        self.stop()
+        stream = stream or sys.stderr
+
+        total = time.perf_counter() - self.started_at
+        stream.write('Startup time: {:.3f}s\n'.format(total))
+        for name, elapsed in self.phases:
+            stream.write('  {:<30} {:>8.3f}s\n'.format(name, elapsed))
+
+        stream.write('\nSlowest imports (cumulative, self):\n')
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, self_time) in slowest[:limit]:
+            stream.write('  {:<50} {:>8.3f}s {:>8.3f}s\n'.format(name, cumulative, self_time))
+
+        output = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        stream.write('\n' + output.getvalue())
+
+
+def start_startup_profiler():
+    global STARTUP_PROFILER  # pylint: disable=global-statement
+
+    if STARTUP_PROFILER is None:
+        STARTUP_PROFILER = StartupProfiler()
+        STARTUP_PROFILER.start()
+
+    return STARTUP_PROFILER
+
+
+def startup_phase(name: str):
+    """ Mark the end of a startup step, if the startup is being profiled. """
+    if STARTUP_PROFILER is not None:
+        STARTUP_PROFILER.phase(name)
+
+
+def report_startup(stream=None):
+    if STARTUP_PROFILER is not None:
+        STARTUP_PROFILER.report(stream)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import time
+from collections import OrderedDict
+
+from raiden.utils import typing
+
+
+class ResultsRegistry:
+    """ Maps the identifiers of pending operations to their results.
+
+    An entry expires `ttl` seconds after it was added or last touched, and
+    the least recently touched entry is evicted to keep at most `max_size`
+    entries. The expired and evicted entries are passed to `on_expire`.
+    Expiration is done lazily when entries are added.
+
+    Args:
+        ttl: Lifetime of an entry which is not touched.
+        max_size: Maximum number of entries.
+        on_expire: Called with the key and the value of a removed entry.
+        time_function: Returns the current time, defaults to
+            `time.monotonic`.
+    """
+
+    def __init__(
+            self,
+            ttl: float,
+            max_size: int,
+            on_expire: typing.Callable = None,
+            time_function: typing.Callable = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.on_expire = on_expire
+        self.time_function = time_function or time.monotonic
+
+        #: key -> (deadline, value), ordered by deadline
+        self.entries = OrderedDict()
+
+        self.expired = 0
+        self.evicted = 0
+        self.max_size_seen = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        return self.entries[key][1]
+
+    def __setitem__(self, key, value):
+        now = self.time_function()
+        self.expire(now)
+
+        self.entries[key] = (now + self.ttl, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.evicted += 1
+            self._remove_first()
+
+        self.max_size_seen = max(self.max_size_seen, len(self.entries))
+
+    def __delitem__(self, key):
+        del self.entries[key]
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def pop(self, key, default=None):
+        entry = self.entries.pop(key, None)
+
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def touch(self, key):
+        """ Restart the lifetime of `key`, e.g. on a retransmission. """
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self.entries[key] = (self.time_function() + self.ttl, entry[1])
+            self.entries.move_to_end(key)
+
+    def values(self):
+        return [value for _, value in self.entries.values()]
+
+    def expire(self, now: float = None):
+        """ Remove the entries which expired at `now`. """
+        if now is None:
+            now = self.time_function()
+
+        while self.entries:
+            deadline, _ = next(iter(self.entries.values()))
+
+            if deadline > now:
+                break
+
+            self.expired += 1
+            self._remove_first()
+
+    def metrics(self) -> typing.Dict[str, int]:
+        return {
+            'size': len(self.entries),
+            'max_size_seen': self.max_size_seen,
+            'expired': self.expired,
+            'evicted': self.evicted,
+        }
+
+    def _remove_first(self):
+        key, (_, value) = self.entries.popitem(last=False)
+
+        if self.on_expire is not None:
+            self.on_expire(key, value)
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-import gevent
 import structlog
 
 from raiden.transfer.state import NODE_NETWORK_REACHABLE
@@ -15,19 +14,35 @@ RaidenService = 'RaidenService'
 log = structlog.get_logger(__name__)  # pylint: disable=invalid-name
 
 
+def wait_for_state(
+        raiden: RaidenService,
+        predicate: typing.Callable,
+        poll_timeout: typing.NetworkTimeout,
+):
+    """ Wait until `predicate(node_state)` is true.
+
+    The predicate is re-evaluated after every state change dispatched by
+    `raiden`, `poll_timeout` is only a fallback.
+
+    Note:
+        This does not time out, use gevent.Timeout.
+    """
+    return raiden.state_change_notifier.wait_for(
+        lambda: predicate(views.state_from_raiden(raiden)),
+        poll_timeout,
+    )
+
+
 def wait_for_block(
         raiden: RaidenService,
         block_number: typing.BlockNumber,
         poll_timeout: typing.NetworkTimeout,
 ) -> None:
-    current_block_number = views.block_number(
-        views.state_from_raiden(raiden),
+    wait_for_state(
+        raiden,
+        lambda node_state: views.block_number(node_state) >= block_number,
+        poll_timeout,
     )
-    while current_block_number < block_number:
-        gevent.sleep(poll_timeout)
-        current_block_number = views.block_number(
-            views.state_from_raiden(raiden),
-        )
 
 
 def wait_for_newchannel(
@@ -42,21 +57,16 @@ def wait_for_newchannel(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while channel_state is None:
-        gevent.sleep(poll_timeout)
+    def channel_exists(node_state):
         channel_state = views.get_channelstate_for(
-            views.state_from_raiden(raiden),
+            node_state,
             payment_network_id,
             token_address,
             partner_address,
         )
+        return channel_state is not None
+
+    wait_for_state(raiden, channel_exists, poll_timeout)
 
 
 def wait_for_participant_newbalance(
@@ -80,55 +90,72 @@ def wait_for_participant_newbalance(
     else:
         raise ValueError('target_address must be one of the channel participants')
 
-    channel_state = views.get_channelstate_for(
-        views.state_from_raiden(raiden),
-        payment_network_id,
-        token_address,
-        partner_address,
-    )
-
-    while balance(channel_state) < target_balance:
-        gevent.sleep(poll_timeout)
+    def balance_reached(node_state):
         channel_state = views.get_channelstate_for(
-            views.state_from_raiden(raiden),
+            node_state,
             payment_network_id,
             token_address,
             partner_address,
         )
+        return balance(channel_state) >= target_balance
 
+    wait_for_state(raiden, balance_reached, poll_timeout)
 
-def wait_for_close(
+
+def wait_for_channels_status(
         raiden: RaidenService,
         payment_network_id: typing.PaymentNetworkID,
         token_address: typing.Address,
         channel_ids: typing.List[typing.ChannelID],
+        is_done: typing.Callable,
         poll_timeout: typing.NetworkTimeout,
 ) -> None:
-    """Wait until all channels are closed.
-
-    Note:
-        This does not time out, use gevent.Timeout.
+    """Wait until `is_done(channel_state)` is true for all channels, a
+    channel which is not known is considered done.
     """
     channel_ids = list(channel_ids)
 
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
+    def all_done(node_state):
+        # Channels that are done are removed, so the channels are not looked
+        # up again on every state change
+        while channel_ids:
+            channel_state = views.get_channelstate_by_id(
+                node_state,
+                payment_network_id,
+                token_address,
+                channel_ids[-1],
+            )
 
-        channel_is_settled = (
-            channel_state is None or
-            channel.get_status(channel_state) in CHANNEL_AFTER_CLOSE_STATES
-        )
+            if channel_state is not None and not is_done(channel_state):
+                return False
 
-        if channel_is_settled:
             channel_ids.pop()
-        else:
-            gevent.sleep(poll_timeout)
+
+        return True
+
+    wait_for_state(raiden, all_done, poll_timeout)
+
+
+def wait_for_close(
+        raiden: RaidenService,
+        payment_network_id: typing.PaymentNetworkID,
+        token_address: typing.Address,
+        channel_ids: typing.List[typing.ChannelID],
+        poll_timeout: typing.NetworkTimeout,
+) -> None:
+    """Wait until all channels are closed.
+
+    Note:
+        This does not time out, use gevent.Timeout.
+    """
+    wait_for_channels_status(
+        raiden,
+        payment_network_id,
+        token_address,
+        channel_ids,
+        lambda channel_state: channel.get_status(channel_state) in CHANNEL_AFTER_CLOSE_STATES,
+        poll_timeout,
+    )
 
 
 def wait_for_settle(
@@ -146,26 +173,14 @@ def wait_for_settle(
     if not isinstance(channel_ids, list):
         raise ValueError('channel_ids must be a list')
 
-    channel_ids = list(channel_ids)
-
-    while channel_ids:
-        first_id = channel_ids[0]
-        channel_state = views.get_channelstate_by_id(
-            views.state_from_raiden(raiden),
-            payment_network_id,
-            token_address,
-            first_id,
-        )
-
-        channel_is_settled = (
-            channel_state is None or
-            channel.get_status(channel_state) == CHANNEL_STATE_SETTLED
-        )
-
-        if channel_is_settled:
-            channel_ids.pop()
-        else:
-            gevent.sleep(poll_timeout)
+    wait_for_channels_status(
+        raiden,
+        payment_network_id,
+        token_address,
+        channel_ids,
+        lambda channel_state: channel.get_status(channel_state) == CHANNEL_STATE_SETTLED,
+        poll_timeout,
+    )
 
 
 def wait_for_settle_all_channels(
@@ -184,7 +199,7 @@ def wait_for_settle_all_channels(
 
         id_tokennetworkstate = payment_network_state.tokenidentifiers_to_tokennetworks.items()
         for token_network_id, token_network_state in id_tokennetworkstate:
-            channel_ids = token_network_state.channelidentifiers_to_channels.keys()
+            channel_ids = list(token_network_state.channelidentifiers_to_channels.keys())
 
             wait_for_settle(
                 raiden,
@@ -205,12 +220,8 @@ def wait_for_healthy(
     Note:
         This does not time out, use gevent.Timeout.
     """
-    network_statuses = views.get_networkstatuses(
-        views.state_from_raiden(raiden),
-    )
+    def is_healthy(node_state):
+        network_statuses = views.get_networkstatuses(node_state)
+        return network_statuses.get(node_address) == NODE_NETWORK_REACHABLE
 
-    while network_statuses.get(node_address) != NODE_NETWORK_REACHABLE:
-        gevent.sleep(poll_timeout)
-        network_statuses = views.get_networkstatuses(
-            views.state_from_raiden(raiden),
-        )
+    wait_for_state(raiden, is_healthy, poll_timeout)
@@ -36,7 +36,7 @@ class PyTest(TestCommand):
 
 
 class CompileContracts(Command):
-    description = 'compile contracts to json'
+    description = 'compile contracts to the json ABI bundle'
     user_options = []
 
     def initialize_options(self):
@@ -47,8 +47,9 @@ class CompileContracts(Command):
 
     def run(self):
         os.environ['STORE_PRECOMPILED'] = 'yes'
-        from raiden.blockchain.abi import CONTRACT_MANAGER
-        CONTRACT_MANAGER.instantiate()
+        from raiden.blockchain.abi import build_abi_bundle
+        bundle_path = build_abi_bundle()
+        self.announce('{} written'.format(bundle_path), level=distutils.log.INFO)
 
 
 class CompileWebUI(Command):